@@ -1,14 +1,67 @@
+from django import forms
 from django.contrib import admin
+from django.db import transaction
 
-from guidebook.models import GuideBook, Work
+from guidebook.cache import ExchangeRateCache
+from guidebook.models import ExchangeRate, GuideBook, Work
+from guidebook.service import ExchangeRateService, GuideBookService, WorkService
+
+
+class GuideBookAdminForm(forms.ModelForm):
+    class Meta:
+        model = GuideBook
+        fields = "__all__"
+
+    def clean(self):
+        """справочник нельзя перенести внутрь самого себя или своего потомка"""
+        cleaned_data = super().clean()
+        parent = cleaned_data.get("parent_guide_book")
+        path = self.instance.path
+        if parent is not None and path and parent.path.startswith(path):
+            self.add_error(
+                "parent_guide_book", "Нельзя перенести справочник внутрь самого себя."
+            )
+        return cleaned_data
 
 
 @admin.register(GuideBook)
 class GuideBookAdmin(admin.ModelAdmin):
+    form = GuideBookAdminForm
     list_display = ("id", "company", "title", "parent_guide_book",)
     list_filter = ("company",)
     search_fields = ("company",)
-    fields = ("company", "title", "parent_guide_book",)
+    fields = ("company", "title", "parent_guide_book", "path", "depth",
+              "children_count", "works_count", "subtree_works_count", "price_stats",)
+    readonly_fields = ("path", "depth", "children_count", "works_count",
+                       "subtree_works_count", "price_stats",)
+
+    def save_model(self, request, obj, form, change):
+        """
+        сохраняем через сервис: путь, агрегаты и версии справочников
+        (ETag и кэш ответов) остаются согласованными
+        """
+        data = {"title": obj.title, "parent_guide_book": obj.parent_guide_book_id}
+        if change:
+            GuideBookService.update_guidebook(
+                GuideBook.objects.get(pk=obj.pk), company=obj.company_id, **data
+            )
+        else:
+            obj.pk = GuideBookService.create_guidebook(obj.company_id, **data).pk
+
+    def delete_model(self, request, obj):
+        """мягкое удаление справочника вместе с поддеревом и работами"""
+        if not obj.is_delete:
+            GuideBookService.soft_delete_guidebook(obj)
+
+    def delete_queryset(self, request, queryset):
+        """массовое мягкое удаление, поддерево удаляется вместе с корнем"""
+        deleted_paths = []
+        with transaction.atomic():
+            for guidebook in queryset.filter(is_delete=False).order_by("depth", "id"):
+                if guidebook.path.startswith(tuple(deleted_paths)):
+                    continue
+                GuideBookService.soft_delete_guidebook(guidebook)
+                deleted_paths.append(guidebook.path)
 
 
 @admin.register(Work)
@@ -21,3 +74,68 @@ class WorkAdmin(admin.ModelAdmin):
               "unit_of_measurement",
               "price_by_unit",
               "currency",)
+
+    def save_model(self, request, obj, form, change):
+        """
+        сохраняем через сервис: цена в базовой валюте, агрегаты
+        и версии справочников остаются согласованными
+        """
+        data = {
+            "guidebook": obj.guidebook_id,
+            "title": obj.title,
+            "unit_of_measurement": obj.unit_of_measurement,
+            "price_by_unit": obj.price_by_unit,
+            "currency": obj.currency,
+        }
+        work = WorkService.get_work(obj.pk) if change else None
+        if work is not None:
+            WorkService.update_work(work, **data)
+        elif change:
+            # удаленная работа в агрегатах не учитывается
+            obj.normalized_price = ExchangeRateCache.normalize(
+                obj.price_by_unit, obj.currency
+            )
+            super().save_model(request, obj, form, change)
+        else:
+            obj.pk = WorkService.create_work(**data).pk
+
+    def delete_model(self, request, obj):
+        """мягкое удаление через сервис с пересчетом агрегатов справочника"""
+        work = WorkService.get_work(obj.pk)
+        if work is not None:
+            WorkService.soft_delete_work(work)
+
+    def delete_queryset(self, request, queryset):
+        """массовое мягкое удаление через сервис с пересчетом агрегатов"""
+        WorkService.bulk_soft_delete_works(list(queryset.values_list("id", flat=True)))
+
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ("currency", "rate", "changed_at",)
+    fields = ("currency", "rate",)
+
+    def get_readonly_fields(self, request, obj=None):
+        """валюту существующего курса не меняем: цены старой валюты не пересчитаются"""
+        if obj is not None:
+            return ("currency",)
+        return ()
+
+    def save_model(self, request, obj, form, change):
+        """после сохранения курса пересчитываем цены работ в базовой валюте"""
+        super().save_model(request, obj, form, change)
+        ExchangeRateService.recompute_normalized_prices([obj.currency])
+        transaction.on_commit(ExchangeRateCache.invalidate)
+
+    def delete_model(self, request, obj):
+        """без курса цены работ в базовой валюте сбрасываются"""
+        super().delete_model(request, obj)
+        ExchangeRateService.recompute_normalized_prices([obj.currency])
+        transaction.on_commit(ExchangeRateCache.invalidate)
+
+    def delete_queryset(self, request, queryset):
+        """без курсов цены работ в базовой валюте сбрасываются"""
+        currencies = list(queryset.values_list("currency", flat=True))
+        super().delete_queryset(request, queryset)
+        ExchangeRateService.recompute_normalized_prices(currencies)
+        transaction.on_commit(ExchangeRateCache.invalidate)
@@ -6,3 +6,6 @@ class GuidebookConfig(AppConfig):
     name = "guidebook"
     verbose_name = "Справочник"
 
+    def ready(self):
+        import guidebook.signals  # noqa: F401
+
@@ -0,0 +1,201 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from company.permissions import AnyCompanyRolePermissions
+from guidebook.filters import GuideBookFilter, WorkFilter
+from guidebook.models import GuideBook
+from guidebook.paginators import Pagination
+from guidebook.permissions import CheckingUserWorkInCompany, aget_guidebook_access
+from guidebook.renderers import dumps
+from guidebook.serializers import (
+    DirectoryWithEmbeddedDataOutputSerializer,
+    GuideBookAggregatesOutputSerializer,
+    WorkDataOutputSerializer,
+)
+from guidebook.service import GuideBookService, WorkService
+
+
+class AsyncBaseView(View):
+    """
+    Базовое асинхронное вью для чтения справочников под ASGI.
+    Аутентификация DRF выполняется в потоке через sync_to_async, пермишены
+    с методом ahas_permission проверяются асинхронно, остальные - в потоке.
+    Запросы к базе выполняются асинхронным ORM, ответ - тот же JSON,
+    что и у синхронных вью с FastJSONRenderer.
+    """
+
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = [IsAuthenticated]
+    output_serializer_class = None
+    pagination_class = Pagination
+    filter_backends = []
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            request = await self.initialize_request(request)
+            self.request = request
+            await self.load_objects(request, *args, **kwargs)
+            await self.check_permissions(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.response({"detail": exc.detail}, status=exc.status_code)
+
+    async def initialize_request(self, request) -> Request:
+        drf_request = Request(
+            request, authenticators=[auth() for auth in self.authentication_classes]
+        )
+        # аутентификаторы DRF синхронные и могут обращаться к базе
+        await sync_to_async(lambda: drf_request.user)()
+        return drf_request
+
+    async def load_objects(self, request, *args, **kwargs) -> None:
+        """загрузка объектов из кварков до проверки пермишенов, 404 если не найдены"""
+
+    async def check_permissions(self, request) -> None:
+        for permission in [permission() for permission in self.permission_classes]:
+            if hasattr(permission, "ahas_permission"):
+                allowed = await permission.ahas_permission(request, self)
+            else:
+                allowed = await sync_to_async(permission.has_permission)(
+                    request, self
+                )
+            if not allowed:
+                if not request.user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(
+                    getattr(permission, "message", None)
+                )
+
+    def filter_queryset(self, request, queryset):
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(request, queryset, self)
+        return queryset
+
+    async def paginate(self, request, queryset) -> dict:
+        """постраничный вывод как у Pagination: count, next, previous, results"""
+        paginator = self.pagination_class()
+        page_size = paginator.get_page_size(request)
+        try:
+            page_number = int(request.query_params.get(paginator.page_query_param, 1))
+        except ValueError:
+            raise exceptions.NotFound("Неверная страница.")
+        if page_number < 1:
+            raise exceptions.NotFound("Неверная страница.")
+
+        count = await queryset.acount()
+        offset = (page_number - 1) * page_size
+        if offset and offset >= count:
+            raise exceptions.NotFound("Неверная страница.")
+        results = [obj async for obj in queryset[offset : offset + page_size]]
+
+        url = request.build_absolute_uri()
+        next_url = None
+        if offset + page_size < count:
+            next_url = replace_query_param(
+                url, paginator.page_query_param, page_number + 1
+            )
+        previous_url = None
+        if page_number == 2:
+            previous_url = remove_query_param(url, paginator.page_query_param)
+        elif page_number > 2:
+            previous_url = replace_query_param(
+                url, paginator.page_query_param, page_number - 1
+            )
+        return {
+            "count": count,
+            "next": next_url,
+            "previous": previous_url,
+            "results": results,
+        }
+
+    def response(self, data, status: int = 200) -> HttpResponse:
+        return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+
+class AsyncGuideBooksListView(AsyncBaseView):
+    """асинхронное вью просмотра списка справочников первого уровня"""
+
+    output_serializer_class = GuideBookAggregatesOutputSerializer
+    permission_classes = [IsAuthenticated, AnyCompanyRolePermissions]
+    filter_backends = [GuideBookFilter]
+
+    async def get(self, request, *args, **kwargs):
+        guidebooks = GuideBook.objects.filter(
+            company_id=kwargs["pk_company"], parent_guide_book=None, is_delete=False
+        )
+        if not await guidebooks.aexists():
+            raise exceptions.NotFound("Справочники не найдены.")
+        page = await self.paginate(request, self.filter_queryset(request, guidebooks))
+        page["results"] = self.output_serializer_class(
+            page["results"], many=True
+        ).data
+        return self.response(page)
+
+
+class AsyncGuideBookDetailView(AsyncBaseView):
+    """асинхронное вью просмотра детально одного справочника"""
+
+    output_serializer_class = DirectoryWithEmbeddedDataOutputSerializer
+    permission_classes = [IsAuthenticated, CheckingUserWorkInCompany]
+    guidebook: GuideBook = None
+
+    async def load_objects(self, request, *args, **kwargs):
+        self.guidebook = (await aget_guidebook_access(request, self)).guidebook
+        if self.guidebook is None:
+            raise exceptions.NotFound("Справочник не найден.")
+
+    async def get(self, request, *args, **kwargs):
+        construction_guidebook = await GuideBookService.aprefetch_nested(
+            self.guidebook
+        )
+        serializer = self.output_serializer_class(
+            {
+                "guidebook": construction_guidebook,
+                "nested_guidebooks": construction_guidebook.nested_guidebooks,
+                "nested_works": construction_guidebook.nested_works,
+            }
+        )
+        return self.response(serializer.data)
+
+
+class AsyncWorkListView(AsyncBaseView):
+    """асинхронное вью просмотра списка работ справочника"""
+
+    output_serializer_class = WorkDataOutputSerializer
+    permission_classes = [IsAuthenticated, CheckingUserWorkInCompany]
+    filter_backends = [WorkFilter]
+
+    async def load_objects(self, request, *args, **kwargs):
+        if (await aget_guidebook_access(request, self)).guidebook is None:
+            raise exceptions.NotFound("Справочник не найден.")
+
+    async def get(self, request, *args, **kwargs):
+        works = WorkService.get_works_queryset(kwargs["pk_guidebook"])
+        if not await works.aexists():
+            raise exceptions.NotFound("Работы в справочнике не найдены.")
+        page = await self.paginate(request, self.filter_queryset(request, works))
+        page["results"] = self.output_serializer_class(
+            page["results"], many=True
+        ).data
+        return self.response(page)
+
+
+class AsyncWorkDetailView(AsyncBaseView):
+    """асинхронное вью просмотра детально одной работы"""
+
+    output_serializer_class = WorkDataOutputSerializer
+    permission_classes = [IsAuthenticated, CheckingUserWorkInCompany]
+
+    async def load_objects(self, request, *args, **kwargs):
+        self.work = (await aget_guidebook_access(request, self)).work
+        if self.work is None:
+            raise exceptions.NotFound("Работа не найдена.")
+
+    async def get(self, request, *args, **kwargs):
+        return self.response(self.output_serializer_class(self.work).data)
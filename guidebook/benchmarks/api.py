@@ -0,0 +1,144 @@
+import random
+import statistics
+import time
+from typing import Callable, Union
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from guidebook.apps import GuidebookConfig
+from guidebook.benchmarks.seed import WORK_OBJECTS
+from guidebook.models import GuideBook, Work
+
+SCENARIOS = ("list", "detail", "search", "create", "bulk")
+
+
+def get_url(name: str, **kwargs) -> str:
+    return reverse(f"{GuidebookConfig.name}:{name}", kwargs=kwargs)
+
+
+def percentile(timings: list[float], fraction: float) -> float:
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def get_rows_scanned() -> Union[int, None]:
+    """
+    строки, прочитанные текущей транзакцией из всех таблиц (PostgreSQL),
+    на других СУБД статистики нет - None
+    """
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COALESCE(SUM(seq_tup_read + COALESCE(idx_tup_fetch, 0)), 0) "
+            "FROM pg_stat_xact_user_tables"
+        )
+        return int(cursor.fetchone()[0])
+
+
+class ApiBenchmark:
+    """
+    Сценарии запросов к API справочников с замером времени, количества
+    SQL-запросов и прочитанных строк на запрос. Все сценарии выполняются
+    в одной транзакции, которая откатывается, поэтому созданные работы не сохраняются
+    и счетчики pg_stat_xact_user_tables относятся только к бенчмарку.
+    """
+
+    def __init__(
+        self,
+        pk_company: int,
+        user,
+        requests: int = 100,
+        bulk_size: int = 100,
+        seed: int = 0,
+    ):
+        self.pk_company = pk_company
+        self.requests = requests
+        self.bulk_size = bulk_size
+        self.random = random.Random(seed)
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+        self.guidebook_ids = list(
+            GuideBook.objects.filter(company_id=pk_company, is_delete=False)
+            .order_by("id")
+            .values_list("id", flat=True)[:10000]
+        )
+
+    def get_work_data(self, number: int) -> dict:
+        return {
+            "guidebook": self.random.choice(self.guidebook_ids),
+            "title": f"Бенчмарк {number}",
+            "price_by_unit": self.random.randint(100, 10000),
+            "unit_of_measurement": Work.UnitType.SQUARE_METER,
+            "currency": Work.CurrencyType.RUB,
+        }
+
+    def request_list(self, number: int):
+        return self.client.get(
+            get_url("guidebook_list/pk_company", pk_company=self.pk_company)
+        )
+
+    def request_detail(self, number: int):
+        pk_guidebook = self.random.choice(self.guidebook_ids)
+        return self.client.get(get_url("pk_guidebook", pk_guidebook=pk_guidebook))
+
+    def request_search(self, number: int):
+        return self.client.get(
+            get_url("work_search/pk_company", pk_company=self.pk_company),
+            {"title": self.random.choice(WORK_OBJECTS)},
+        )
+
+    def request_create(self, number: int):
+        return self.client.post(
+            get_url("work_create"), self.get_work_data(number), format="json"
+        )
+
+    def request_bulk(self, number: int):
+        return self.client.post(
+            get_url("work_bulk"),
+            [
+                self.get_work_data(number * self.bulk_size + item)
+                for item in range(self.bulk_size)
+            ],
+            format="json",
+        )
+
+    def measure(self, send: Callable[[int], object]) -> dict:
+        timings, queries, rows, errors = [], [], [], 0
+        for number in range(self.requests):
+            rows_before = get_rows_scanned()
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = send(number)
+                timings.append((time.perf_counter() - start) * 1000)
+            rows_after = get_rows_scanned()
+            queries.append(len(captured))
+            if rows_before is not None:
+                rows.append(rows_after - rows_before)
+            if response.status_code >= 400:
+                errors += 1
+
+        timings.sort()
+        return {
+            "requests": self.requests,
+            "errors": errors,
+            "p50_ms": percentile(timings, 0.50),
+            "p95_ms": percentile(timings, 0.95),
+            "p99_ms": percentile(timings, 0.99),
+            "queries_avg": statistics.mean(queries),
+            "queries_max": max(queries),
+            "rows_scanned_avg": statistics.mean(rows) if rows else None,
+        }
+
+    def run(self, scenarios: tuple[str, ...] = SCENARIOS) -> list[dict]:
+        """результаты сценариев, данные откатываются после замера"""
+        results = []
+        with transaction.atomic():
+            for name in scenarios:
+                send = getattr(self, f"request_{name}")
+                send(0)  # прогрев кэшей ролей и соединения
+                results.append({"name": name, **self.measure(send)})
+            transaction.set_rollback(True)
+        return results
@@ -0,0 +1,121 @@
+import statistics
+import time
+
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.db.models import QuerySet
+
+from guidebook.models import GuideBook, Work
+from guidebook.service import WorkService
+
+
+def get_hot_queries(pk_company: int) -> list[tuple[str, QuerySet]]:
+    """запросы, под которые подобраны индексы справочников и работ"""
+    node = (
+        GuideBook.objects.filter(company_id=pk_company, is_delete=False, depth=1)
+        .order_by("id")
+        .first()
+    )
+    leaf = (
+        GuideBook.objects.filter(company_id=pk_company, is_delete=False)
+        .order_by("-depth", "id")
+        .first()
+    )
+    if node is None or leaf is None:
+        raise CommandError("В компании нет вложенных справочников.")
+    leaf_works = Work.objects.filter(guidebook_id=leaf.pk, is_delete=False).order_by(
+        "id"
+    )
+    leaf_works_count = leaf_works.count()
+    if not leaf_works_count:
+        raise CommandError("В самом глубоком справочнике компании нет работ.")
+    middle_work_pk = leaf_works.values_list("id", flat=True)[leaf_works_count // 2]
+    return [
+        (
+            "справочники первого уровня",
+            GuideBook.objects.filter(
+                company_id=pk_company, parent_guide_book=None, is_delete=False
+            ).order_by("id")[:10],
+        ),
+        (
+            "дерево справочников",
+            GuideBook.objects.filter(company_id=pk_company, is_delete=False)
+            .order_by("depth", "id")
+            .values("id", "title", "parent_guide_book_id"),
+        ),
+        (
+            "вложенные справочники",
+            GuideBook.objects.filter(
+                parent_guide_book_id=node.pk, is_delete=False
+            ).order_by("id"),
+        ),
+        ("работы справочника, 1 страница", leaf_works[:10]),
+        (
+            "работы справочника, страница по курсору из середины",
+            leaf_works.filter(id__gt=middle_work_pk)[:10],
+        ),
+        (
+            "работы поддерева",
+            Work.objects.filter(
+                guidebook__path__startswith=node.path,
+                guidebook__is_delete=False,
+                is_delete=False,
+            ).order_by("guidebook_id", "id")[:100],
+        ),
+        (
+            "поиск по компании с фильтром цены",
+            WorkService.search_works(pk_company, price_min=5000, price_max=5100)[:10],
+        ),
+    ]
+
+
+def explain(queryset: QuerySet) -> str:
+    if connection.vendor == "postgresql":
+        return queryset.explain(analyze=True, buffers=True)
+    return queryset.explain()
+
+
+def run_queries(queries: list[tuple[str, QuerySet]], repeat: int) -> list[dict]:
+    """план и время выполнения каждого запроса, время в миллисекундах"""
+    results = []
+    for name, queryset in queries:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        results.append(
+            {
+                "name": name,
+                "plan": explain(queryset),
+                "median_ms": statistics.median(timings),
+                "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+            }
+        )
+    return results
+
+
+def benchmark_indexes(pk_company: int, repeat: int = 20) -> tuple[list, list]:
+    """
+    выполняет горячие запросы без индексов Meta.indexes (индексы удаляются
+    в транзакции, которая откатывается) и с ними, возвращает (до, после)
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("ANALYZE guidebook_guidebook, guidebook_work")
+        else:
+            cursor.execute("ANALYZE")
+
+    queries = get_hot_queries(pk_company)
+    index_names = [
+        index.name for model in (GuideBook, Work) for index in model._meta.indexes
+    ]
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for name in index_names:
+                cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+        before = run_queries(queries, repeat)
+        transaction.set_rollback(True)
+    after = run_queries(queries, repeat)
+    return before, after
@@ -0,0 +1,86 @@
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+from django.test import AsyncClient
+from django.urls import reverse
+
+from guidebook.apps import GuidebookConfig
+from guidebook.models import GuideBook
+
+# (название, имя синхронного url, имя асинхронного url)
+LOAD_VIEWS = (
+    ("детально справочника", "pk_guidebook", "async/pk_guidebook"),
+    ("список работ", "work_list/pk_guidebook", "async/work_list/pk_guidebook"),
+)
+
+
+def percentile(timings: list[float], fraction: float) -> float:
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+async def run_load(
+    client: AsyncClient, url: str, requests: int, concurrency: int, extra: dict
+) -> dict:
+    """
+    requests запросов к url, одновременно не больше concurrency,
+    время в миллисекундах
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+    statuses = Counter()
+
+    async def send():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(url, **extra)
+            timings.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    timings.sort()
+    return {
+        "rps": requests / elapsed,
+        "median_ms": statistics.median(timings),
+        "p95_ms": percentile(timings, 0.95),
+        "statuses": dict(statuses),
+    }
+
+
+def compare_sync_async(
+    guidebook: GuideBook,
+    user=None,
+    authorization: str = None,
+    requests: int = 500,
+    concurrency: int = 50,
+) -> list[dict]:
+    """
+    Нагрузочное сравнение синхронных и асинхронных вью чтения в одном процессе
+    через ASGI-обработчик AsyncClient: синхронные вью выполняются в одном потоке
+    (как один воркер), асинхронные - в цикле событий того же процесса.
+    """
+    client = AsyncClient()
+    if user is not None:
+        client.force_login(user)
+    extra = {"HTTP_AUTHORIZATION": authorization} if authorization else {}
+
+    async def run_all():
+        results = []
+        for name, sync_name, async_name in LOAD_VIEWS:
+            result = {"name": name}
+            for kind, url_name in (("sync", sync_name), ("async", async_name)):
+                url = reverse(
+                    f"{GuidebookConfig.name}:{url_name}",
+                    kwargs={"pk_guidebook": guidebook.pk},
+                )
+                await client.get(url, **extra)  # прогрев кэшей ролей и соединения
+                result[kind] = await run_load(
+                    client, url, requests, concurrency, extra
+                )
+            results.append(result)
+        return results
+
+    return asyncio.run(run_all())
@@ -0,0 +1,94 @@
+import time
+
+from rest_framework.renderers import JSONRenderer
+
+from guidebook.importers import CATALOG_COLUMNS
+from guidebook.renderers import FastJSONRenderer, dumps, orjson
+
+
+def build_tree(nodes: int, works: int) -> list[dict]:
+    """дерево справочников как в ответе guidebook_tree с работами в каждом узле"""
+    tree, level = [], []
+    for number in range(1, nodes + 1):
+        node = {
+            "id": number,
+            "title": f"Справочник «Отделка» {number}",
+            "works": [
+                {
+                    "id": number * works + item,
+                    "title": f"Покраска стен {item}",
+                    "price_by_unit": 1000 + item,
+                    "unit_of_measurement": "square_meter",
+                    "currency": "RUB",
+                }
+                for item in range(works)
+            ],
+            "children": [],
+        }
+        if level and number % 5:
+            level[-1]["children"].append(node)
+        else:
+            tree.append(node)
+            level.append(node)
+    return tree
+
+
+def build_export(rows: int) -> list[dict]:
+    """строки выгрузки ndjson"""
+    return [
+        dict(
+            zip(
+                CATALOG_COLUMNS,
+                (
+                    f"Отделка/Стены/Раздел {number % 100}",
+                    f"Покраска стен {number}",
+                    1000 + number,
+                    "square_meter",
+                    "RUB",
+                ),
+            )
+        )
+        for number in range(rows)
+    ]
+
+
+def best_time(render, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def benchmark_renderers(
+    nodes: int = 2000, works: int = 20, rows: int = 100_000, repeat: int = 5
+) -> dict:
+    """
+    время (мс, лучший из repeat) JSONRenderer и FastJSONRenderer на большом дереве
+    и на строках выгрузки, с проверкой побайтового совпадения
+    """
+    tree = build_tree(nodes, works)
+    export = build_export(rows)
+    default_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+
+    def default_lines():
+        return [default_renderer.render(row) for row in export]
+
+    def fast_lines():
+        return [dumps(row) for row in export]
+
+    return {
+        "engine": "orjson" if orjson is not None else "json",
+        "tree": {
+            "identical": default_renderer.render(tree) == fast_renderer.render(tree),
+            "default_ms": best_time(lambda: default_renderer.render(tree), repeat),
+            "fast_ms": best_time(lambda: fast_renderer.render(tree), repeat),
+        },
+        "export": {
+            "identical": default_lines() == fast_lines(),
+            "default_ms": best_time(default_lines, repeat),
+            "fast_ms": best_time(fast_lines, repeat),
+        },
+    }
@@ -0,0 +1,132 @@
+import random
+from typing import Callable
+
+from django.db import transaction
+
+from company.models import Company, CompanyRoleUser
+from guidebook.cache import ExchangeRateCache
+from guidebook.models import GuideBook, Work
+from guidebook.service import GuideBookAggregateService
+
+WORK_ACTIONS = ("Покраска", "Штукатурка", "Шпатлевка", "Укладка", "Монтаж", "Демонтаж")
+WORK_OBJECTS = ("стен", "потолков", "пола", "откосов", "плитки", "ламината")
+
+
+def seed_guidebooks(
+    pk_company: int, depth: int, branching: int, batch_size: int = 5000
+) -> list[GuideBook]:
+    """
+    создает дерево справочников компании: branching корней,
+    у каждого справочника branching детей, depth уровней
+    """
+    created = []
+    parents = [None]
+    for level in range(depth):
+        nodes = [
+            GuideBook(
+                company_id=pk_company,
+                title=f"Справочник {level + 1}.{number + 1}",
+                parent_guide_book=parent,
+                depth=level,
+            )
+            for parent in parents
+            for number in range(branching)
+        ]
+        GuideBook.objects.bulk_create(nodes, batch_size=batch_size)
+        for node in nodes:
+            parent_path = node.parent_guide_book.path if node.parent_guide_book else ""
+            node.path = GuideBook.build_path(parent_path, node.pk)
+        GuideBook.objects.bulk_update(nodes, ["path"], batch_size=batch_size)
+        created.extend(nodes)
+        parents = nodes
+    return created
+
+
+def seed_works(
+    guidebooks: list[GuideBook],
+    works: int,
+    deleted_ratio: float = 0.05,
+    batch_size: int = 5000,
+    seed: int = 0,
+    progress: Callable[[int], None] = None,
+) -> None:
+    """создает works работ, равномерно распределенных по справочникам, пачками"""
+    generator = random.Random(seed)
+    units = [value for value, _ in Work.UnitType.choices]
+    currencies = [value for value, _ in Work.CurrencyType.choices]
+    batch = []
+    rates = ExchangeRateCache.get_rates()
+    for number in range(works):
+        work = Work(
+            guidebook_id=guidebooks[number % len(guidebooks)].pk,
+            title=(
+                f"{generator.choice(WORK_ACTIONS)} "
+                f"{generator.choice(WORK_OBJECTS)} {number}"
+            ),
+            price_by_unit=generator.randint(100, 10000),
+            unit_of_measurement=generator.choice(units),
+            currency=generator.choice(currencies),
+            is_delete=generator.random() < deleted_ratio,
+        )
+        work.normalized_price = ExchangeRateCache.normalize(
+            work.price_by_unit, work.currency, rates
+        )
+        batch.append(work)
+        if len(batch) >= batch_size:
+            Work.objects.bulk_create(batch)
+            batch = []
+            if progress is not None:
+                progress(number + 1)
+    if batch:
+        Work.objects.bulk_create(batch)
+    if progress is not None:
+        progress(works)
+
+
+def seed_catalog(
+    pk_company: int,
+    works: int = 1_000_000,
+    depth: int = 4,
+    branching: int = 5,
+    deleted_ratio: float = 0.05,
+    seed: int = 0,
+    progress: Callable[[int], None] = None,
+) -> list[GuideBook]:
+    """наполняет компанию деревом справочников и работами для бенчмарков"""
+    with transaction.atomic():
+        guidebooks = seed_guidebooks(pk_company, depth, branching)
+        seed_works(
+            guidebooks, works, deleted_ratio=deleted_ratio, seed=seed, progress=progress
+        )
+        GuideBookAggregateService.rebuild_company(pk_company)
+    return guidebooks
+
+
+def seed_companies(
+    companies: int,
+    user=None,
+    progress: Callable[[int], None] = None,
+    **catalog_options,
+) -> list[Company]:
+    """
+    создает companies компаний с деревом справочников и работами,
+    user получает в каждой роль author для сценариев бенчмарка
+    """
+    created = []
+    start = Company.objects.count()
+    for number in range(start, start + companies):
+        company = Company.objects.create(
+            name=f"Бенчмарк {number}",
+            address=f"улица бенчмарка {number}",
+            email=f"benchmark_{number}@example.com",
+            inn=f"77{number:010d}",
+            company_type="limited_liability_company",
+            is_delete=False,
+        )
+        if user is not None:
+            CompanyRoleUser.objects.create(
+                user=user, company=company, role=CompanyRoleUser.RoleType.AUTHOR
+            )
+        seed_catalog(company.pk, progress=progress, **catalog_options)
+        created.append(company)
+    return created
@@ -0,0 +1,85 @@
+import time
+
+from guidebook.fast_serializers import FastOutputSerializer
+from guidebook.models import GuideBook, Work
+from guidebook.serializers import (
+    ViewingDirectoryOnlyNameOutputSerializer,
+    WorkDataOutputSerializer,
+)
+
+
+def build_works(rows: int) -> tuple[list[Work], list[dict]]:
+    """работы в памяти: объекты моделей для DRF и строки values() для быстрого пути"""
+    guidebook = GuideBook(id=1, title="Внутренняя отделка")
+    works = [
+        Work(
+            id=number,
+            guidebook=guidebook,
+            title=f"Покраска стен {number}",
+            price_by_unit=1000 + number,
+            unit_of_measurement=Work.UnitType.SQUARE_METER,
+            currency=Work.CurrencyType.RUB,
+        )
+        for number in range(1, rows + 1)
+    ]
+    values = [
+        {
+            "id": work.id,
+            "guidebook__id": guidebook.id,
+            "guidebook__title": guidebook.title,
+            "title": work.title,
+            "price_by_unit": work.price_by_unit,
+            "unit_of_measurement": work.unit_of_measurement,
+            "currency": work.currency,
+        }
+        for work in works
+    ]
+    return works, values
+
+
+def build_guidebooks(rows: int) -> tuple[list[GuideBook], list[dict]]:
+    guidebooks = [
+        GuideBook(id=number, title=f"Справочник {number}")
+        for number in range(1, rows + 1)
+    ]
+    values = [{"id": gb.id, "title": gb.title} for gb in guidebooks]
+    return guidebooks, values
+
+
+def best_rows_per_second(serialize, rows: int, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        serialize()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return rows / best
+
+
+def benchmark_serializers(rows: int = 1000, repeat: int = 5) -> list[dict]:
+    """
+    строк в секунду у DRF-сериализаторов и у FastOutputSerializer на тех же
+    данных (лучший из repeat прогонов), результаты сравниваются на равенство
+    """
+    results = []
+    for name, serializer_class, build in (
+        ("работы", WorkDataOutputSerializer, build_works),
+        ("справочники", ViewingDirectoryOnlyNameOutputSerializer, build_guidebooks),
+    ):
+        instances, values = build(rows)
+        fast = FastOutputSerializer(serializer_class)
+        drf_data = serializer_class(instances, many=True).data
+        fast_data = fast.many(values)
+        results.append(
+            {
+                "name": name,
+                "identical": [dict(item) for item in drf_data] == fast_data,
+                "drf_rows_per_second": best_rows_per_second(
+                    lambda: serializer_class(instances, many=True).data, rows, repeat
+                ),
+                "fast_rows_per_second": best_rows_per_second(
+                    lambda: fast.many(values), rows, repeat
+                ),
+            }
+        )
+    return results
@@ -0,0 +1,216 @@
+import hashlib
+import threading
+import time
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Callable, Union
+
+from django.conf import settings
+from django.core.cache import cache
+
+from company.models import CompanyRoleUser
+from guidebook.models import ExchangeRate
+
+
+class CompanyRolesCache:
+    """
+    Кэш ролей пользователя в компании между запросами.
+    Сбрасывается сигналами на сохранение и удаление CompanyRoleUser,
+    таймаут страхует от изменений в обход сигналов (queryset.update/delete).
+    """
+
+    key_template = "guidebook:company_roles:{user_id}:{company_id}"
+
+    @classmethod
+    def get_key(cls, user_id: int, company_id: int) -> str:
+        return cls.key_template.format(user_id=user_id, company_id=company_id)
+
+    @classmethod
+    def get_timeout(cls) -> int:
+        return getattr(settings, "GUIDEBOOK_ROLES_CACHE_TIMEOUT", 60 * 15)
+
+    @classmethod
+    def get_roles(cls, user_id: int, company_id: int) -> frozenset[str]:
+        """роли пользователя в компании, из кэша или из базы"""
+        key = cls.get_key(user_id, company_id)
+        roles = cache.get(key)
+        if roles is None:
+            roles = tuple(
+                CompanyRoleUser.objects.filter(
+                    user_id=user_id, company_id=company_id
+                ).values_list("role", flat=True)
+            )
+            cache.set(key, roles, cls.get_timeout())
+        return frozenset(roles)
+
+    @classmethod
+    async def aget_roles(cls, user_id: int, company_id: int) -> frozenset[str]:
+        """асинхронная версия get_roles"""
+        key = cls.get_key(user_id, company_id)
+        roles = await cache.aget(key)
+        if roles is None:
+            roles = tuple(
+                [
+                    role
+                    async for role in CompanyRoleUser.objects.filter(
+                        user_id=user_id, company_id=company_id
+                    ).values_list("role", flat=True)
+                ]
+            )
+            await cache.aset(key, roles, cls.get_timeout())
+        return frozenset(roles)
+
+    @classmethod
+    def invalidate(cls, user_id: int, company_id: int) -> None:
+        cache.delete(cls.get_key(user_id, company_id))
+
+
+class GuideBookResponseCache:
+    """
+    Кэш данных ответов чтения справочника (детально и список работ).
+    Ключ содержит версию справочника, поэтому любое изменение справочника,
+    вложенного справочника или работы сразу делает старые ключи недоступными,
+    они вытесняются по таймауту. Холодный ключ считает только один запрос:
+    остальные ждут его результат под блокировкой через cache.add.
+    """
+
+    key_template = "guidebook:response:{name}:{pk}:{version}:{digest}"
+    lock_suffix = ":lock"
+    stats_key_template = "guidebook:response_cache:{name}"
+    lock_timeout = 30  # блокировка снимается сама, если вычисление упало
+    lock_wait = 0.05  # пауза между проверками готовности ключа, секунд
+    lock_attempts = 40  # сколько раз ждать, потом посчитать самостоятельно
+
+    @classmethod
+    def get_timeout(cls) -> int:
+        return getattr(settings, "GUIDEBOOK_RESPONSE_CACHE_TIMEOUT", 60 * 10)
+
+    @classmethod
+    def get_key(cls, name: str, guidebook, request) -> str:
+        digest = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        return cls.key_template.format(
+            name=name, pk=guidebook.pk, version=guidebook.version, digest=digest
+        )
+
+    @classmethod
+    def count(cls, name: str) -> None:
+        key = cls.stats_key_template.format(name=name)
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key)
+        except ValueError:  # ключ вытеснен между add и incr
+            cache.add(key, 1, None)
+
+    @classmethod
+    def get_stats(cls) -> dict[str, int]:
+        """счетчики попаданий и промахов кэша"""
+        keys = {
+            name: cls.stats_key_template.format(name=name)
+            for name in ("hits", "misses")
+        }
+        values = cache.get_many(keys.values())
+        return {name: values.get(key, 0) for name, key in keys.items()}
+
+    @classmethod
+    def reset_stats(cls) -> None:
+        cache.delete_many(
+            [cls.stats_key_template.format(name=name) for name in ("hits", "misses")]
+        )
+
+    @classmethod
+    def get_or_set(cls, name: str, guidebook, request, loader: Callable[[], Any]):
+        """данные ответа из кэша или из loader, loader вызывается один раз на ключ"""
+        key = cls.get_key(name, guidebook, request)
+        # значение хранится в кортеже, чтобы отличать закэшированный None от промаха
+        cached = cache.get(key)
+        if cached is not None:
+            cls.count("hits")
+            return cached[0]
+
+        lock_key = key + cls.lock_suffix
+        if not cache.add(lock_key, 1, cls.lock_timeout):
+            for _ in range(cls.lock_attempts):
+                time.sleep(cls.lock_wait)
+                cached = cache.get(key)
+                if cached is not None:
+                    cls.count("hits")
+                    return cached[0]
+            lock_key = None
+
+        cls.count("misses")
+        try:
+            value = loader()
+            cache.set(key, (value,), cls.get_timeout())
+        finally:
+            if lock_key is not None:
+                cache.delete(lock_key)
+        return value
+
+
+class ExchangeRateCache:
+    """
+    Курсы валют к базовой валюте в памяти процесса: загружаются одним запросом,
+    пересчет цены работы не обращается к базе. Версия курсов хранится в общем кэше,
+    после загрузки новых курсов все процессы перечитывают их при следующем обращении,
+    таймаут страхует от изменений в обход ExchangeRateService.
+    """
+
+    version_key = "guidebook:exchange_rates:version"
+    lock = threading.Lock()
+    rates: dict[str, Decimal] = None
+    version = None
+    loaded_at = 0.0
+
+    @classmethod
+    def get_base_currency(cls) -> str:
+        return getattr(settings, "GUIDEBOOK_BASE_CURRENCY", "rub")
+
+    @classmethod
+    def get_timeout(cls) -> int:
+        return getattr(settings, "GUIDEBOOK_EXCHANGE_RATES_TIMEOUT", 60 * 5)
+
+    @classmethod
+    def load_rates(cls) -> dict[str, Decimal]:
+        """курсы по валютам из базы в обход кэша, у базовой валюты курс 1"""
+        rates = dict(ExchangeRate.objects.values_list("currency", "rate"))
+        rates[cls.get_base_currency()] = Decimal(1)
+        return rates
+
+    @classmethod
+    def get_rates(cls) -> dict[str, Decimal]:
+        """курсы по валютам, у базовой валюты курс 1"""
+        version = cache.get(cls.version_key)
+        with cls.lock:
+            if (
+                cls.rates is None
+                or version != cls.version
+                or time.monotonic() - cls.loaded_at > cls.get_timeout()
+            ):
+                cls.rates = cls.load_rates()
+                cls.version = version
+                cls.loaded_at = time.monotonic()
+            return cls.rates
+
+    @classmethod
+    def normalize(
+        cls, price: int, currency: str, rates: dict[str, Decimal] = None
+    ) -> Union[Decimal, None]:
+        """
+        цена в базовой валюте с округлением до копеек, без курса валюты - None,
+        rates - курсы из get_rates, полученные один раз на всю пачку работ
+        """
+        if rates is None:
+            rates = cls.get_rates()
+        rate = rates.get(currency)
+        if rate is None or price is None:
+            return None
+        return (price * rate).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """
+        курсы изменились: этот процесс и остальные перечитают их из базы.
+        Вызывается после коммита, иначе процессы успеют закэшировать старые курсы
+        """
+        cache.set(cls.version_key, time.time_ns(), None)
+        with cls.lock:
+            cls.rates = None
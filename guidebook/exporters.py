@@ -0,0 +1,96 @@
+import csv
+from typing import Iterator, Union
+
+from guidebook.importers import CATALOG_COLUMNS, CATALOG_PATH_SEPARATOR
+from guidebook.models import GuideBook, Work
+from guidebook.renderers import dumps
+from guidebook.service import GuideBookService
+
+EXPORT_CHUNK_SIZE = 2000  # сколько строк читать из курсора и отдавать клиенту за раз
+
+
+class Echo:
+    """Псевдо-файл для csv.writer: возвращает записанную строку вместо записи"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def get_subtree_paths(root: GuideBook) -> dict[int, str]:
+    """
+    пути из названий ("Отделка/Стены/Штукатурка") от корня компании
+    для справочника и всех его потомков, два запроса
+    """
+    prefix = [guidebook.title for guidebook in GuideBookService.get_ancestors(root)]
+    names = {}
+    for row in (
+        GuideBookService.get_descendants(root, include_self=True)
+        .order_by("depth", "id")
+        .values("id", "title", "parent_guide_book_id")
+    ):
+        if row["id"] == root.pk:
+            names[row["id"]] = prefix + [row["title"]]
+        elif row["parent_guide_book_id"] in names:
+            names[row["id"]] = names[row["parent_guide_book_id"]] + [row["title"]]
+    return {pk: CATALOG_PATH_SEPARATOR.join(titles) for pk, titles in names.items()}
+
+
+def iter_subtree_works(root: GuideBook) -> Iterator[tuple]:
+    """
+    работы справочника и всех его потомков в формате колонок прайс-листа,
+    читаются через серверный курсор пачками по EXPORT_CHUNK_SIZE
+    """
+    paths = get_subtree_paths(root)
+    works = (
+        Work.objects.filter(
+            guidebook__path__startswith=root.path,
+            guidebook__is_delete=False,
+            is_delete=False,
+        )
+        .order_by("guidebook_id", "id")
+        .values_list(
+            "guidebook_id", "title", "price_by_unit", "unit_of_measurement", "currency"
+        )
+    )
+    for guidebook_id, *values in works.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        path = paths.get(guidebook_id)
+        if path is not None:
+            yield (path, *values)
+
+
+def iter_chunks(
+    lines: Iterator[Union[str, bytes]], separator: Union[str, bytes] = ""
+) -> Iterator[Union[str, bytes]]:
+    """склеивает строки в куски по EXPORT_CHUNK_SIZE, чтобы не отдавать по одной"""
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= EXPORT_CHUNK_SIZE:
+            yield separator.join(chunk)
+            chunk = []
+    if chunk:
+        yield separator.join(chunk)
+
+
+def export_csv(root: GuideBook) -> Iterator[str]:
+    """поток csv в формате, который принимает импорт прайс-листа"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(CATALOG_COLUMNS)
+    yield from iter_chunks(writer.writerow(row) for row in iter_subtree_works(root))
+
+
+def export_ndjson(root: GuideBook) -> Iterator[bytes]:
+    """поток JSON Lines: одна работа - один объект на строке"""
+    yield from iter_chunks(
+        (
+            dumps(dict(zip(CATALOG_COLUMNS, row))) + b"\n"
+            for row in iter_subtree_works(root)
+        ),
+        separator=b"",
+    )
+
+
+EXPORT_FORMATS = {
+    "csv": (export_csv, "text/csv; charset=utf-8"),
+    "ndjson": (export_ndjson, "application/x-ndjson; charset=utf-8"),
+}
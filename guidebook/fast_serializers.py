@@ -0,0 +1,96 @@
+import time
+from functools import cached_property
+from typing import Iterable
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+
+from guidebook.metrics import current_recorder
+
+# поля, которые выводятся простым приведением типа, как в их to_representation
+FAST_CONVERTERS = (
+    (serializers.BooleanField, bool),
+    (serializers.IntegerField, int),
+    (serializers.FloatField, float),
+    (serializers.CharField, str),
+    (serializers.ChoiceField, str),
+)
+
+
+class FastOutputSerializer:
+    """
+    Быстрый вывод строк `.values()` в словари по объявлению выходного сериализатора.
+    Поля и порядок ключей берутся из serializer_class, вложенный сериализатор
+    читает колонки с префиксом (guidebook -> guidebook__id, guidebook__title).
+    Результат совпадает с serializer_class(instance).data, но без машинерии
+    полей DRF на каждую строку. Сам serializer_class остается для схемы API.
+    """
+
+    def __init__(self, serializer_class: type[serializers.Serializer]):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def plan(self) -> list[tuple]:
+        return self.build_plan(self.serializer_class(), "")
+
+    @cached_property
+    def lookups(self) -> tuple[str, ...]:
+        """поля для queryset.values()"""
+        return tuple(self.iter_lookups(self.plan))
+
+    def build_plan(self, serializer: serializers.Serializer, prefix: str) -> list:
+        """(ключ, колонка, приведение типа, план вложенного сериализатора) по полям"""
+        plan = []
+        for name, field in serializer.fields.items():
+            if field.source == "*" or isinstance(field, serializers.ListSerializer):
+                raise ImproperlyConfigured(
+                    f"{self.serializer_class.__name__}.{name}: "
+                    "source='*' и вложенные списки не поддерживаются."
+                )
+            lookup = prefix + field.source.replace(".", "__")
+            if isinstance(field, serializers.BaseSerializer):
+                plan.append((name, None, None, self.build_plan(field, lookup + "__")))
+                continue
+            converter = next(
+                (
+                    convert
+                    for field_class, convert in FAST_CONVERTERS
+                    if isinstance(field, field_class)
+                ),
+                field.to_representation,
+            )
+            plan.append((name, lookup, converter, None))
+        return plan
+
+    def iter_lookups(self, plan: list) -> Iterable[str]:
+        for _, lookup, _, nested in plan:
+            if nested is not None:
+                yield from self.iter_lookups(nested)
+            else:
+                yield lookup
+
+    def build(self, plan: list, row: dict) -> dict:
+        data = {}
+        for name, lookup, converter, nested in plan:
+            if nested is not None:
+                value = self.build(nested, row)
+                # как у DRF: пустая связь выводится как None
+                if all(item is None for item in value.values()):
+                    value = None
+                data[name] = value
+            else:
+                value = row[lookup]
+                data[name] = None if value is None else converter(value)
+        return data
+
+    def to_representation(self, row: dict) -> dict:
+        return self.build(self.plan, row)
+
+    def many(self, rows: Iterable[dict]) -> list[dict]:
+        """словари для строк, время добавляется к замерам сериализации запроса"""
+        start = time.perf_counter()
+        data = [self.build(self.plan, row) for row in rows]
+        recorder = current_recorder.get()
+        if recorder is not None:
+            recorder.serializer_time += time.perf_counter() - start
+        return data
@@ -1,5 +1,41 @@
+from django.db import connections
+from django.db.models import F
 from rest_framework import filters
 
+from guidebook.serializers import WorkFilterInputSerializer
+
+SEARCH_CONFIG = "russian"  # конфигурация полнотекстового поиска PostgreSQL
+
+
+def search_by_title(queryset, search: str, search_mode: str = None):
+    """
+    Поиск по полю title.
+    contains (по умолчанию) - вхождение подстроки, на PostgreSQL использует триграммный индекс;
+    fulltext - полнотекстовый поиск с русской морфологией, отсортирован по релевантности,
+    на других СУБД (SQLite в тестах) ищет вхождение каждого слова запроса.
+    """
+    if search_mode != "fulltext":
+        return queryset.filter(title__icontains=search.lower()).order_by("id")
+
+    if connections[queryset.db].vendor == "postgresql":
+        from django.contrib.postgres.search import (
+            SearchQuery,
+            SearchRank,
+            SearchVector,
+        )
+
+        vector = SearchVector("title", config=SEARCH_CONFIG)
+        query = SearchQuery(search, config=SEARCH_CONFIG, search_type="websearch")
+        return (
+            queryset.annotate(search=vector, rank=SearchRank(vector, query))
+            .filter(search=query)
+            .order_by("-rank", "id")
+        )
+
+    for word in search.split():
+        queryset = queryset.filter(title__icontains=word.lower())
+    return queryset.order_by("id")
+
 
 class GuideBookFilter(filters.BaseFilterBackend):
     """
@@ -10,22 +46,47 @@ class GuideBookFilter(filters.BaseFilterBackend):
     def filter_queryset(self, request, queryset, view):
         search_param_1 = request.query_params.get("title", None)
         if search_param_1:
-            queryset = queryset.filter(title__icontains=search_param_1.lower())
+            return search_by_title(
+                queryset, search_param_1, request.query_params.get("search_mode")
+            )
 
         return queryset.order_by("id")
 
 
 class WorkFilter(filters.BaseFilterBackend):
     """
-    Кастомный фильтр, фильтрует по полю title.
+    Кастомный фильтр, фильтрует по полю title и по цене в базовой валюте
+    (normalized_price_min, normalized_price_max), сортирует по параметру ordering.
+    Работы без курса валюты в фильтр по цене не попадают.
     Возвращает список работ по pk справочника
     """
 
     def filter_queryset(self, request, queryset, view):
+        params = WorkFilterInputSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        price_min = params.validated_data.get("normalized_price_min", None)
+        price_max = params.validated_data.get("normalized_price_max", None)
+        if price_min is not None:
+            queryset = queryset.filter(normalized_price__gte=price_min)
+        if price_max is not None:
+            queryset = queryset.filter(normalized_price__lte=price_max)
+
         search_param_1 = request.query_params.get("title", None)
         if search_param_1:
-            queryset = queryset.filter(
-                title__icontains=search_param_1.lower(),
+            queryset = search_by_title(
+                queryset, search_param_1, request.query_params.get("search_mode")
             )
+        else:
+            queryset = queryset.order_by("id")
 
-        return queryset.order_by("id")
+        ordering = params.validated_data.get("ordering", None)
+        if ordering:
+            # без цены в базовой валюте - в конце списка при любом направлении
+            field = ordering.lstrip("-")
+            expression = (
+                F(field).desc(nulls_last=True)
+                if ordering.startswith("-")
+                else F(field).asc(nulls_last=True)
+            )
+            queryset = queryset.order_by(expression, "id")
+        return queryset
@@ -0,0 +1,254 @@
+import csv
+import io
+import zipfile
+from typing import BinaryIO, Callable, Iterator, Union
+
+from django.db import transaction
+from rest_framework import serializers
+
+from guidebook.models import GuideBook, Work
+from guidebook.service import GuideBookService, WorkService
+
+try:
+    import openpyxl
+    from openpyxl.utils.exceptions import InvalidFileException
+except ImportError:  # импорт xlsx доступен только с установленным openpyxl
+    openpyxl = None
+    InvalidFileException = None
+
+CATALOG_PATH_SEPARATOR = "/"  # разделитель справочников в колонке path
+CATALOG_ENCODINGS = ("utf-8", "cp1251")  # кодировки csv: utf-8 и выгрузка Excel
+CATALOG_COLUMNS = (
+    "path",
+    "title",
+    "price_by_unit",
+    "unit_of_measurement",
+    "currency",
+)
+
+
+class PriceCatalogImportError(Exception):
+    """Ошибка, из-за которой файл прайс-листа нельзя импортировать целиком"""
+
+
+class PriceCatalogRowInputSerializer(serializers.Serializer):
+    """сериализатор строки прайс-листа"""
+
+    path = serializers.CharField(required=False, default="")
+    title = serializers.CharField(max_length=150)
+    price_by_unit = serializers.IntegerField(min_value=0)
+    unit_of_measurement = serializers.ChoiceField(
+        choices=Work.UnitType.choices, default=Work.UnitType.LINEAR_METER
+    )
+    currency = serializers.ChoiceField(
+        choices=Work.CurrencyType.choices, default=Work.CurrencyType.RUB
+    )
+
+
+def read_csv_rows(file: BinaryIO, encoding: str = "utf-8") -> Iterator[dict]:
+    """читает строки csv (разделитель "," или ";") по одной"""
+    text = io.TextIOWrapper(
+        file, encoding="utf-8-sig" if encoding == "utf-8" else encoding, newline=""
+    )
+    try:
+        header = text.readline()
+        delimiter = ";" if header.count(";") > header.count(",") else ","
+        columns = [
+            column.strip().lower()
+            for column in next(csv.reader([header], delimiter=delimiter), [])
+        ]
+        for values in csv.reader(text, delimiter=delimiter):
+            yield dict(zip(columns, values))
+    except UnicodeDecodeError:
+        raise PriceCatalogImportError(
+            f"Файл не в кодировке {encoding}, укажите кодировку файла."
+        )
+
+
+def read_xlsx_rows(file: BinaryIO) -> Iterator[dict]:
+    """читает строки первого листа xlsx по одной, без загрузки книги в память"""
+    if openpyxl is None:
+        raise PriceCatalogImportError(
+            "Для импорта xlsx необходимо установить openpyxl."
+        )
+    try:
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError):
+        raise PriceCatalogImportError("Файл не является книгой xlsx или поврежден.")
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        columns = [str(column or "").strip().lower() for column in next(rows, ())]
+        for values in rows:
+            yield {
+                column: "" if value is None else str(value)
+                for column, value in zip(columns, values)
+            }
+    finally:
+        workbook.close()
+
+
+class PriceCatalogImporter:
+    """
+    Потоковый импорт прайс-листа в дерево справочников компании.
+    Колонки файла: path (например "Отделка/Стены/Штукатурка"), title, price_by_unit,
+    unit_of_measurement, currency. Недостающие справочники по пути создаются,
+    работы с тем же названием в справочнике обновляются, остальные создаются
+    пачками по batch_size. В памяти держится только текущая пачка и карта справочников.
+    Файл импортируется в одной транзакции: при ошибке чтения файла
+    (PriceCatalogImportError) ничего не сохраняется.
+    """
+
+    max_reported_errors = 1000  # сколько ошибок строк возвращать в отчете
+
+    def __init__(
+        self,
+        pk_company: int,
+        parent: GuideBook = None,
+        batch_size: int = 1000,
+        progress: Callable[[dict], None] = None,
+    ):
+        self.pk_company = pk_company
+        self.parent = parent
+        self.batch_size = batch_size
+        self.progress = progress
+        self.nodes = self.load_nodes()
+        self.batch = {}
+        self.report = {
+            "rows": 0,
+            "created": 0,
+            "updated": 0,
+            "guidebooks_created": 0,
+            "errors_count": 0,
+            "errors": [],
+        }
+
+    def load_nodes(self) -> dict[tuple[str, ...], int]:
+        """карта "путь из названий -> pk справочника" одним запросом"""
+        if self.parent is not None:
+            guidebooks = GuideBookService.get_descendants(self.parent)
+        else:
+            guidebooks = GuideBook.objects.filter(
+                company_id=self.pk_company, is_delete=False
+            )
+        names = {self.parent.pk: ()} if self.parent is not None else {None: ()}
+        nodes = {}
+        for row in guidebooks.order_by("depth", "id").values(
+            "id", "title", "parent_guide_book_id"
+        ):
+            parent_names = names.get(row["parent_guide_book_id"])
+            if parent_names is None:
+                continue
+            names[row["id"]] = parent_names + (row["title"],)
+            nodes.setdefault(names[row["id"]], row["id"])
+        return nodes
+
+    def get_guidebook_pk(self, path: str) -> int:
+        """pk справочника по пути, недостающие справочники создаются"""
+        titles = tuple(
+            title.strip()
+            for title in path.split(CATALOG_PATH_SEPARATOR)
+            if title.strip()
+        )
+        if not titles:
+            if self.parent is None:
+                raise serializers.ValidationError({"path": ["Обязательное поле."]})
+            return self.parent.pk
+        max_length = GuideBook._meta.get_field("title").max_length
+        if any(len(title) > max_length for title in titles):
+            message = f"Название справочника длиннее {max_length} символов."
+            raise serializers.ValidationError({"path": [message]})
+
+        parent_pk = self.parent.pk if self.parent is not None else None
+        for depth in range(1, len(titles) + 1):
+            pk = self.nodes.get(titles[:depth])
+            if pk is None:
+                pk = GuideBookService.create_guidebook(
+                    self.pk_company,
+                    title=titles[depth - 1],
+                    parent_guide_book=parent_pk,
+                ).pk
+                self.nodes[titles[:depth]] = pk
+                self.report["guidebooks_created"] += 1
+            parent_pk = pk
+        return parent_pk
+
+    def add_error(self, row_number: int, errors) -> None:
+        self.report["errors_count"] += 1
+        if len(self.report["errors"]) < self.max_reported_errors:
+            self.report["errors"].append({"row": row_number, "errors": errors})
+
+    def import_rows(self, rows: Iterator[dict]) -> dict:
+        """импортирует строки, номера строк в ошибках считаются с учетом заголовка"""
+        for row_number, row in enumerate(rows, start=2):
+            self.report["rows"] += 1
+            values = {
+                column: value.strip()
+                for column, value in row.items()
+                if column in CATALOG_COLUMNS and value and value.strip()
+            }
+            serializer = PriceCatalogRowInputSerializer(data=values)
+            if not serializer.is_valid():
+                self.add_error(row_number, serializer.errors)
+                continue
+            item = serializer.validated_data
+            try:
+                item["guidebook"] = self.get_guidebook_pk(item.pop("path"))
+            except serializers.ValidationError as error:
+                self.add_error(row_number, error.detail)
+                continue
+            # повтор работы внутри пачки - побеждает последняя строка
+            self.batch[(item["guidebook"], item["title"])] = item
+            if len(self.batch) >= self.batch_size:
+                self.flush()
+        self.flush()
+        return self.report
+
+    def import_file(
+        self, file: BinaryIO, file_format: str = "csv", encoding: str = "utf-8"
+    ) -> dict:
+        """импортирует файл, encoding - кодировка csv"""
+        if file_format == "xlsx":
+            rows = read_xlsx_rows(file)
+        else:
+            rows = read_csv_rows(file, encoding)
+        with transaction.atomic():
+            return self.import_rows(rows)
+
+    def flush(self) -> None:
+        """сохраняет пачку: обновляет найденные работы и создает остальные"""
+        if not self.batch:
+            return
+        existing = {
+            (work.guidebook_id, work.title): work
+            for work in Work.objects.filter(
+                guidebook_id__in={key[0] for key in self.batch},
+                title__in={key[1] for key in self.batch},
+                is_delete=False,
+            )
+        }
+        to_update, update_items, to_create = [], [], []
+        for key, item in self.batch.items():
+            work = existing.get(key)
+            if work is None:
+                to_create.append(item)
+            else:
+                to_update.append(work)
+                update_items.append(
+                    {
+                        "price_by_unit": item["price_by_unit"],
+                        "unit_of_measurement": item["unit_of_measurement"],
+                        "currency": item["currency"],
+                    }
+                )
+        WorkService.bulk_create_works(to_create)
+        WorkService.bulk_update_works(to_update, update_items, {})
+        self.report["created"] += len(to_create)
+        self.report["updated"] += len(to_update)
+        self.batch = {}
+        if self.progress is not None:
+            self.progress(self.report)
+
+
+def get_file_format(file_name: Union[str, None]) -> str:
+    """формат файла по расширению: xlsx или csv"""
+    return "xlsx" if (file_name or "").lower().endswith(".xlsx") else "csv"
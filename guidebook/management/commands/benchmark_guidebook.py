@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from guidebook.benchmarks.api import SCENARIOS, ApiBenchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Сценарии нагрузки на API справочников (list, detail, search, create, bulk): "
+        "p50/p95/p99, SQL-запросы на запрос и прочитанные строки (только PostgreSQL). "
+        "Данные готовятся командой seed_guidebook_catalog, изменения откатываются. "
+        "Работает на SQLite и PostgreSQL, не запускать на рабочей базе."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", type=int, required=True, help="pk компании")
+        parser.add_argument(
+            "--user", required=True, help="email пользователя с ролью author в компании"
+        )
+        parser.add_argument(
+            "--scenario", choices=SCENARIOS, action="append", dest="scenarios"
+        )
+        parser.add_argument("--requests", type=int, default=100)
+        parser.add_argument("--bulk-size", type=int, default=100)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--with-response-cache",
+            action="store_true",
+            help="не отключать кэш ответов справочников",
+        )
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(email=options["user"]).first()
+        if user is None:
+            raise CommandError("Пользователь не найден.")
+
+        benchmark = ApiBenchmark(
+            options["company"],
+            user,
+            requests=options["requests"],
+            bulk_size=options["bulk_size"],
+            seed=options["seed"],
+        )
+        if not benchmark.guidebook_ids:
+            raise CommandError("В компании нет справочников.")
+
+        test_settings = {"ALLOWED_HOSTS": ["testserver"]}
+        if not options["with_response_cache"]:
+            test_settings["GUIDEBOOK_RESPONSE_CACHE_TIMEOUT"] = 0
+        with override_settings(**test_settings):
+            results = benchmark.run(tuple(options["scenarios"] or SCENARIOS))
+
+        for result in results:
+            rows = result["rows_scanned_avg"]
+            rows_text = "нет данных" if rows is None else f"{rows:.0f}"
+            self.stdout.write(self.style.MIGRATE_HEADING(result["name"]))
+            self.stdout.write(
+                f"  p50 {result['p50_ms']:.2f} мс, p95 {result['p95_ms']:.2f} мс, "
+                f"p99 {result['p99_ms']:.2f} мс"
+            )
+            self.stdout.write(
+                f"  запросов к БД: в среднем {result['queries_avg']:.1f}, "
+                f"максимум {result['queries_max']}; строк прочитано: "
+                f"{rows_text}"
+            )
+            if result["errors"]:
+                self.stdout.write(
+                    self.style.ERROR(
+                        f"  ошибок: {result['errors']} из {result['requests']}"
+                    )
+                )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from guidebook.benchmarks.indexes import benchmark_indexes
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает планы (EXPLAIN) и время горячих запросов справочников "
+        "без составных/частичных индексов и с ними. Индексы удаляются на время "
+        "замера в откатываемой транзакции, запускать только на тестовой базе, "
+        "наполненной командой seed_guidebook_catalog."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", type=int, required=True, help="pk компании")
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--no-plans", action="store_true", help="не выводить планы")
+
+    def handle(self, *args, **options):
+        before, after = benchmark_indexes(options["company"], options["repeat"])
+
+        for result_before, result_after in zip(before, after):
+            self.stdout.write(self.style.MIGRATE_HEADING(result_before["name"]))
+            self.stdout.write(
+                f"  без индексов: медиана {result_before['median_ms']:.2f} мс, "
+                f"p95 {result_before['p95_ms']:.2f} мс"
+            )
+            self.stdout.write(
+                f"  с индексами:  медиана {result_after['median_ms']:.2f} мс, "
+                f"p95 {result_after['p95_ms']:.2f} мс"
+            )
+            if not options["no_plans"]:
+                self.stdout.write("  план без индексов:")
+                self.stdout.write(result_before["plan"])
+                self.stdout.write("  план с индексами:")
+                self.stdout.write(result_after["plan"])
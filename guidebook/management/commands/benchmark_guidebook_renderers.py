@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from guidebook.benchmarks.renderers import benchmark_renderers
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает JSONRenderer и FastJSONRenderer на большом дереве справочников "
+        "и на строках выгрузки ndjson. База данных не используется."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--nodes", type=int, default=2000)
+        parser.add_argument("--works", type=int, default=20, help="работ в узле")
+        parser.add_argument("--rows", type=int, default=100_000, help="строк выгрузки")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        results = benchmark_renderers(
+            options["nodes"], options["works"], options["rows"], options["repeat"]
+        )
+        self.stdout.write(f"движок FastJSONRenderer: {results['engine']}")
+        for name, title in (("tree", "дерево"), ("export", "выгрузка ndjson")):
+            result = results[name]
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            self.stdout.write(
+                f"  JSONRenderer: {result['default_ms']:.1f} мс, "
+                f"FastJSONRenderer: {result['fast_ms']:.1f} мс "
+                f"(x{result['default_ms'] / result['fast_ms']:.1f})"
+            )
+            if not result["identical"]:
+                self.stdout.write(self.style.ERROR("  результаты отличаются!"))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from guidebook.benchmarks.serializers import benchmark_serializers
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает скорость (строк в секунду) выходных DRF-сериализаторов "
+        "справочников и работ с быстрым выводом FastOutputSerializer. "
+        "База данных не используется."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        for result in benchmark_serializers(options["rows"], options["repeat"]):
+            drf = result["drf_rows_per_second"]
+            fast = result["fast_rows_per_second"]
+            self.stdout.write(self.style.MIGRATE_HEADING(result["name"]))
+            self.stdout.write(f"  DRF:     {drf:,.0f} строк/с")
+            self.stdout.write(f"  быстрый: {fast:,.0f} строк/с (x{fast / drf:.1f})")
+            if not result["identical"]:
+                self.stdout.write(self.style.ERROR("  результаты отличаются!"))
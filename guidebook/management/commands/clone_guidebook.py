@@ -0,0 +1,53 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework import serializers
+
+from guidebook.service import GuideBookService
+
+
+class Command(BaseCommand):
+    help = (
+        "Копирует справочник со всеми вложенными справочниками и работами "
+        "в компанию (шаблон прайс-листа для новой компании)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("guidebook", type=int, help="pk копируемого справочника")
+        parser.add_argument("--company", type=int, required=True, help="pk компании")
+        parser.add_argument("--parent", type=int, help="pk справочника назначения")
+        parser.add_argument(
+            "--price-multiplier", type=Decimal, help="множитель цен работ, например 1.15"
+        )
+
+    def handle(self, *args, **options):
+        guidebook = GuideBookService.get_guidebook(options["guidebook"])
+        if guidebook is None:
+            raise CommandError("Справочник не найден.")
+        parent = None
+        if options["parent"] is not None:
+            parent = GuideBookService.get_guidebook(options["parent"])
+            if parent is None or parent.company_id != options["company"]:
+                raise CommandError("Справочник назначения не найден в компании.")
+        if options["price_multiplier"] is not None and options["price_multiplier"] <= 0:
+            raise CommandError("Множитель цен должен быть больше нуля.")
+
+        start = time.perf_counter()
+        try:
+            report = GuideBookService.clone_guidebook(
+                guidebook,
+                options["company"],
+                parent=parent,
+                price_multiplier=options["price_multiplier"],
+            )
+        except serializers.ValidationError as error:
+            raise CommandError(str(error.detail))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Создан справочник {report['guidebook'].pk}: "
+                f"справочников {report['guidebooks_created']}, "
+                f"работ {report['works_created']} "
+                f"за {time.perf_counter() - start:.1f} с"
+            )
+        )
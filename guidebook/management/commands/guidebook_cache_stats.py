@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from guidebook.cache import GuideBookResponseCache
+
+
+class Command(BaseCommand):
+    help = "Счетчики попаданий и промахов кэша ответов справочников"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true", help="обнулить счетчики после вывода"
+        )
+
+    def handle(self, *args, **options):
+        stats = GuideBookResponseCache.get_stats()
+        total = stats["hits"] + stats["misses"]
+        hit_ratio = stats["hits"] / total * 100 if total else 0
+        self.stdout.write(
+            f"попаданий: {stats['hits']}, промахов: {stats['misses']}, "
+            f"доля попаданий: {hit_ratio:.1f}%"
+        )
+        if options["reset"]:
+            GuideBookResponseCache.reset_stats()
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from guidebook.importers import (
+    CATALOG_ENCODINGS,
+    PriceCatalogImporter,
+    PriceCatalogImportError,
+    get_file_format,
+)
+from guidebook.service import GuideBookService
+
+
+class Command(BaseCommand):
+    help = (
+        "Потоковый импорт прайс-листа (csv/xlsx) в справочники компании. "
+        "Колонки: path, title, price_by_unit, unit_of_measurement, currency"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("file", help="путь к файлу csv или xlsx")
+        parser.add_argument("--company", type=int, required=True, help="pk компании")
+        parser.add_argument(
+            "--parent", type=int, help="pk справочника, внутрь которого импортировать"
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--format", choices=["csv", "xlsx"], dest="file_format")
+        parser.add_argument(
+            "--encoding",
+            choices=CATALOG_ENCODINGS,
+            default="utf-8",
+            help="кодировка csv",
+        )
+
+    def handle(self, *args, **options):
+        parent = None
+        if options["parent"] is not None:
+            parent = GuideBookService.get_guidebook(options["parent"])
+            if parent is None or parent.company_id != options["company"]:
+                raise CommandError("Справочник не найден в компании.")
+
+        importer = PriceCatalogImporter(
+            options["company"],
+            parent=parent,
+            batch_size=options["batch_size"],
+            progress=lambda report: self.stdout.write(
+                f"строк: {report['rows']}, создано: {report['created']}, "
+                f"обновлено: {report['updated']}, ошибок: {report['errors_count']}"
+            ),
+        )
+        file_format = options["file_format"] or get_file_format(options["file"])
+        try:
+            with open(options["file"], "rb") as file:
+                report = importer.import_file(file, file_format, options["encoding"])
+        except PriceCatalogImportError as error:
+            raise CommandError(str(error))
+
+        for error in report["errors"]:
+            self.stderr.write(f"строка {error['row']}: {error['errors']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Импорт завершен. Строк: {report['rows']}, "
+                f"создано работ: {report['created']}, обновлено: {report['updated']}, "
+                f"создано справочников: {report['guidebooks_created']}, "
+                f"ошибок: {report['errors_count']}"
+            )
+        )
@@ -0,0 +1,56 @@
+import json
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from guidebook.cache import ExchangeRateCache
+from guidebook.models import Work
+from guidebook.service import ExchangeRateService
+
+DEFAULT_PATH = Path(__file__).resolve().parents[2] / "fixtures" / "exchange_rates.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Загружает курсы валют из файла "
+        '({"base": "rub", "rates": {"usd": "92.5"}}) и пересчитывает цены работ '
+        "в базовой валюте для изменившихся курсов"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?", default=str(DEFAULT_PATH), help="путь к файлу курсов"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Не удалось прочитать файл курсов: {error}")
+
+        base_currency = ExchangeRateCache.get_base_currency()
+        if data.get("base") != base_currency:
+            raise CommandError(
+                f"Базовая валюта файла {data.get('base')}, ожидается {base_currency}."
+            )
+        rates = {}
+        for currency, value in data.get("rates", {}).items():
+            if currency not in Work.CurrencyType.values:
+                raise CommandError(f"Неизвестная валюта {currency}.")
+            try:
+                rate = Decimal(str(value))
+            except InvalidOperation:
+                raise CommandError(f"Некорректный курс {currency}: {value}.")
+            if rate <= 0:
+                raise CommandError(f"Курс {currency} должен быть больше нуля.")
+            rates[currency] = rate
+
+        changed = ExchangeRateService.update_rates(rates)
+        if changed:
+            self.stdout.write(
+                self.style.SUCCESS(f"Обновлены курсы: {', '.join(changed)}")
+            )
+        else:
+            self.stdout.write("Курсы не изменились.")
@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from guidebook.benchmarks.load import compare_sync_async
+from guidebook.service import GuideBookService
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает пропускную способность синхронных и асинхронных вью чтения "
+        "справочника на одном воркере. Пользователь авторизуется сессией "
+        "(--user) или заголовком Authorization (--authorization). "
+        "Хост testserver должен быть в ALLOWED_HOSTS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--guidebook", type=int, required=True, help="pk справочника"
+        )
+        parser.add_argument("--user", help="email пользователя компании")
+        parser.add_argument("--authorization", help="значение заголовка Authorization")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument(
+            "--with-response-cache",
+            action="store_true",
+            help="не отключать кэш ответов синхронных вью",
+        )
+
+    def handle(self, *args, **options):
+        guidebook = GuideBookService.get_guidebook(options["guidebook"])
+        if guidebook is None:
+            raise CommandError("Справочник не найден.")
+        user = None
+        if options["user"]:
+            user = get_user_model().objects.filter(email=options["user"]).first()
+            if user is None:
+                raise CommandError("Пользователь не найден.")
+
+        # у асинхронных вью нет кэша ответов, по умолчанию сравниваем без него
+        cache_settings = (
+            {}
+            if options["with_response_cache"]
+            else {"GUIDEBOOK_RESPONSE_CACHE_TIMEOUT": 0}
+        )
+        with override_settings(**cache_settings):
+            results = compare_sync_async(
+                guidebook,
+                user=user,
+                authorization=options["authorization"],
+                requests=options["requests"],
+                concurrency=options["concurrency"],
+            )
+
+        for result in results:
+            self.stdout.write(self.style.MIGRATE_HEADING(result["name"]))
+            for kind, title in (("sync", "синхронное"), ("async", "асинхронное")):
+                stats = result[kind]
+                self.stdout.write(
+                    f"  {title}: {stats['rps']:.1f} запросов/с, "
+                    f"медиана {stats['median_ms']:.2f} мс, "
+                    f"p95 {stats['p95_ms']:.2f} мс, статусы {stats['statuses']}"
+                )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from guidebook.models import GuideBook
+from guidebook.service import GuideBookAggregateService
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчет агрегатов справочников (количество вложенных справочников, "
+        "работ и цены по валютам) для исправления расхождений"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--company",
+            type=int,
+            action="append",
+            help="pk компании, можно указать несколько раз (по умолчанию все)",
+        )
+
+    def handle(self, *args, **options):
+        pks_company = options["company"] or sorted(
+            set(GuideBook.objects.values_list("company_id", flat=True))
+        )
+        total = 0
+        for pk_company in pks_company:
+            fixed = GuideBookAggregateService.rebuild_company(pk_company)
+            total += fixed
+            self.stdout.write(f"компания {pk_company}: исправлено справочников {fixed}")
+        self.stdout.write(self.style.SUCCESS(f"Всего исправлено: {total}"))
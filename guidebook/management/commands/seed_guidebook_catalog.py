@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from guidebook.benchmarks.seed import seed_catalog, seed_companies
+
+
+class Command(BaseCommand):
+    help = (
+        "Наполняет компанию (--company) или новые компании (--companies) деревом "
+        "справочников и работами для бенчмарков. Не запускать на рабочей базе."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--company", type=int, help="pk компании")
+        parser.add_argument(
+            "--companies", type=int, help="сколько новых компаний создать"
+        )
+        parser.add_argument(
+            "--user", help="email пользователя, получающего роль author в новых компаниях"
+        )
+        parser.add_argument("--works", type=int, default=1_000_000)
+        parser.add_argument("--depth", type=int, default=4)
+        parser.add_argument("--branching", type=int, default=5)
+        parser.add_argument("--deleted-ratio", type=float, default=0.05)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if (options["company"] is None) == (options["companies"] is None):
+            raise CommandError("Укажите --company или --companies.")
+        catalog_options = {
+            "works": options["works"],
+            "depth": options["depth"],
+            "branching": options["branching"],
+            "deleted_ratio": options["deleted_ratio"],
+            "seed": options["seed"],
+        }
+
+        if options["companies"] is not None:
+            user = None
+            if options["user"]:
+                user = get_user_model().objects.filter(email=options["user"]).first()
+                if user is None:
+                    raise CommandError("Пользователь не найден.")
+            companies = seed_companies(
+                options["companies"],
+                user=user,
+                progress=self.write_progress,
+                **catalog_options,
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Создано компаний: {len(companies)}, "
+                    f"pk: {', '.join(str(company.pk) for company in companies)}"
+                )
+            )
+            return
+
+        guidebooks = seed_catalog(
+            options["company"], progress=self.write_progress, **catalog_options
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Создано справочников: {len(guidebooks)}, работ: {options['works']}"
+            )
+        )
+
+    def write_progress(self, count: int) -> None:
+        self.stdout.write(f"работ: {count}")
@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from typing import Union
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+current_recorder: ContextVar[Union["RequestRecorder", None]] = ContextVar(
+    "guidebook_request_recorder", default=None
+)
+
+
+class RequestRecorder:
+    """
+    Замеры одного запроса: SQL-запросы через connection.execute_wrapper
+    и время сериализации. Одинаковые SQL с одинаковыми параметрами
+    (например, один и тот же справочник, загруженный дважды) считаются дублями.
+    Запросы хранятся хэшами, текст SQL сохраняется только у дублей.
+    """
+
+    def __init__(self):
+        self.queries = Counter()
+        self.duplicate_sql = {}
+        self.query_count = 0
+        self.query_time = 0.0
+        self.serializer_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_time += time.perf_counter() - start
+            self.query_count += 1
+            key = hash((sql, repr(params)))
+            self.queries[key] += 1
+            if self.queries[key] == 2:
+                self.duplicate_sql[key] = sql[:200]
+
+    @property
+    def duplicate_count(self) -> int:
+        return sum(count - 1 for count in self.queries.values() if count > 1)
+
+    def get_duplicates(self, limit: int = 5) -> list[dict]:
+        """самые частые дубли запросов, sql обрезается до 200 символов"""
+        return [
+            {"sql": self.duplicate_sql[key], "count": count}
+            for key, count in self.queries.most_common(limit)
+            if count > 1
+        ]
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+
+class GuideBookMetrics:
+    """
+    Метрики запросов к API справочников в памяти процесса:
+    гистограммы времени ответа и числа SQL-запросов, сумма времени SQL
+    и сериализации, количество дублей запросов. Метки: view, method, status.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+            self.query_counts = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+            self.query_time = Counter()
+            self.serializer_time = Counter()
+            self.duplicate_queries = Counter()
+
+    def observe(
+        self, view: str, method: str, status: int, latency: float, recorder
+    ) -> None:
+        labels = (view, method, str(status))
+        with self.lock:
+            self.latency[labels].observe(latency)
+            self.query_counts[labels].observe(recorder.query_count)
+            self.query_time[labels] += recorder.query_time
+            self.serializer_time[labels] += recorder.serializer_time
+            self.duplicate_queries[labels] += recorder.duplicate_count
+
+    def render_prometheus(self) -> str:
+        """метрики в текстовом формате Prometheus"""
+        lines = []
+        with self.lock:
+            for name, help_text, histograms in (
+                (
+                    "guidebook_request_duration_seconds",
+                    "Время обработки запроса",
+                    self.latency,
+                ),
+                (
+                    "guidebook_request_queries",
+                    "Количество SQL-запросов на запрос",
+                    self.query_counts,
+                ),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for labels, histogram in sorted(histograms.items()):
+                    label_text = format_labels(labels)
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(
+                            f'{name}_bucket{{{label_text},le="{bound}"}} {count}'
+                        )
+                    lines.append(
+                        f'{name}_bucket{{{label_text},le="+Inf"}} {histogram.count}'
+                    )
+                    lines.append(f"{name}_sum{{{label_text}}} {histogram.sum}")
+                    lines.append(f"{name}_count{{{label_text}}} {histogram.count}")
+
+            for name, help_text, counter in (
+                (
+                    "guidebook_request_query_seconds_total",
+                    "Суммарное время SQL-запросов",
+                    self.query_time,
+                ),
+                (
+                    "guidebook_request_serializer_seconds_total",
+                    "Суммарное время сериализации",
+                    self.serializer_time,
+                ),
+                (
+                    "guidebook_request_duplicate_queries_total",
+                    "Повторные одинаковые SQL-запросы",
+                    self.duplicate_queries,
+                ),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for labels, value in sorted(counter.items()):
+                    lines.append(f"{name}{{{format_labels(labels)}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels: tuple[str, str, str]) -> str:
+    view, method, status = labels
+    return f'view="{view}",method="{method}",status="{status}"'
+
+
+metrics = GuideBookMetrics()
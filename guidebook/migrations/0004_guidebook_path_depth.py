@@ -0,0 +1,57 @@
+from django.db import migrations, models
+
+PATH_SEPARATOR = "/"
+
+
+def fill_hierarchy(apps, schema_editor):
+    """заполняем материализованный путь и уровень для существующих справочников"""
+    GuideBook = apps.get_model("guidebook", "GuideBook")
+    parents = dict(GuideBook.objects.values_list("id", "parent_guide_book_id"))
+    paths = {}
+
+    def get_path(pk):
+        chain = []
+        while pk is not None and pk not in paths:
+            chain.append(pk)
+            pk = parents.get(pk)
+        prefix = paths.get(pk, "")
+        for node in reversed(chain):
+            prefix = f"{prefix}{node}{PATH_SEPARATOR}"
+            paths[node] = prefix
+        return paths[chain[0]] if chain else prefix
+
+    guidebooks = []
+    for guidebook in GuideBook.objects.only("id", "parent_guide_book_id"):
+        guidebook.path = get_path(guidebook.id)
+        guidebook.depth = guidebook.path.count(PATH_SEPARATOR) - 1
+        guidebooks.append(guidebook)
+    GuideBook.objects.bulk_update(guidebooks, ["path", "depth"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("guidebook", "0003_alter_guidebook_options_alter_work_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="guidebook",
+            name="path",
+            field=models.CharField(
+                db_index=True,
+                default="",
+                editable=False,
+                max_length=255,
+                verbose_name="Материализованный путь",
+            ),
+        ),
+        migrations.AddField(
+            model_name="guidebook",
+            name="depth",
+            field=models.PositiveSmallIntegerField(
+                default=0, editable=False, verbose_name="Уровень вложенности"
+            ),
+        ),
+        migrations.RunPython(fill_hierarchy, migrations.RunPython.noop),
+    ]
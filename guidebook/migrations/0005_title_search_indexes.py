@@ -0,0 +1,57 @@
+from django.db import migrations
+
+# индексы создаются только на PostgreSQL, на других СУБД поиск работает без них
+SEARCH_INDEXES = [
+    # icontains: UPPER("title") LIKE UPPER('%...%')
+    (
+        "guidebook_guidebook_title_trgm_idx",
+        "guidebook_guidebook",
+        "gin (UPPER(title) gin_trgm_ops)",
+    ),
+    (
+        "guidebook_work_title_trgm_idx",
+        "guidebook_work",
+        "gin (UPPER(title) gin_trgm_ops)",
+    ),
+    # полнотекстовый поиск: выражение совпадает с SearchVector("title", config="russian")
+    (
+        "guidebook_guidebook_title_fts_idx",
+        "guidebook_guidebook",
+        "gin (to_tsvector('russian'::regconfig, COALESCE(title, '')))",
+    ),
+    (
+        "guidebook_work_title_fts_idx",
+        "guidebook_work",
+        "gin (to_tsvector('russian'::regconfig, COALESCE(title, '')))",
+    ),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, expression in SEARCH_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING {expression}"
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in SEARCH_INDEXES:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY не может выполняться внутри транзакции
+    atomic = False
+
+    dependencies = [
+        ("guidebook", "0004_guidebook_path_depth"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("company", "0001_initial"),
+        ("guidebook", "0005_title_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="guidebook",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_delete", False), ("parent_guide_book__isnull", True)
+                ),
+                fields=["company", "id"],
+                name="guidebook_company_roots_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="guidebook",
+            index=models.Index(
+                condition=models.Q(("is_delete", False)),
+                fields=["company", "depth", "id"],
+                name="guidebook_company_depth_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="guidebook",
+            index=models.Index(
+                condition=models.Q(("is_delete", False)),
+                fields=["parent_guide_book", "id"],
+                name="guidebook_parent_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="work",
+            index=models.Index(
+                condition=models.Q(("is_delete", False)),
+                fields=["guidebook", "id"],
+                name="work_guidebook_idx",
+            ),
+        ),
+    ]
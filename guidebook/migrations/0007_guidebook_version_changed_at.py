@@ -0,0 +1,28 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("guidebook", "0006_guidebook_work_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="guidebook",
+            name="version",
+            field=models.PositiveIntegerField(
+                default=1, editable=False, verbose_name="Версия данных справочника"
+            ),
+        ),
+        migrations.AddField(
+            model_name="guidebook",
+            name="changed_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                editable=False,
+                verbose_name="Дата изменения данных",
+            ),
+        ),
+    ]
@@ -0,0 +1,109 @@
+from collections import Counter, defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+
+PATH_SEPARATOR = "/"
+
+
+def fill_aggregates(apps, schema_editor):
+    """заполняем агрегаты справочников по существующим работам"""
+    GuideBook = apps.get_model("guidebook", "GuideBook")
+    Work = apps.get_model("guidebook", "Work")
+
+    guidebooks = list(
+        GuideBook.objects.only("id", "path", "parent_guide_book_id", "is_delete")
+    )
+    children = Counter(
+        guidebook.parent_guide_book_id
+        for guidebook in guidebooks
+        if not guidebook.is_delete
+    )
+    paths = {guidebook.id: guidebook.path for guidebook in guidebooks}
+    works = Counter()
+    stats = defaultdict(dict)
+    rows = (
+        Work.objects.filter(is_delete=False, guidebook__is_delete=False)
+        .values("guidebook_id", "currency")
+        .annotate(
+            count=Count("id"),
+            sum=Sum("price_by_unit"),
+            min=Min("price_by_unit"),
+            max=Max("price_by_unit"),
+        )
+        .order_by()
+    )
+    for row in rows:
+        works[row["guidebook_id"]] += row["count"]
+        path = paths.get(row["guidebook_id"], "")
+        for pk in path.split(PATH_SEPARATOR)[:-1]:
+            current = stats[int(pk)].get(row["currency"])
+            if current is None:
+                stats[int(pk)][row["currency"]] = {
+                    "count": row["count"],
+                    "sum": row["sum"],
+                    "min": row["min"],
+                    "max": row["max"],
+                }
+            else:
+                current["count"] += row["count"]
+                current["sum"] += row["sum"]
+                current["min"] = min(current["min"], row["min"])
+                current["max"] = max(current["max"], row["max"])
+
+    for guidebook in guidebooks:
+        guidebook.children_count = children[guidebook.id]
+        guidebook.works_count = works[guidebook.id]
+        guidebook.price_stats = stats.get(guidebook.id, {})
+        guidebook.subtree_works_count = sum(
+            value["count"] for value in guidebook.price_stats.values()
+        )
+    GuideBook.objects.bulk_update(
+        guidebooks,
+        ["children_count", "works_count", "subtree_works_count", "price_stats"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("guidebook", "0007_guidebook_version_changed_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="guidebook",
+            name="children_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                verbose_name="Количество вложенных справочников",
+            ),
+        ),
+        migrations.AddField(
+            model_name="guidebook",
+            name="works_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Количество работ"
+            ),
+        ),
+        migrations.AddField(
+            model_name="guidebook",
+            name="subtree_works_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Количество работ с вложенными"
+            ),
+        ),
+        migrations.AddField(
+            model_name="guidebook",
+            name="price_stats",
+            field=models.JSONField(
+                default=dict,
+                editable=False,
+                help_text='{"rub": {"count": 2, "sum": 3000, "min": 1000, "max": 2000}}',
+                verbose_name="Цены работ с вложенными по валютам",
+            ),
+        ),
+        migrations.RunPython(fill_aggregates, migrations.RunPython.noop),
+    ]
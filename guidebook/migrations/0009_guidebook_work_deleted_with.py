@@ -0,0 +1,86 @@
+from importlib import import_module
+
+from django.db import migrations, models
+
+fill_aggregates = import_module(
+    "guidebook.migrations.0008_guidebook_aggregates"
+).fill_aggregates
+
+
+def mark_deleted_guidebooks(apps, schema_editor):
+    """
+    удаленные ранее справочники восстанавливаются сами по себе, оставшиеся
+    не удаленными вложенные справочники и работы удаляются вместе с ближайшим
+    удаленным предком, после чего агрегаты пересчитываются
+    """
+    GuideBook = apps.get_model("guidebook", "GuideBook")
+    Work = apps.get_model("guidebook", "Work")
+    GuideBook.objects.filter(is_delete=True).update(deleted_with=models.F("id"))
+
+    orphans_found = False
+    # от глубоких к корню: потомки помечаются ближайшим удаленным предком
+    roots = (
+        GuideBook.objects.filter(is_delete=True)
+        .exclude(path="")
+        .order_by("-depth", "id")
+    )
+    for root_id, path in roots.values_list("id", "path").iterator():
+        subtree = GuideBook.objects.filter(path__startswith=path)
+        works = Work.objects.filter(
+            guidebook_id__in=subtree.values("id"), is_delete=False
+        ).update(is_delete=True, deleted_with=root_id)
+        guidebooks = subtree.filter(is_delete=False).update(
+            is_delete=True, deleted_with=root_id
+        )
+        orphans_found = orphans_found or bool(works or guidebooks)
+    if orphans_found:
+        fill_aggregates(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("guidebook", "0008_guidebook_aggregates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="guidebook",
+            name="deleted_with",
+            field=models.PositiveIntegerField(
+                blank=True,
+                editable=False,
+                help_text="pk справочника, с поддеревом которого удален, для восстановления",
+                null=True,
+                verbose_name="Удален вместе со справочником",
+            ),
+        ),
+        migrations.AddField(
+            model_name="work",
+            name="deleted_with",
+            field=models.PositiveIntegerField(
+                blank=True,
+                editable=False,
+                help_text="pk справочника, с поддеревом которого удалена, для восстановления",
+                null=True,
+                verbose_name="Удалена вместе со справочником",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="guidebook",
+            index=models.Index(
+                condition=models.Q(deleted_with__isnull=False),
+                fields=["deleted_with"],
+                name="guidebook_deleted_with_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="work",
+            index=models.Index(
+                condition=models.Q(deleted_with__isnull=False),
+                fields=["deleted_with"],
+                name="work_deleted_with_idx",
+            ),
+        ),
+        migrations.RunPython(mark_deleted_guidebooks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_base_currency_prices(apps, schema_editor):
+    """цены в базовой валюте не требуют курса, остальные - после load_exchange_rates"""
+    Work = apps.get_model("guidebook", "Work")
+    Work.objects.filter(
+        currency=getattr(settings, "GUIDEBOOK_BASE_CURRENCY", "rub")
+    ).update(normalized_price=models.F("price_by_unit"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("guidebook", "0009_guidebook_work_deleted_with"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExchangeRate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("is_delete", models.BooleanField(default=False)),
+                (
+                    "currency",
+                    models.CharField(
+                        choices=[
+                            ("rub", "Рубль"),
+                            ("usd", "Доллар США"),
+                            ("eur", "Евро"),
+                        ],
+                        max_length=3,
+                        unique=True,
+                        verbose_name="Валюта",
+                    ),
+                ),
+                (
+                    "rate",
+                    models.DecimalField(
+                        decimal_places=6,
+                        help_text="стоимость одной единицы валюты в базовой валюте",
+                        max_digits=18,
+                        verbose_name="Курс",
+                    ),
+                ),
+                (
+                    "changed_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name="Дата изменения курса",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Курс валюты",
+                "verbose_name_plural": "Курсы валют",
+            },
+        ),
+        migrations.AddField(
+            model_name="work",
+            name="normalized_price",
+            field=models.DecimalField(
+                blank=True,
+                decimal_places=2,
+                editable=False,
+                help_text="пересчитывается по курсам ExchangeRate, без курса валюты - пусто",
+                max_digits=18,
+                null=True,
+                verbose_name="Цена за одну единицу в базовой валюте",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="work",
+            index=models.Index(
+                condition=models.Q(is_delete=False),
+                fields=["guidebook", "normalized_price"],
+                name="work_guidebook_price_idx",
+            ),
+        ),
+        migrations.RunPython(fill_base_currency_prices, migrations.RunPython.noop),
+    ]
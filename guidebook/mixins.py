@@ -0,0 +1,146 @@
+import hashlib
+import json
+import logging
+import time
+
+from django.db import connection
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from guidebook.metrics import RequestRecorder, current_recorder, metrics
+from guidebook.models import GuideBook
+from guidebook.renderers import GUIDEBOOK_RENDERER_CLASSES
+
+logger = logging.getLogger("guidebook.metrics")
+
+
+class ConditionalGetMixin:
+    """
+    Условный GET по версии справочника: ETag и Last-Modified строятся
+    из GuideBook.version и GuideBook.changed_at, которые увеличиваются при любом
+    изменении справочника, вложенных справочников или работ.
+    Вью вызывает get_not_modified_response до тяжелых запросов и, если получен
+    ответ 304, сразу его возвращает.
+    """
+
+    conditional_guidebook: GuideBook = None
+    conditional_parts: tuple = ()
+
+    def get_etag(self, request, guidebook: GuideBook, *parts) -> str:
+        """ETag: версия справочника + хеш адреса запроса, формата ответа и частей"""
+        accepted_renderer = getattr(request, "accepted_renderer", None)
+        key = "|".join(
+            [
+                request.get_full_path(),
+                getattr(accepted_renderer, "format", "") or "",
+                *(str(part) for part in parts),
+            ]
+        )
+        digest = hashlib.md5(key.encode()).hexdigest()[:12]
+        return quote_etag(f"{guidebook.pk}-{guidebook.version}-{digest}")
+
+    def get_last_modified(self, guidebook: GuideBook) -> int:
+        return int(guidebook.changed_at.timestamp())
+
+    def get_not_modified_response(self, request, guidebook: GuideBook, *parts):
+        """ответ 304 если у клиента актуальная версия, иначе None"""
+        self.conditional_guidebook = guidebook
+        self.conditional_parts = parts
+        return get_conditional_response(
+            request,
+            etag=self.get_etag(request, guidebook, *parts),
+            last_modified=self.get_last_modified(guidebook),
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        guidebook = self.conditional_guidebook
+        if guidebook is not None and response.status_code in (200, 304):
+            response["ETag"] = self.get_etag(
+                request, guidebook, *self.conditional_parts
+            )
+            response["Last-Modified"] = http_date(self.get_last_modified(guidebook))
+            # клиент может хранить ответ, но обязан перепроверять его по ETag
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+_timed_serializers = {}
+
+
+def get_timed_serializer(serializer_class):
+    """
+    подкласс сериализатора, добавляющий время to_representation к замерам
+    текущего запроса, с many=True время складывается по элементам
+    """
+    timed = _timed_serializers.get(serializer_class)
+    if timed is None:
+
+        def to_representation(self, instance):
+            start = time.perf_counter()
+            try:
+                return super(timed, self).to_representation(instance)
+            finally:
+                recorder = current_recorder.get()
+                if recorder is not None:
+                    recorder.serializer_time += time.perf_counter() - start
+
+        timed = type(
+            serializer_class.__name__,
+            (serializer_class,),
+            {
+                "__module__": serializer_class.__module__,
+                "to_representation": to_representation,
+            },
+        )
+        _timed_serializers[serializer_class] = timed
+    return timed
+
+
+class InstrumentationMixin:
+    """
+    Замеры запроса к вью: время ответа, количество и время SQL-запросов,
+    дубли одинаковых запросов и время выходного сериализатора.
+    Пишутся в метрики процесса (guidebook.metrics) и в лог guidebook.metrics
+    одной JSON-строкой, при дублях запросов - с уровнем WARNING.
+    Задает вью справочников рендеры с FastJSONRenderer.
+    """
+
+    renderer_classes = GUIDEBOOK_RENDERER_CLASSES
+
+    def dispatch(self, request, *args, **kwargs):
+        recorder = RequestRecorder()
+        token = current_recorder.set(recorder)
+        if getattr(self, "output_serializer_class", None) is not None:
+            self.output_serializer_class = get_timed_serializer(
+                self.output_serializer_class
+            )
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(recorder):
+                response = super().dispatch(request, *args, **kwargs)
+        finally:
+            current_recorder.reset(token)
+        self.record_metrics(request, response, time.perf_counter() - start, recorder)
+        return response
+
+    def record_metrics(self, request, response, latency: float, recorder) -> None:
+        view = type(self).__name__
+        metrics.observe(view, request.method, response.status_code, latency, recorder)
+
+        payload = {
+            "view": view,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(latency * 1000, 2),
+            "queries": recorder.query_count,
+            "query_ms": round(recorder.query_time * 1000, 2),
+            "serializer_ms": round(recorder.serializer_time * 1000, 2),
+            "duplicate_queries": recorder.duplicate_count,
+        }
+        if recorder.duplicate_count:
+            payload["duplicates"] = recorder.get_duplicates()
+            logger.warning(json.dumps(payload, ensure_ascii=False))
+        else:
+            logger.info(json.dumps(payload, ensure_ascii=False))
@@ -1,8 +1,10 @@
 from django.db import models
+from django.utils import timezone
 
 from core.base.models import BaseModel
 
 NULLABLE = {"blank": True, "null": True}
+PATH_SEPARATOR = "/"  # разделитель pk в материализованном пути справочника
 
 
 class GuideBook(BaseModel):
@@ -25,15 +27,102 @@ class GuideBook(BaseModel):
         verbose_name="Родительский справочник",
         **NULLABLE,
     )
+    path = models.CharField(
+        max_length=255,
+        default="",
+        db_index=True,
+        editable=False,
+        verbose_name="Материализованный путь",
+    )
+    depth = models.PositiveSmallIntegerField(
+        default=0, editable=False, verbose_name="Уровень вложенности"
+    )
+    version = models.PositiveIntegerField(
+        default=1, editable=False, verbose_name="Версия данных справочника"
+    )
+    changed_at = models.DateTimeField(
+        default=timezone.now, editable=False, verbose_name="Дата изменения данных"
+    )
+    children_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Количество вложенных справочников"
+    )
+    works_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Количество работ"
+    )
+    subtree_works_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="Количество работ с вложенными"
+    )
+    price_stats = models.JSONField(
+        default=dict,
+        editable=False,
+        verbose_name="Цены работ с вложенными по валютам",
+        help_text='{"rub": {"count": 2, "sum": 3000, "min": 1000, "max": 2000}}',
+    )
+    deleted_with = models.PositiveIntegerField(
+        editable=False,
+        verbose_name="Удален вместе со справочником",
+        help_text="pk справочника, с поддеревом которого удален, для восстановления",
+        **NULLABLE,
+    )
 
     class Meta:
         verbose_name = "Справочник"
         verbose_name_plural = "Справочники"
+        indexes = [
+            # справочники первого уровня компании
+            models.Index(
+                fields=["company", "id"],
+                condition=models.Q(is_delete=False, parent_guide_book__isnull=True),
+                name="guidebook_company_roots_idx",
+            ),
+            # дерево справочников компании по уровням
+            models.Index(
+                fields=["company", "depth", "id"],
+                condition=models.Q(is_delete=False),
+                name="guidebook_company_depth_idx",
+            ),
+            # вложенные справочники
+            models.Index(
+                fields=["parent_guide_book", "id"],
+                condition=models.Q(is_delete=False),
+                name="guidebook_parent_idx",
+            ),
+            # поддерево, удаленное вместе со справочником
+            models.Index(
+                fields=["deleted_with"],
+                condition=models.Q(deleted_with__isnull=False),
+                name="guidebook_deleted_with_idx",
+            ),
+        ]
 
     def __str__(self):
         result = f"СПРАВОЧНИК-{self.title}, КОМПАНИИ-{self.company.name}"
         return result
 
+    @staticmethod
+    def build_path(parent_path: str, pk: int) -> str:
+        """путь справочника: путь родителя + собственный pk, например "1/5/12/" """
+        return f"{parent_path}{pk}{PATH_SEPARATOR}"
+
+    @property
+    def ancestor_ids(self) -> list[int]:
+        """pk всех предков справочника от корня к родителю"""
+        return [int(pk) for pk in self.path.split(PATH_SEPARATOR)[:-2]]
+
+    @staticmethod
+    def format_price_stats(price_stats: dict) -> dict:
+        """цены по валютам для вывода: количество, минимум, максимум и среднее"""
+        return {
+            currency: {
+                "count": stats["count"],
+                "min": stats["min"],
+                "max": stats["max"],
+                "avg": round(stats["sum"] / stats["count"], 2),
+            }
+            for currency, stats in sorted(price_stats.items())
+            if stats["count"]
+        }
+
 
 class Work(BaseModel):
     """базовая модель работы"""
@@ -79,10 +168,44 @@ class Work(BaseModel):
         verbose_name="Валюта",
         db_default=None,
     )
+    normalized_price = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        editable=False,
+        verbose_name="Цена за одну единицу в базовой валюте",
+        help_text="пересчитывается по курсам ExchangeRate, без курса валюты - пусто",
+        **NULLABLE,
+    )
+    deleted_with = models.PositiveIntegerField(
+        editable=False,
+        verbose_name="Удалена вместе со справочником",
+        help_text="pk справочника, с поддеревом которого удалена, для восстановления",
+        **NULLABLE,
+    )
 
     class Meta:
         verbose_name = "Работа в справочнике"
         verbose_name_plural = "Работы в справочнике"
+        indexes = [
+            # работы справочника по порядку id
+            models.Index(
+                fields=["guidebook", "id"],
+                condition=models.Q(is_delete=False),
+                name="work_guidebook_idx",
+            ),
+            # работы справочника по цене в базовой валюте
+            models.Index(
+                fields=["guidebook", "normalized_price"],
+                condition=models.Q(is_delete=False),
+                name="work_guidebook_price_idx",
+            ),
+            # работы, удаленные вместе с поддеревом справочника
+            models.Index(
+                fields=["deleted_with"],
+                condition=models.Q(deleted_with__isnull=False),
+                name="work_deleted_with_idx",
+            ),
+        ]
 
     def __str__(self):
         result = (
@@ -90,3 +213,30 @@ class Work(BaseModel):
             f"КОМПАНИИ-{self.guidebook.company.name}"
         )
         return result
+
+
+class ExchangeRate(BaseModel):
+    """курс валюты к базовой валюте (settings.GUIDEBOOK_BASE_CURRENCY)"""
+
+    currency = models.CharField(
+        choices=Work.CurrencyType,
+        max_length=3,
+        unique=True,
+        verbose_name="Валюта",
+    )
+    rate = models.DecimalField(
+        max_digits=18,
+        decimal_places=6,
+        verbose_name="Курс",
+        help_text="стоимость одной единицы валюты в базовой валюте",
+    )
+    changed_at = models.DateTimeField(
+        default=timezone.now, verbose_name="Дата изменения курса"
+    )
+
+    class Meta:
+        verbose_name = "Курс валюты"
+        verbose_name_plural = "Курсы валют"
+
+    def __str__(self):
+        return f"КУРС-{self.currency}: {self.rate}"
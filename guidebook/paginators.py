@@ -1,4 +1,4 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 
 class Pagination(PageNumberPagination):
@@ -7,3 +7,32 @@ class Pagination(PageNumberPagination):
         "page_size"  # количество выведенных записей (вводит пользователь)
     )
     max_page_size = 10  # максимальное количество сущностей на 1 странице
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Постраничный вывод по курсору с сортировкой по id.
+    Не выполняет COUNT(*) и OFFSET, скорость не зависит от номера страницы.
+    """
+
+    page_size = 10  # количество сущностей на 1 странице
+    page_size_query_param = (
+        "page_size"  # количество выведенных записей (вводит пользователь)
+    )
+    max_page_size = 10  # максимальное количество сущностей на 1 странице
+    ordering = "id"
+
+
+def get_paginator(request, default_class=Pagination):
+    """
+    Возвращает пагинатор, выбранный параметром запроса `pagination`:
+    `cursor` - по курсору, иначе default_class.
+    Полнотекстовый поиск отсортирован по релевантности, курсор по id ее
+    потерял бы, поэтому он всегда выводится постранично по номеру страницы
+    """
+    params = request.query_params
+    if params.get("title") and params.get("search_mode") == "fulltext":
+        return Pagination()
+    if params.get("pagination") == "cursor":
+        return KeysetPagination()
+    return default_class()
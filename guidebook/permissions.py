@@ -1,7 +1,109 @@
 from rest_framework import permissions
 
 from company.models import CompanyRoleUser
+from guidebook.cache import CompanyRolesCache
 from guidebook.models import GuideBook, Work
+from guidebook.service import GuideBookService, WorkService
+
+
+class GuideBookAccess:
+    """
+    Справочник и работа из запроса, найденные один раз за запрос,
+    и роли пользователя в компании справочника.
+    """
+
+    def __init__(self, guidebook: GuideBook = None, work: Work = None):
+        self.guidebook = guidebook
+        self.work = work
+        self._roles = None
+
+    def get_roles(self, user) -> frozenset[str]:
+        """роли пользователя в компании справочника, запрашиваются один раз"""
+        if self.guidebook is None or not user.is_authenticated:
+            return frozenset()
+        if self._roles is None:
+            self._roles = CompanyRolesCache.get_roles(
+                user.pk, self.guidebook.company_id
+            )
+        return self._roles
+
+    async def aget_roles(self, user) -> frozenset[str]:
+        """асинхронная версия get_roles"""
+        if self.guidebook is None or not user.is_authenticated:
+            return frozenset()
+        if self._roles is None:
+            self._roles = await CompanyRolesCache.aget_roles(
+                user.pk, self.guidebook.company_id
+            )
+        return self._roles
+
+
+def get_guidebook_access(request, view) -> GuideBookAccess:
+    """
+    Находит работу и справочник по кваркам `pk_work`, `pk_guidebook` или data "guidebook".
+    Вью с deleted_guidebook = True получает только удаленный справочник.
+    Работа загружается вместе со справочником одним запросом,
+    результат сохраняется на запросе и переиспользуется пермишенами и вью.
+    """
+    access = getattr(request, "_guidebook_access", None)
+    if access is not None:
+        return access
+
+    pk_work = view.kwargs.get("pk_work", None)
+    if pk_work is not None:
+        work = WorkService.get_work(pk_work)
+        access = GuideBookAccess(guidebook=work and work.guidebook, work=work)
+    else:
+        pk_guidebook = view.kwargs.get("pk_guidebook", None)
+        if pk_guidebook is None and isinstance(request.data, dict):
+            pk_guidebook = request.data.get("guidebook", None)
+        try:
+            guidebook = GuideBookService.get_guidebook(
+                int(pk_guidebook),
+                is_delete=getattr(view, "deleted_guidebook", False),
+            )
+        except (TypeError, ValueError):
+            guidebook = None
+        access = GuideBookAccess(guidebook=guidebook)
+
+    request._guidebook_access = access
+    return access
+
+
+async def aget_guidebook_access(request, view) -> GuideBookAccess:
+    """асинхронная версия get_guidebook_access для кварков `pk_work` и `pk_guidebook`"""
+    access = getattr(request, "_guidebook_access", None)
+    if access is not None:
+        return access
+
+    pk_work = view.kwargs.get("pk_work", None)
+    if pk_work is not None:
+        work = await WorkService.aget_work(pk_work)
+        access = GuideBookAccess(guidebook=work and work.guidebook, work=work)
+    else:
+        try:
+            guidebook = await GuideBookService.aget_guidebook(
+                int(view.kwargs.get("pk_guidebook", None))
+            )
+        except (TypeError, ValueError):
+            guidebook = None
+        access = GuideBookAccess(guidebook=guidebook)
+
+    request._guidebook_access = access
+    return access
+
+
+def is_author_in_companies(user, company_ids) -> bool:
+    """Проверяет роль "author" пользователя во всех компаниях, по одной проверке на компанию"""
+    return all(
+        CompanyRoleUser.RoleType.AUTHOR in CompanyRolesCache.get_roles(user.pk, pk)
+        for pk in set(company_ids)
+    )
+
+
+def has_role_in_companies(user, company_ids) -> bool:
+    """Проверяет наличие любой роли пользователя во всех компаниях, по одной проверке на компанию"""
+    return all(CompanyRolesCache.get_roles(user.pk, pk) for pk in set(company_ids))
 
 
 class CheckingUserWorkInCompany(permissions.BasePermission):
@@ -12,17 +114,14 @@ class CheckingUserWorkInCompany(permissions.BasePermission):
     """
 
     def has_permission(self, request, view):
-        pk_work = view.kwargs.get("pk_work", None)
-        if pk_work is not None:
-            work = Work.objects.filter(id=pk_work).first()
-            pk_guidebook = work.guidebook_id
-        else:
-            pk_guidebook = view.kwargs.get("pk_guidebook", None)
-        guidebook = GuideBook.objects.filter(id=pk_guidebook).first()
-
-        result: bool = CompanyRoleUser.objects.filter(
-            user=request.user, company_id=guidebook.company_id
-        ).exists()
+        access = get_guidebook_access(request, view)
+        result: bool = bool(access.get_roles(request.user))
+
+        return result
+
+    async def ahas_permission(self, request, view):
+        access = await aget_guidebook_access(request, view)
+        result: bool = bool(await access.aget_roles(request.user))
 
         return result
 
@@ -35,19 +134,9 @@ class CheckingUserIsAuthorInCompany(permissions.BasePermission):
     """
 
     def has_permission(self, request, view):
-        pk_work = view.kwargs.get("pk_work", None)
-        if pk_work is not None:
-            work = Work.objects.filter(id=pk_work).first()
-            pk_guidebook = work.guidebook_id
-        else:
-            pk_guidebook = request.data.get("guidebook", None)
-            if pk_guidebook is None:
-                pk_guidebook = view.kwargs.get("pk_guidebook", None)
-
-        guidebook = GuideBook.objects.filter(id=pk_guidebook).first()
-
-        result: bool = CompanyRoleUser.objects.filter(
-            user=request.user, company_id=guidebook.company_id, role="author"
-        ).exists()
+        access = get_guidebook_access(request, view)
+        result: bool = CompanyRoleUser.RoleType.AUTHOR in access.get_roles(
+            request.user
+        )
 
         return result
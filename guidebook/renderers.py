@@ -0,0 +1,69 @@
+import json
+
+from rest_framework import encoders
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+try:
+    import orjson
+except ImportError:  # без orjson используется стандартный json с тем же результатом
+    orjson = None
+
+if orjson is not None:
+    # datetime отдается в default, чтобы формат совпадал с JSONEncoder DRF
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def dumps(data) -> bytes:
+    """
+    компактный JSON в utf-8 как у JSONRenderer DRF (UNICODE_JSON, COMPACT_JSON):
+    кириллица без экранирования, неподдерживаемые типы - через JSONEncoder DRF
+    """
+    if orjson is not None:
+        content = orjson.dumps(
+            data, default=encoders.JSONEncoder().default, option=ORJSON_OPTIONS
+        )
+    else:
+        content = json.dumps(
+            data,
+            cls=encoders.JSONEncoder,
+            ensure_ascii=False,
+            separators=(",", ":"),
+            allow_nan=not api_settings.STRICT_JSON,
+        ).encode()
+    # как в JSONRenderer: U+2028 и U+2029 экранируются для встраивания в JavaScript
+    if b"\xe2\x80\xa8" in content or b"\xe2\x80\xa9" in content:
+        content = content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+    return content
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson (если установлен) с тем же результатом для ответов
+    справочников. Запросы с отступами (indent) и настройки, отличные
+    от компактного юникодного JSON, обрабатываются стандартным JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+def get_renderer_classes() -> tuple:
+    """рендеры DRF по умолчанию, где JSONRenderer заменен на FastJSONRenderer"""
+    renderer_classes = tuple(
+        FastJSONRenderer if renderer is JSONRenderer else renderer
+        for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+    )
+    if FastJSONRenderer not in renderer_classes:
+        renderer_classes = (FastJSONRenderer, *renderer_classes)
+    return renderer_classes
+
+
+GUIDEBOOK_RENDERER_CLASSES = get_renderer_classes()
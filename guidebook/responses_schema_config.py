@@ -11,10 +11,22 @@ from core.base.responses_schema_config import BaseResponsesConfig
 from guidebook.serializers import (
     DirectoryWithEmbeddedDataOutputSerializer,
     EnteringDirectoryDataInputSerializer,
+    EstimateInputSerializer,
+    EstimateOutputSerializer,
+    GuideBookAggregatesOutputSerializer,
+    GuideBookCloneInputSerializer,
+    GuideBookCloneOutputSerializer,
+    GuideBookTreeOutputSerializer,
+    PriceCatalogImportInputSerializer,
+    PriceCatalogImportOutputSerializer,
     ViewingDirectoryOnlyNameOutputSerializer,
     ViewingGuideBookOutputSerializer,
+    WorkBulkDeleteInputSerializer,
+    WorkBulkUpdateInputSerializer,
     WorkDataInputSerializer,
     WorkDataOutputSerializer,
+    WorkSearchInputSerializer,
+    WorkSearchOutputSerializer,
 )
 
 
@@ -26,6 +38,7 @@ class GuideBookResponse(BaseResponsesConfig):
         description="Возвращает детальную информацию о справочнике.",
         responses={
             200: DirectoryWithEmbeddedDataOutputSerializer,
+            304: OpenApiResponse(description="Данные не изменились (If-None-Match)"),
             403: OpenApiResponse(description="Справочник не найден"),
         },
         tags=["Справочники"],
@@ -59,7 +72,9 @@ class GuideBookResponse(BaseResponsesConfig):
 
     soft_delete_guidebook = extend_schema(
         summary="Мягкое удаление справочника",
-        description="Удаляет справочник.<br>" "Доступно только владельцу компании.",
+        description="Удаляет справочник вместе со всеми вложенными справочниками "
+        "и работами.<br>"
+        "Доступно только владельцу компании.",
         responses={
             204: OpenApiResponse(description="Справочник удален"),
             403: OpenApiResponse(
@@ -69,6 +84,39 @@ class GuideBookResponse(BaseResponsesConfig):
         tags=["Справочники"],
     )
 
+    clone_guidebook = extend_schema(
+        summary="Копирование справочника в компанию",
+        description="Копирует справочник со всеми вложенными справочниками и работами "
+        "в компанию company, в корень или в справочник parent_guide_book этой компании. "
+        "Цены работ можно умножить на price_multiplier до 1000 (округление "
+        "до целого), цена после умножения должна помещаться в price_by_unit.<br>"
+        "Доступно владельцу компании справочника и компании назначения.",
+        request=GuideBookCloneInputSerializer,
+        responses={
+            201: GuideBookCloneOutputSerializer,
+            400: OpenApiResponse(description="Ошибка валидации"),
+            403: OpenApiResponse(description="Нет роли author в одной из компаний"),
+            404: OpenApiResponse(description="Справочник не найден"),
+        },
+        tags=["Справочники"],
+    )
+
+    restore_guidebook = extend_schema(
+        summary="Восстановление справочника",
+        description="Восстанавливает удаленный справочник вместе с вложенными "
+        "справочниками и работами, удаленными с ним.<br>"
+        "Родительский справочник должен быть не удален. "
+        "Доступно только владельцу компании.",
+        request=None,
+        responses={
+            200: ViewingGuideBookOutputSerializer,
+            400: OpenApiResponse(description="Родительский справочник удален"),
+            403: OpenApiResponse(description="Нет ролей в компании"),
+            404: OpenApiResponse(description="Удаленный справочник не найден"),
+        },
+        tags=["Справочники"],
+    )
+
     list_guidebooks = extend_schema(
         summary="Получить список объектов",
         description="Получает список объектов компании, pk компании передается в ссылке.<br>"
@@ -80,12 +128,22 @@ class GuideBookResponse(BaseResponsesConfig):
                     "count": serializers.IntegerField(),
                     "next": serializers.CharField(allow_null=True),
                     "previous": serializers.CharField(allow_null=True),
-                    "results": ViewingDirectoryOnlyNameOutputSerializer(many=True),
+                    "results": GuideBookAggregatesOutputSerializer(many=True),
                 },
             ),
             404: OpenApiResponse(description="Не найдено"),
         },
         parameters=[
+            OpenApiParameter(
+                name="pagination",
+                required=False,
+                description="Режим пагинации: page - по номеру страницы (по умолчанию), "
+                "cursor - по курсору, без count, ссылки next/previous содержат курсор. "
+                "Полнотекстовый поиск всегда выводится по номеру страницы",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                enum=["page", "cursor"],
+            ),
             OpenApiParameter(
                 name="page",
                 required=False,
@@ -93,6 +151,13 @@ class GuideBookResponse(BaseResponsesConfig):
                 type=OpenApiTypes.INT,
                 location=OpenApiParameter.QUERY,
             ),
+            OpenApiParameter(
+                name="cursor",
+                required=False,
+                description="Курсор страницы для pagination=cursor",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+            ),
             OpenApiParameter(
                 name="page_size",
                 required=False,
@@ -107,10 +172,85 @@ class GuideBookResponse(BaseResponsesConfig):
                 type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
             ),
+            OpenApiParameter(
+                name="search_mode",
+                required=False,
+                description="Режим поиска по названию: contains - вхождение подстроки "
+                "(по умолчанию), fulltext - полнотекстовый поиск с учетом морфологии, "
+                "результаты отсортированы по релевантности",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                enum=["contains", "fulltext"],
+            ),
+        ],
+        tags=["Справочники"],
+    )
+
+    tree_guidebook = extend_schema(
+        summary="Получить дерево справочников компании",
+        description="Возвращает все справочники компании одним вложенным деревом, "
+        "pk компании передается в ссылке.<br>"
+        "Дочерние справочники находятся в поле children.",
+        responses={
+            200: GuideBookTreeOutputSerializer(many=True),
+            400: OpenApiResponse(description="Ошибка валидации"),
+            404: OpenApiResponse(description="Не найдено"),
+        },
+        parameters=[
+            OpenApiParameter(
+                name="max_depth",
+                required=False,
+                description="Количество выводимых уровней (по умолчанию все)",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+            ),
+            OpenApiParameter(
+                name="with_works",
+                required=False,
+                description="Выводить работы справочников (по умолчанию false)",
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+            ),
+        ],
+        tags=["Справочники"],
+    )
+
+    export_guidebook = extend_schema(
+        summary="Выгрузить работы справочника",
+        description="Потоково выгружает работы справочника и всех вложенных "
+        "справочников в csv или JSON Lines.<br>"
+        "Колонки совпадают с импортом прайс-листа, path - путь от корня компании.",
+        responses={
+            (200, "text/csv"): OpenApiTypes.STR,
+            (200, "application/x-ndjson"): OpenApiTypes.STR,
+            403: OpenApiResponse(description="Нет ролей в компании"),
+            404: OpenApiResponse(description="Справочник не найден"),
+        },
+        parameters=[
+            OpenApiParameter(
+                name="file_format",
+                required=False,
+                description="Формат выгрузки (по умолчанию csv)",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                enum=["csv", "ndjson"],
+            ),
         ],
         tags=["Справочники"],
     )
 
+    metrics = extend_schema(
+        summary="Метрики API справочников",
+        description="Время ответов, количество и время SQL-запросов, дубли запросов "
+        "и время сериализации по вью в текстовом формате Prometheus.<br>"
+        "Доступно администраторам.",
+        responses={
+            (200, "text/plain"): OpenApiTypes.STR,
+            403: OpenApiResponse(description="Нет прав администратора"),
+        },
+        tags=["Справочники"],
+    )
+
 
 class WorkResponse(BaseResponsesConfig):
     """Класс с документацией для справочнике"""
@@ -120,6 +260,7 @@ class WorkResponse(BaseResponsesConfig):
         description="Возвращает детальную информацию о справочнике.",
         responses={
             200: ViewingGuideBookOutputSerializer,
+            304: OpenApiResponse(description="Данные не изменились (If-None-Match)"),
             403: OpenApiResponse(description="Справочник не найден"),
         },
         tags=["Работы"],
@@ -150,6 +291,129 @@ class WorkResponse(BaseResponsesConfig):
         tags=["Работы"],
     )
 
+    search_works = extend_schema(
+        summary="Поиск работ по компании",
+        description="Ищет работы во всех справочниках компании, pk компании передается "
+        "в ссылке, или в справочнике guidebook и всех вложенных в него.<br>"
+        "Каждая работа возвращается с цепочкой справочников от корня компании.<br>"
+        "Пагинация по курсору, результаты отсортированы по id.<br>"
+        "При search_mode=fulltext результаты отсортированы по релевантности "
+        "и выводятся постранично по номеру страницы (page, count).",
+        parameters=[
+            WorkSearchInputSerializer,
+            OpenApiParameter(
+                name="cursor",
+                required=False,
+                description="Курсор страницы",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+            ),
+            OpenApiParameter(
+                name="page",
+                required=False,
+                description="Номер страницы (только при search_mode=fulltext)",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+            ),
+            OpenApiParameter(
+                name="page_size",
+                required=False,
+                description="Количество элементов на странице (по умолчанию 10)",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+            ),
+        ],
+        responses={
+            200: inline_serializer(
+                name="WorkSearchResponse",
+                fields={
+                    "next": serializers.CharField(allow_null=True),
+                    "previous": serializers.CharField(allow_null=True),
+                    "results": WorkSearchOutputSerializer(many=True),
+                },
+            ),
+            400: OpenApiResponse(description="Ошибка валидации"),
+            404: OpenApiResponse(description="Справочник не найден"),
+        },
+        tags=["Работы"],
+    )
+
+    estimate = extend_schema(
+        summary="Рассчитать смету",
+        description="Считает суммы строк сметы (работа и объем), итоги "
+        "по справочникам и по валютам. Сумма строки округляется до копеек.<br>"
+        "Доступно пользователю с ролью во всех компаниях работ.<br>"
+        "При ошибке возвращается список ошибок по каждой строке.",
+        request=EstimateInputSerializer,
+        responses={
+            200: EstimateOutputSerializer,
+            400: OpenApiResponse(description="Ошибка валидации"),
+            403: OpenApiResponse(description="Нет ролей в компании работы"),
+        },
+        tags=["Работы"],
+    )
+
+    bulk_create_works = extend_schema(
+        summary="Массово создать работы",
+        description="Создаёт список работ в одной транзакции.<br>"
+        "Доступно автору во всех компаниях справочников.<br>"
+        "При ошибке возвращается список ошибок по каждой работе, ничего не создается.",
+        request=WorkDataInputSerializer(many=True),
+        responses={
+            201: WorkDataOutputSerializer(many=True),
+            400: OpenApiResponse(description="Ошибка валидации"),
+            403: OpenApiResponse(description="Нет роли author в компании"),
+        },
+        tags=["Работы"],
+    )
+
+    bulk_update_works = extend_schema(
+        summary="Массово обновить работы",
+        description="Обновляет список работ в одной транзакции, "
+        "передаются только изменяемые поля и id работы, id не должны повторяться.<br>"
+        "Доступно автору во всех компаниях справочников.",
+        request=WorkBulkUpdateInputSerializer(many=True),
+        responses={
+            200: WorkDataOutputSerializer(many=True),
+            400: OpenApiResponse(description="Ошибка валидации"),
+            403: OpenApiResponse(description="Нет роли author в компании"),
+        },
+        tags=["Работы"],
+    )
+
+    bulk_delete_works = extend_schema(
+        summary="Массовое мягкое удаление работ",
+        description="Удаляет работы по списку id одним запросом.<br>"
+        "Доступно автору во всех компаниях справочников.",
+        request=WorkBulkDeleteInputSerializer,
+        responses={
+            204: OpenApiResponse(description="Работы удалены"),
+            400: OpenApiResponse(description="Ошибка валидации"),
+            403: OpenApiResponse(description="Нет роли author в компании"),
+        },
+        tags=["Работы"],
+    )
+
+    import_price_catalog = extend_schema(
+        summary="Импорт прайс-листа",
+        description="Потоково импортирует файл csv или xlsx в справочники компании, "
+        "pk компании передается в ссылке.<br>"
+        "Колонки: path (справочники через /), title, price_by_unit, "
+        "unit_of_measurement, currency. Недостающие справочники создаются, "
+        "работы с тем же названием в справочнике обновляются.<br>"
+        "Кодировка csv - encoding (utf-8 по умолчанию или cp1251). "
+        "Ошибка чтения файла возвращается как ошибка валидации file, "
+        "файл при этом не импортируется.<br>"
+        "Доступно владельцу компании.",
+        request={"multipart/form-data": PriceCatalogImportInputSerializer},
+        responses={
+            200: PriceCatalogImportOutputSerializer,
+            400: OpenApiResponse(description="Ошибка валидации"),
+            404: OpenApiResponse(description="Справочник не найден"),
+        },
+        tags=["Работы"],
+    )
+
     soft_delete_work = extend_schema(
         summary="Мягкое удаление работы",
         description="Удаляет работу.<br>" "Доступно только владельцу компании.",
@@ -176,9 +440,21 @@ class WorkResponse(BaseResponsesConfig):
                     "results": ViewingDirectoryOnlyNameOutputSerializer(many=True),
                 },
             ),
+            304: OpenApiResponse(description="Данные не изменились (If-None-Match)"),
+            400: OpenApiResponse(description="Ошибка валидации"),
             404: OpenApiResponse(description="Не найдено"),
         },
         parameters=[
+            OpenApiParameter(
+                name="pagination",
+                required=False,
+                description="Режим пагинации: page - по номеру страницы (по умолчанию), "
+                "cursor - по курсору, без count, ссылки next/previous содержат курсор. "
+                "Полнотекстовый поиск всегда выводится по номеру страницы",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                enum=["page", "cursor"],
+            ),
             OpenApiParameter(
                 name="page",
                 required=False,
@@ -186,6 +462,13 @@ class WorkResponse(BaseResponsesConfig):
                 type=OpenApiTypes.INT,
                 location=OpenApiParameter.QUERY,
             ),
+            OpenApiParameter(
+                name="cursor",
+                required=False,
+                description="Курсор страницы для pagination=cursor",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+            ),
             OpenApiParameter(
                 name="page_size",
                 required=False,
@@ -200,6 +483,41 @@ class WorkResponse(BaseResponsesConfig):
                 type=OpenApiTypes.STR,
                 location=OpenApiParameter.QUERY,
             ),
+            OpenApiParameter(
+                name="search_mode",
+                required=False,
+                description="Режим поиска по названию: contains - вхождение подстроки "
+                "(по умолчанию), fulltext - полнотекстовый поиск с учетом морфологии, "
+                "результаты отсортированы по релевантности",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                enum=["contains", "fulltext"],
+            ),
+            OpenApiParameter(
+                name="normalized_price_min",
+                required=False,
+                description="Минимальная цена за единицу в базовой валюте",
+                type=OpenApiTypes.DECIMAL,
+                location=OpenApiParameter.QUERY,
+            ),
+            OpenApiParameter(
+                name="normalized_price_max",
+                required=False,
+                description="Максимальная цена за единицу в базовой валюте",
+                type=OpenApiTypes.DECIMAL,
+                location=OpenApiParameter.QUERY,
+            ),
+            OpenApiParameter(
+                name="ordering",
+                required=False,
+                description="Сортировка: по id или по цене в базовой валюте, "
+                "работы без курса валюты - в конце. "
+                "При pagination=cursor допустима только сортировка id, "
+                "иначе ошибка 400",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                enum=["id", "-id", "normalized_price", "-normalized_price"],
+            ),
         ],
         tags=["Работы"],
     )
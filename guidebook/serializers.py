@@ -1,6 +1,10 @@
+from decimal import Decimal
+
+from django.conf import settings
 from rest_framework import serializers
 
 from company.serializers import CompanyOutputSerializer
+from guidebook.models import GuideBook, Work
 from guidebook.validators import GuideBookValidator
 
 # СПРАВОЧНИК
@@ -13,6 +17,22 @@ class ViewingDirectoryOnlyNameOutputSerializer(serializers.Serializer):
     title = serializers.CharField()
 
 
+class PriceStatsField(serializers.DictField):
+    """цены работ справочника с вложенными по валютам: count, min, max, avg"""
+
+    def to_representation(self, value):
+        return GuideBook.format_price_stats(value)
+
+
+class GuideBookAggregatesOutputSerializer(ViewingDirectoryOnlyNameOutputSerializer):
+    """сериализатор справочника с агрегатами вложенных справочников и работ"""
+
+    children_count = serializers.IntegerField()
+    works_count = serializers.IntegerField()
+    subtree_works_count = serializers.IntegerField()
+    prices = PriceStatsField(source="price_stats")
+
+
 class EnteringDirectoryDataInputSerializer(serializers.Serializer):
     """сериализатор ввода данных справочника"""
 
@@ -44,14 +64,87 @@ class WorkOutputSerializer(serializers.Serializer):
 class DirectoryWithEmbeddedDataOutputSerializer(serializers.Serializer):
     """сериализатор для вывода справочника с влоденными справочниками и работами"""
 
-    guidebook = ViewingDirectoryOnlyNameOutputSerializer()
-    nested_guidebooks = ViewingDirectoryOnlyNameOutputSerializer(many=True)
+    guidebook = GuideBookAggregatesOutputSerializer()
+    nested_guidebooks = GuideBookAggregatesOutputSerializer(many=True)
     nested_works = WorkOutputSerializer(many=True)
 
 
+class GuideBookTreeInputSerializer(serializers.Serializer):
+    """сериализатор параметров запроса дерева справочников"""
+
+    max_depth = serializers.IntegerField(min_value=1, required=False)
+    with_works = serializers.BooleanField(required=False, default=False)
+
+
+class GuideBookTreeOutputSerializer(serializers.Serializer):
+    """сериализатор узла дерева справочников, children - узлы того же вида"""
+
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    children_count = serializers.IntegerField()
+    works_count = serializers.IntegerField()
+    subtree_works_count = serializers.IntegerField()
+    prices = serializers.DictField()
+    works = WorkOutputSerializer(many=True, required=False)
+    children = serializers.ListField(child=serializers.DictField())
+
+
+class GuideBookExportInputSerializer(serializers.Serializer):
+    """сериализатор параметров выгрузки справочника"""
+
+    file_format = serializers.ChoiceField(choices=["csv", "ndjson"], default="csv")
+
+
+class GuideBookCloneInputSerializer(serializers.Serializer):
+    """сериализатор ввода параметров копирования справочника в компанию"""
+
+    company = serializers.IntegerField()
+    parent_guide_book = serializers.IntegerField(required=False)
+    price_multiplier = serializers.DecimalField(
+        max_digits=10,
+        decimal_places=4,
+        min_value=Decimal("0.0001"),
+        max_value=Decimal("1000"),
+        required=False,
+    )
+
+
+class GuideBookCloneOutputSerializer(serializers.Serializer):
+    """сериализатор отчета о копировании справочника"""
+
+    guidebook = ViewingGuideBookOutputSerializer()
+    guidebooks_created = serializers.IntegerField()
+    works_created = serializers.IntegerField()
+
+
 # РАБОТА
 
 
+class WorkDataListInputSerializer(serializers.ListSerializer):
+    """
+    сериализатор ввода списка работ, справочники всех работ
+    загружаются одним запросом и передаются валидатору через контекст
+    """
+
+    def to_internal_value(self, data):
+        max_items = getattr(settings, "GUIDEBOOK_BULK_MAX_ITEMS", 1000)
+        if isinstance(data, list) and len(data) > max_items:
+            raise serializers.ValidationError(
+                {"non_field_errors": [f"Не больше {max_items} работ за один запрос."]}
+            )
+        if isinstance(data, list) and "guidebooks" not in self._context:
+            pks = set()
+            for item in data:
+                try:
+                    pks.add(int(item.get("guidebook")))
+                except (AttributeError, TypeError, ValueError):
+                    continue
+            self._context["guidebooks"] = GuideBook.objects.filter(
+                is_delete=False
+            ).in_bulk(pks)
+        return super().to_internal_value(data)
+
+
 class WorkDataInputSerializer(serializers.Serializer):
     """сериализатор ввода данных работы"""
 
@@ -61,6 +154,28 @@ class WorkDataInputSerializer(serializers.Serializer):
     unit_of_measurement = serializers.CharField()
     currency = serializers.CharField()
 
+    class Meta:
+        list_serializer_class = WorkDataListInputSerializer
+
+
+class WorkBulkUpdateInputSerializer(WorkDataInputSerializer):
+    """сериализатор ввода данных работы при массовом обновлении"""
+
+    id = serializers.IntegerField()
+
+    def validate(self, attrs):
+        if "id" not in attrs:
+            raise serializers.ValidationError({"id": ["Обязательное поле."]})
+        return attrs
+
+
+class WorkBulkDeleteInputSerializer(serializers.Serializer):
+    """сериализатор ввода pk работ для массового удаления"""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=10000
+    )
+
 
 class WorkDataOutputSerializer(serializers.Serializer):
     """сериализатор для просмотра работы"""
@@ -71,3 +186,157 @@ class WorkDataOutputSerializer(serializers.Serializer):
     price_by_unit = serializers.IntegerField()
     unit_of_measurement = serializers.CharField()
     currency = serializers.CharField()
+
+
+class WorkSearchInputSerializer(serializers.Serializer):
+    """сериализатор параметров поиска работ по компании"""
+
+    title = serializers.CharField(required=False)
+    search_mode = serializers.ChoiceField(
+        choices=["contains", "fulltext"], required=False
+    )
+    guidebook = serializers.IntegerField(required=False)
+    price_min = serializers.IntegerField(min_value=0, required=False)
+    price_max = serializers.IntegerField(min_value=0, required=False)
+    unit_of_measurement = serializers.ChoiceField(
+        choices=Work.UnitType.choices, required=False
+    )
+    currency = serializers.ChoiceField(
+        choices=Work.CurrencyType.choices, required=False
+    )
+
+    def validate(self, attrs):
+        price_min = attrs.get("price_min", None)
+        price_max = attrs.get("price_max", None)
+        if price_min is not None and price_max is not None and price_min > price_max:
+            raise serializers.ValidationError(
+                {"price_max": ["Должна быть не меньше price_min."]}
+            )
+        return attrs
+
+
+class WorkFilterInputSerializer(serializers.Serializer):
+    """сериализатор параметров фильтра списка работ по цене в базовой валюте"""
+
+    normalized_price_min = serializers.DecimalField(
+        max_digits=18, decimal_places=2, min_value=0, required=False
+    )
+    normalized_price_max = serializers.DecimalField(
+        max_digits=18, decimal_places=2, min_value=0, required=False
+    )
+    ordering = serializers.ChoiceField(
+        choices=["id", "-id", "normalized_price", "-normalized_price"], required=False
+    )
+    pagination = serializers.ChoiceField(choices=["page", "cursor"], required=False)
+
+    def validate(self, attrs):
+        price_min = attrs.get("normalized_price_min", None)
+        price_max = attrs.get("normalized_price_max", None)
+        if price_min is not None and price_max is not None and price_min > price_max:
+            raise serializers.ValidationError(
+                {"normalized_price_max": ["Должна быть не меньше normalized_price_min."]}
+            )
+        # курсор идет только по id, другую сортировку он бы молча заменил;
+        # полнотекстовый поиск всегда выводится по номеру страницы
+        fulltext = (
+            self.initial_data.get("title")
+            and self.initial_data.get("search_mode") == "fulltext"
+        )
+        if (
+            attrs.get("pagination") == "cursor"
+            and attrs.get("ordering", "id") != "id"
+            and not fulltext
+        ):
+            raise serializers.ValidationError(
+                {"ordering": ["Пагинация по курсору допускает только сортировку id."]}
+            )
+        return attrs
+
+
+class WorkSearchOutputSerializer(WorkDataOutputSerializer):
+    """сериализатор найденной работы с цепочкой справочников от корня компании"""
+
+    breadcrumbs = ViewingDirectoryOnlyNameOutputSerializer(many=True)
+
+
+class EstimateItemInputSerializer(serializers.Serializer):
+    """сериализатор строки сметы: работа и объем"""
+
+    work = serializers.IntegerField()
+    quantity = serializers.DecimalField(
+        max_digits=12, decimal_places=3, min_value=Decimal("0.001")
+    )
+
+
+class EstimateInputSerializer(serializers.Serializer):
+    """сериализатор ввода строк сметы"""
+
+    items = EstimateItemInputSerializer(many=True, allow_empty=False)
+
+    def to_internal_value(self, data):
+        max_items = getattr(settings, "GUIDEBOOK_ESTIMATE_MAX_ITEMS", 10000)
+        items = data.get("items") if isinstance(data, dict) else None
+        if isinstance(items, list) and len(items) > max_items:
+            raise serializers.ValidationError(
+                {"items": [f"Не больше {max_items} строк в смете."]}
+            )
+        return super().to_internal_value(data)
+
+
+class EstimateLineOutputSerializer(serializers.Serializer):
+    """сериализатор строки сметы с суммой"""
+
+    work = serializers.IntegerField()
+    title = serializers.CharField()
+    guidebook = serializers.IntegerField()
+    unit_of_measurement = serializers.CharField()
+    price_by_unit = serializers.IntegerField()
+    currency = serializers.CharField()
+    quantity = serializers.DecimalField(max_digits=12, decimal_places=3)
+    total = serializers.DecimalField(max_digits=20, decimal_places=2)
+
+
+class EstimateGuideBookOutputSerializer(ViewingDirectoryOnlyNameOutputSerializer):
+    """сериализатор итогов сметы по справочнику в разрезе валют"""
+
+    totals = serializers.DictField(
+        child=serializers.DecimalField(max_digits=20, decimal_places=2)
+    )
+
+
+class EstimateOutputSerializer(serializers.Serializer):
+    """сериализатор сметы: строки, итоги по справочникам и по валютам"""
+
+    lines = EstimateLineOutputSerializer(many=True)
+    guidebooks = EstimateGuideBookOutputSerializer(many=True)
+    totals = serializers.DictField(
+        child=serializers.DecimalField(max_digits=20, decimal_places=2)
+    )
+
+
+class PriceCatalogImportInputSerializer(serializers.Serializer):
+    """сериализатор ввода файла прайс-листа для импорта"""
+
+    file = serializers.FileField()
+    parent_guide_book = serializers.IntegerField(
+        validators=[GuideBookValidator()], required=False
+    )
+    encoding = serializers.ChoiceField(choices=["utf-8", "cp1251"], default="utf-8")
+
+
+class PriceCatalogImportErrorOutputSerializer(serializers.Serializer):
+    """сериализатор ошибки строки прайс-листа"""
+
+    row = serializers.IntegerField()
+    errors = serializers.DictField()
+
+
+class PriceCatalogImportOutputSerializer(serializers.Serializer):
+    """сериализатор отчета об импорте прайс-листа"""
+
+    rows = serializers.IntegerField()
+    created = serializers.IntegerField()
+    updated = serializers.IntegerField()
+    guidebooks_created = serializers.IntegerField()
+    errors_count = serializers.IntegerField()
+    errors = PriceCatalogImportErrorOutputSerializer(many=True)
@@ -1,19 +1,53 @@
+from collections import Counter, defaultdict
+from decimal import ROUND_HALF_UP, Decimal
 from typing import Union
 
-from django.db.models import QuerySet
+from django.db import models, transaction
+from django.db.models import (
+    Count,
+    DecimalField,
+    F,
+    Max,
+    Min,
+    Prefetch,
+    Q,
+    QuerySet,
+    Sum,
+    Value,
+    prefetch_related_objects,
+)
+from django.db.models.functions import Concat, Round, Substr
+from django.utils import timezone
+from rest_framework import serializers
 
 from core.base.service import BaseService
-from guidebook.models import GuideBook, Work
+from guidebook.cache import ExchangeRateCache
+from guidebook.filters import search_by_title
+from guidebook.models import PATH_SEPARATOR, ExchangeRate, GuideBook, Work
+
+CENT = Decimal("0.01")
+MAX_PRICE_BY_UNIT = 2147483647  # Work.price_by_unit - IntegerField (int32)
+
+AGGREGATE_FIELDS = (
+    "children_count",
+    "works_count",
+    "subtree_works_count",
+    "price_stats",
+)
 
 
 class GuideBookService(BaseService):
     """операции со справочниками"""
 
+    clone_batch_size = 2000
+
     @classmethod
     def get_guidebook_parents(cls, pk_company: int) -> Union[QuerySet[GuideBook], None]:
         """функция для получения справочников по pk_guidebook и parent_guide_book = None"""
         guidebooks = (
-            GuideBook.objects.filter(company_id=pk_company, parent_guide_book=None)
+            GuideBook.objects.filter(
+                company_id=pk_company, parent_guide_book=None, is_delete=False
+            )
             .all()
             .order_by("id")
         )
@@ -22,9 +56,68 @@ class GuideBookService(BaseService):
         return guidebooks
 
     @classmethod
-    def get_guidebook(cls, pk: int) -> Union[GuideBook, None]:
-        """функция для получения справочника по pk_guidebook"""
-        return cls.get_object_by_model(GuideBook, pk)
+    def get_guidebook(cls, pk: int, is_delete: bool = False) -> Union[GuideBook, None]:
+        """
+        функция для получения справочника по pk_guidebook вместе с компанией и родителем,
+        is_delete=True - только удаленного (для восстановления)
+        """
+        return (
+            GuideBook.objects.select_related("company", "parent_guide_book")
+            .filter(id=pk, is_delete=is_delete)
+            .first()
+        )
+
+    @classmethod
+    def prefetch_nested(cls, guidebook: GuideBook) -> GuideBook:
+        """
+        функция загрузки вложенных справочников и работ справочника,
+        всего два запроса независимо от количества вложенных объектов.
+        Вложенные объекты доступны в атрибутах nested_guidebooks и nested_works
+        """
+        prefetch_related_objects(
+            [guidebook],
+            Prefetch(
+                "children_guide_book",
+                queryset=GuideBook.objects.filter(is_delete=False)
+                .only("id", "title", "parent_guide_book", *AGGREGATE_FIELDS)
+                .order_by("id"),
+                to_attr="nested_guidebooks",
+            ),
+            Prefetch(
+                "works",
+                queryset=Work.objects.filter(is_delete=False).order_by("id"),
+                to_attr="nested_works",
+            ),
+        )
+        return guidebook
+
+    @classmethod
+    async def aget_guidebook(cls, pk: int) -> Union[GuideBook, None]:
+        """асинхронная версия get_guidebook"""
+        return (
+            await GuideBook.objects.select_related("company", "parent_guide_book")
+            .filter(id=pk, is_delete=False)
+            .afirst()
+        )
+
+    @classmethod
+    async def aprefetch_nested(cls, guidebook: GuideBook) -> GuideBook:
+        """асинхронная версия prefetch_nested, те же два запроса"""
+        guidebook.nested_guidebooks = [
+            nested
+            async for nested in GuideBook.objects.filter(
+                parent_guide_book_id=guidebook.pk, is_delete=False
+            )
+            .only("id", "title", "parent_guide_book", *AGGREGATE_FIELDS)
+            .order_by("id")
+        ]
+        guidebook.nested_works = [
+            work
+            async for work in Work.objects.filter(
+                guidebook_id=guidebook.pk, is_delete=False
+            ).order_by("id")
+        ]
+        return guidebook
 
     @classmethod
     def list_guidebook(cls, pk: int) -> QuerySet[GuideBook]:
@@ -32,68 +125,1054 @@ class GuideBookService(BaseService):
         guidebooks = GuideBook.objects.filter(parent_guide_book=pk)
         return guidebooks
 
+    @classmethod
+    def get_ancestors(cls, guidebook: GuideBook) -> QuerySet[GuideBook]:
+        """функция получения цепочки предков справочника от корня одним запросом"""
+        return GuideBook.objects.filter(
+            id__in=guidebook.ancestor_ids, is_delete=False
+        ).order_by("depth")
+
+    @classmethod
+    def get_descendants(
+        cls, guidebook: GuideBook, include_self: bool = False
+    ) -> QuerySet[GuideBook]:
+        """функция получения всех потомков справочника одним запросом (обход в глубину)"""
+        guidebooks = GuideBook.objects.filter(
+            path__startswith=guidebook.path, is_delete=False
+        )
+        if not include_self:
+            guidebooks = guidebooks.exclude(id=guidebook.id)
+        return guidebooks.order_by("path")
+
+    @classmethod
+    def get_guidebook_tree(
+        cls, pk_company: int, max_depth: int = None, with_works: bool = False
+    ) -> list[dict]:
+        """
+        функция построения полного дерева справочников компании.
+        Справочники (и работы, если with_works) загружаются одним запросом каждый,
+        дерево собирается в памяти. max_depth ограничивает количество уровней.
+        """
+        guidebooks = GuideBook.objects.filter(company_id=pk_company, is_delete=False)
+        if max_depth is not None:
+            guidebooks = guidebooks.filter(depth__lt=max_depth)
+
+        tree = []
+        nodes = {}
+        for row in guidebooks.order_by("depth", "id").values(
+            "id", "title", "parent_guide_book_id", *AGGREGATE_FIELDS
+        ):
+            node = {
+                "id": row["id"],
+                "title": row["title"],
+                "children_count": row["children_count"],
+                "works_count": row["works_count"],
+                "subtree_works_count": row["subtree_works_count"],
+                "prices": GuideBook.format_price_stats(row["price_stats"]),
+            }
+            if with_works:
+                node["works"] = []
+            node["children"] = []
+            if row["parent_guide_book_id"] is None:
+                tree.append(node)
+            elif row["parent_guide_book_id"] in nodes:
+                nodes[row["parent_guide_book_id"]]["children"].append(node)
+            else:
+                # родитель удален, ветка не выводится
+                continue
+            nodes[row["id"]] = node
+
+        if with_works and nodes:
+            works = Work.objects.filter(
+                guidebook__company_id=pk_company, is_delete=False
+            )
+            if max_depth is not None:
+                works = works.filter(guidebook__depth__lt=max_depth)
+            for row in works.order_by("id").values(
+                "id",
+                "guidebook_id",
+                "title",
+                "price_by_unit",
+                "unit_of_measurement",
+                "currency",
+            ):
+                node = nodes.get(row.pop("guidebook_id"))
+                if node is not None:
+                    node["works"].append(row)
+        return tree
+
+    @classmethod
+    def get_breadcrumbs(cls, guidebooks: list[GuideBook]) -> dict[int, list[dict]]:
+        """
+        функция получения цепочек справочников от корня компании
+        для списка справочников одним запросом, ключ - pk справочника
+        """
+        chains = {
+            guidebook.id: guidebook.ancestor_ids + [guidebook.id]
+            for guidebook in guidebooks
+        }
+        titles = dict(
+            GuideBook.objects.filter(
+                id__in={pk for chain in chains.values() for pk in chain}
+            ).values_list("id", "title")
+        )
+        return {
+            pk: [{"id": item, "title": titles[item]} for item in chain if item in titles]
+            for pk, chain in chains.items()
+        }
+
+    @classmethod
+    def refresh_hierarchy(cls, guidebook: GuideBook) -> None:
+        """
+        функция пересчета материализованного пути и уровня справочника
+        и всех его потомков после смены родителя
+        """
+        parent = None
+        if guidebook.parent_guide_book_id is not None:
+            parent = (
+                GuideBook.objects.filter(id=guidebook.parent_guide_book_id)
+                .values("path", "depth")
+                .first()
+            )
+        old_path = guidebook.path
+        if parent is not None and old_path and parent["path"].startswith(old_path):
+            raise serializers.ValidationError(
+                {"parent_guide_book": ["Нельзя перенести справочник внутрь самого себя."]}
+            )
+
+        new_path = GuideBook.build_path(parent["path"] if parent else "", guidebook.id)
+        new_depth = parent["depth"] + 1 if parent else 0
+        if old_path:
+            GuideBook.objects.filter(path__startswith=old_path).update(
+                path=Concat(
+                    Value(new_path),
+                    Substr("path", len(old_path) + 1),
+                    output_field=models.CharField(),
+                ),
+                depth=F("depth") + (new_depth - guidebook.depth),
+            )
+        else:
+            GuideBook.objects.filter(id=guidebook.id).update(
+                path=new_path, depth=new_depth
+            )
+        guidebook.path = new_path
+        guidebook.depth = new_depth
+
+    @classmethod
+    def touch_guidebooks(cls, pks) -> None:
+        """
+        функция увеличения версии справочников после изменения их данных,
+        вложенных справочников или работ. Версия используется в ETag
+        """
+        pks = {pk for pk in pks if pk is not None}
+        if pks:
+            GuideBook.objects.filter(id__in=pks).update(
+                version=F("version") + 1, changed_at=timezone.now()
+            )
+
     @classmethod
     def create_guidebook(cls, pk_company: int, **kwargs) -> GuideBook:
         """функция создания справочника"""
-        guidebook = GuideBook.objects.create(
-            company_id=pk_company,
-            title=kwargs.get("title"),
-            parent_guide_book_id=kwargs.get("parent_guide_book"),
-        )
+        with transaction.atomic():
+            guidebook = GuideBook.objects.create(
+                company_id=pk_company,
+                title=kwargs.get("title"),
+                parent_guide_book_id=kwargs.get("parent_guide_book"),
+            )
+            cls.refresh_hierarchy(guidebook)
+            GuideBookAggregateService.change_children_count(
+                guidebook.parent_guide_book_id, 1
+            )
         return guidebook
 
     @classmethod
     def update_guidebook(cls, guidebook: GuideBook, **kwargs) -> GuideBook:
         """функция обновления справочника"""
+        old_parent_id = guidebook.parent_guide_book_id
         guidebook.company_id = kwargs.get("company", guidebook.company_id)
         guidebook.title = kwargs.get("title", guidebook.title)
-        guidebook.parent_guide_book = kwargs.get(
-            "parent_guide_book", guidebook.parent_guide_book
+        guidebook.parent_guide_book_id = kwargs.get(
+            "parent_guide_book", guidebook.parent_guide_book_id
         )
 
-        guidebook.save()
+        with transaction.atomic():
+            old_ancestor_ids = guidebook.ancestor_ids
+            moved = guidebook.parent_guide_book_id != old_parent_id
+            if moved:
+                cls.refresh_hierarchy(guidebook)
+            # путь, агрегаты и версия обновляются своими запросами и не перезаписываются
+            guidebook.save(update_fields=["company", "title", "parent_guide_book"])
+            cls.touch_guidebooks(
+                [guidebook.id, old_parent_id, guidebook.parent_guide_book_id]
+            )
+            if moved:
+                # работы поддерева переходят от старых предков к новым
+                GuideBookAggregateService.recompute_guidebooks(
+                    old_ancestor_ids + guidebook.ancestor_ids
+                )
         return guidebook
 
+    @classmethod
+    def soft_delete_guidebook(cls, guidebook: GuideBook) -> None:
+        """
+        функция мягкого удаления справочника вместе со всеми вложенными справочниками
+        и работами: два UPDATE по материализованному пути независимо от размера
+        поддерева. Удаленные строки помечаются pk справочника (deleted_with),
+        удаленные раньше справочники и работы не помечаются и не восстанавливаются
+        """
+        subtree = GuideBook.objects.filter(
+            path__startswith=guidebook.path, is_delete=False
+        )
+        with transaction.atomic():
+            Work.objects.filter(
+                guidebook_id__in=subtree.values("id"), is_delete=False
+            ).update(is_delete=True, deleted_with=guidebook.id)
+            subtree.update(
+                is_delete=True,
+                deleted_with=guidebook.id,
+                version=F("version") + 1,
+                changed_at=timezone.now(),
+            )
+            GuideBookAggregateService.recompute_guidebooks(guidebook.ancestor_ids)
+        guidebook.is_delete = True
+        guidebook.deleted_with = guidebook.id
+
+    @classmethod
+    def check_price_multiplier(
+        cls, guidebook: GuideBook, price_multiplier: Decimal
+    ) -> None:
+        """умноженная максимальная цена поддерева должна помещаться в price_by_unit"""
+        max_price = Work.objects.filter(
+            guidebook__path__startswith=guidebook.path,
+            guidebook__is_delete=False,
+            is_delete=False,
+        ).aggregate(max_price=Max("price_by_unit"))["max_price"]
+        if (
+            max_price is not None
+            and (max_price * price_multiplier).quantize(1, rounding=ROUND_HALF_UP)
+            > MAX_PRICE_BY_UNIT
+        ):
+            raise serializers.ValidationError(
+                {"price_multiplier": ["Цена работы после умножения слишком велика."]}
+            )
+
+    @classmethod
+    def clone_guidebook(
+        cls,
+        guidebook: GuideBook,
+        pk_company: int,
+        parent: GuideBook = None,
+        price_multiplier: Decimal = None,
+    ) -> dict:
+        """
+        функция копирования справочника со всеми вложенными справочниками и работами
+        в компанию pk_company (в корень или в справочник parent). Справочники
+        создаются bulk_create по уровням, связи с родителями подставляются в памяти,
+        работы копируются пачками, цены умножаются на price_multiplier
+        с округлением до целого. Агрегаты копий считаются в памяти
+        """
+        base_depth = parent.depth + 1 if parent is not None else 0
+        with transaction.atomic():
+            if price_multiplier is not None:
+                cls.check_price_multiplier(guidebook, price_multiplier)
+            rows = list(
+                GuideBook.objects.filter(
+                    path__startswith=guidebook.path, is_delete=False
+                )
+                .order_by("depth", "id")
+                .values("id", "title", "parent_guide_book_id", "depth")
+            )
+            clones = {}
+            levels = defaultdict(list)
+            for row in rows:
+                levels[row["depth"]].append(row)
+            for depth in sorted(levels):
+                nodes = []
+                for row in levels[depth]:
+                    if row["id"] == guidebook.id:
+                        new_parent = parent
+                    else:
+                        new_parent = clones.get(row["parent_guide_book_id"])
+                        if new_parent is None:
+                            continue  # родитель удален
+                    nodes.append(
+                        (
+                            row["id"],
+                            GuideBook(
+                                company_id=pk_company,
+                                title=row["title"],
+                                parent_guide_book=new_parent,
+                                depth=base_depth + depth - guidebook.depth,
+                            ),
+                        )
+                    )
+                GuideBook.objects.bulk_create(
+                    [node for _, node in nodes], batch_size=cls.clone_batch_size
+                )
+                for pk, node in nodes:
+                    parent_path = (
+                        node.parent_guide_book.path if node.parent_guide_book else ""
+                    )
+                    node.path = GuideBook.build_path(parent_path, node.pk)
+                    clones[pk] = node
+
+            works = Work.objects.filter(
+                guidebook_id__in=list(clones), is_delete=False
+            ).order_by("id")
+            batch = []
+            works_created = 0
+            rates = ExchangeRateCache.get_rates()
+            for work in works.values(
+                "guidebook_id",
+                "title",
+                "price_by_unit",
+                "unit_of_measurement",
+                "currency",
+            ).iterator(chunk_size=cls.clone_batch_size):
+                node = clones[work["guidebook_id"]]
+                price = work["price_by_unit"]
+                if price_multiplier is not None:
+                    price = int(
+                        (price * price_multiplier).quantize(1, rounding=ROUND_HALF_UP)
+                    )
+                batch.append(
+                    Work(
+                        guidebook_id=node.pk,
+                        title=work["title"],
+                        price_by_unit=price,
+                        unit_of_measurement=work["unit_of_measurement"],
+                        currency=work["currency"],
+                        normalized_price=ExchangeRateCache.normalize(
+                            price, work["currency"], rates
+                        ),
+                    )
+                )
+                node.works_count += 1
+                GuideBookAggregateService.merge_price_stats(
+                    node.price_stats,
+                    work["currency"],
+                    {"count": 1, "sum": price, "min": price, "max": price},
+                )
+                if len(batch) >= cls.clone_batch_size:
+                    Work.objects.bulk_create(batch)
+                    works_created += len(batch)
+                    batch = []
+            if batch:
+                Work.objects.bulk_create(batch)
+                works_created += len(batch)
+
+            # цены справочника включают цены вложенных: от листьев к корню
+            nodes = sorted(clones.values(), key=lambda node: node.depth, reverse=True)
+            for node in nodes:
+                node.subtree_works_count = sum(
+                    stats["count"] for stats in node.price_stats.values()
+                )
+                node_parent = node.parent_guide_book
+                if node_parent is not None and node_parent is not parent:
+                    node_parent.children_count += 1
+                    for currency, stats in node.price_stats.items():
+                        GuideBookAggregateService.merge_price_stats(
+                            node_parent.price_stats, currency, stats
+                        )
+            GuideBook.objects.bulk_update(
+                nodes, ["path", *AGGREGATE_FIELDS], batch_size=cls.clone_batch_size
+            )
+            if parent is not None:
+                GuideBookAggregateService.recompute_guidebooks(
+                    parent.ancestor_ids + [parent.id]
+                )
+        return {
+            "guidebook": clones[guidebook.id],
+            "guidebooks_created": len(clones),
+            "works_created": works_created,
+        }
+
+    @classmethod
+    def restore_guidebook(cls, guidebook: GuideBook) -> GuideBook:
+        """
+        функция восстановления удаленного справочника и всего, что было удалено
+        вместе с ним, двумя UPDATE. Родительский справочник должен быть не удален
+        """
+        parent = guidebook.parent_guide_book
+        if parent is not None and parent.is_delete:
+            raise serializers.ValidationError(
+                {"parent_guide_book": ["Сначала восстановите родительский справочник."]}
+            )
+        with transaction.atomic():
+            GuideBook.objects.filter(
+                Q(deleted_with=guidebook.id) | Q(id=guidebook.id)
+            ).update(
+                is_delete=False,
+                deleted_with=None,
+                version=F("version") + 1,
+                changed_at=timezone.now(),
+            )
+            Work.objects.filter(deleted_with=guidebook.id).update(
+                is_delete=False, deleted_with=None
+            )
+            GuideBookAggregateService.recompute_guidebooks(guidebook.ancestor_ids)
+        guidebook.refresh_from_db()
+        return guidebook
+
+
+class GuideBookAggregateService(BaseService):
+    """
+    Поддержка агрегатов справочника: количество вложенных справочников,
+    работ справочника, работ с вложенными и цен по валютам (count, sum, min, max).
+    Изменения работ применяются инкрементально к справочнику и всем его предкам,
+    структурные изменения дерева пересчитывают затронутые справочники запросами.
+    Затронутые справочники получают новую версию (ETag, кэш ответов).
+    """
+
+    aggregate_fields = AGGREGATE_FIELDS
+
+    @staticmethod
+    def merge_price_stats(price_stats: dict, currency: str, stats: dict) -> None:
+        """добавление цен одной валюты (count, sum, min, max) к ценам справочника"""
+        current = price_stats.get(currency)
+        if current is None:
+            price_stats[currency] = {
+                key: stats[key] for key in ("count", "sum", "min", "max")
+            }
+        else:
+            current["count"] += stats["count"]
+            current["sum"] += stats["sum"]
+            current["min"] = min(current["min"], stats["min"])
+            current["max"] = max(current["max"], stats["max"])
+
+    @classmethod
+    def get_subtree_price_stats(cls, guidebook: GuideBook) -> dict:
+        """цены работ справочника и его потомков по валютам одним запросом"""
+        rows = (
+            Work.objects.filter(
+                guidebook__path__startswith=guidebook.path,
+                guidebook__is_delete=False,
+                is_delete=False,
+            )
+            .values("currency")
+            .annotate(
+                count=Count("id"),
+                sum=Sum("price_by_unit"),
+                min=Min("price_by_unit"),
+                max=Max("price_by_unit"),
+            )
+            .order_by()
+        )
+        return {
+            row["currency"]: {
+                "count": row["count"],
+                "sum": row["sum"],
+                "min": row["min"],
+                "max": row["max"],
+            }
+            for row in rows
+        }
+
+    @classmethod
+    def apply_work_changes(cls, changes: list[tuple[int, str, int, int]]) -> None:
+        """
+        функция применения изменений работ к агрегатам справочников,
+        changes - (pk справочника, валюта, цена, +1 добавлена / -1 удалена).
+        Вызывается после записи работ в той же транзакции. Минимум и максимум
+        пересчитываются запросом, только если удалена крайняя цена
+        """
+        changes = [change for change in changes if change[0] is not None]
+        if not changes:
+            return
+        paths = dict(
+            GuideBook.objects.filter(
+                id__in={change[0] for change in changes}
+            ).values_list("id", "path")
+        )
+        direct = defaultdict(int)
+        affected = defaultdict(list)
+        for guidebook_id, currency, price, sign in changes:
+            direct[guidebook_id] += sign
+            for pk in paths.get(guidebook_id, "").split(PATH_SEPARATOR)[:-1]:
+                affected[int(pk)].append((currency, price, sign))
+
+        guidebooks = list(
+            GuideBook.objects.select_for_update()
+            .filter(id__in=affected)
+            .only("id", "path", "version", *cls.aggregate_fields)
+            .order_by("id")
+        )
+        now = timezone.now()
+        for guidebook in guidebooks:
+            guidebook.works_count = max(
+                0, guidebook.works_count + direct.get(guidebook.id, 0)
+            )
+            stale = set()
+            for currency, price, sign in affected[guidebook.id]:
+                stats = guidebook.price_stats.setdefault(
+                    currency, {"count": 0, "sum": 0, "min": None, "max": None}
+                )
+                low, high = stats["min"], stats["max"]
+                stats["count"] += sign
+                stats["sum"] += sign * price
+                if sign > 0:
+                    stats["min"] = price if low is None else min(low, price)
+                    stats["max"] = price if high is None else max(high, price)
+                elif low is None or price in (low, high):
+                    stale.add(currency)
+            if stale:
+                # удалена крайняя цена: минимум и максимум только из базы
+                actual = cls.get_subtree_price_stats(guidebook)
+                for currency in stale:
+                    if currency in actual:
+                        guidebook.price_stats[currency] = actual[currency]
+                    else:
+                        guidebook.price_stats.pop(currency, None)
+            guidebook.price_stats = {
+                currency: stats
+                for currency, stats in guidebook.price_stats.items()
+                if stats["count"] > 0
+            }
+            guidebook.subtree_works_count = sum(
+                stats["count"] for stats in guidebook.price_stats.values()
+            )
+            guidebook.version += 1
+            guidebook.changed_at = now
+        GuideBook.objects.bulk_update(
+            guidebooks, [*cls.aggregate_fields, "version", "changed_at"]
+        )
+
+    @classmethod
+    def recompute_guidebooks(cls, pks) -> None:
+        """
+        функция полного пересчета агрегатов справочников запросами,
+        для переноса и удаления справочников (затрагивают цепочку предков)
+        """
+        pks = {pk for pk in pks if pk is not None}
+        if not pks:
+            return
+        guidebooks = list(
+            GuideBook.objects.select_for_update()
+            .filter(id__in=pks)
+            .only("id", "path", "version", *cls.aggregate_fields)
+            .order_by("id")
+        )
+        children = dict(
+            GuideBook.objects.filter(parent_guide_book_id__in=pks, is_delete=False)
+            .values("parent_guide_book_id")
+            .annotate(count=Count("id"))
+            .order_by()
+            .values_list("parent_guide_book_id", "count")
+        )
+        works = dict(
+            Work.objects.filter(guidebook_id__in=pks, is_delete=False)
+            .values("guidebook_id")
+            .annotate(count=Count("id"))
+            .order_by()
+            .values_list("guidebook_id", "count")
+        )
+        now = timezone.now()
+        for guidebook in guidebooks:
+            guidebook.children_count = children.get(guidebook.id, 0)
+            guidebook.works_count = works.get(guidebook.id, 0)
+            guidebook.price_stats = cls.get_subtree_price_stats(guidebook)
+            guidebook.subtree_works_count = sum(
+                stats["count"] for stats in guidebook.price_stats.values()
+            )
+            guidebook.version += 1
+            guidebook.changed_at = now
+        GuideBook.objects.bulk_update(
+            guidebooks, [*cls.aggregate_fields, "version", "changed_at"]
+        )
+
+    @classmethod
+    def change_children_count(cls, pk: int, delta: int) -> None:
+        """функция изменения количества вложенных справочников родителя"""
+        if pk is not None:
+            GuideBook.objects.filter(id=pk).update(
+                children_count=F("children_count") + delta,
+                version=F("version") + 1,
+                changed_at=timezone.now(),
+            )
+
+    @classmethod
+    def rebuild_company(cls, pk_company: int) -> int:
+        """
+        функция пересчета агрегатов всех справочников компании (исправление
+        расхождений): два запроса на чтение, сохраняются только изменившиеся.
+        Возвращает количество исправленных справочников
+        """
+        with transaction.atomic():
+            guidebooks = list(
+                GuideBook.objects.select_for_update()
+                .filter(company_id=pk_company)
+                .only(
+                    "id",
+                    "path",
+                    "parent_guide_book_id",
+                    "is_delete",
+                    "version",
+                    *cls.aggregate_fields,
+                )
+            )
+            paths = {guidebook.id: guidebook.path for guidebook in guidebooks}
+            children = Counter(
+                guidebook.parent_guide_book_id
+                for guidebook in guidebooks
+                if not guidebook.is_delete
+            )
+            works = Counter()
+            price_stats = defaultdict(dict)
+            rows = (
+                Work.objects.filter(
+                    guidebook__company_id=pk_company,
+                    guidebook__is_delete=False,
+                    is_delete=False,
+                )
+                .values("guidebook_id", "currency")
+                .annotate(
+                    count=Count("id"),
+                    sum=Sum("price_by_unit"),
+                    min=Min("price_by_unit"),
+                    max=Max("price_by_unit"),
+                )
+                .order_by()
+            )
+            for row in rows:
+                works[row["guidebook_id"]] += row["count"]
+                path = paths.get(row["guidebook_id"], "")
+                for pk in path.split(PATH_SEPARATOR)[:-1]:
+                    cls.merge_price_stats(price_stats[int(pk)], row["currency"], row)
+
+            changed = []
+            now = timezone.now()
+            for guidebook in guidebooks:
+                actual = {
+                    "children_count": children[guidebook.id],
+                    "works_count": works[guidebook.id],
+                    "price_stats": price_stats.get(guidebook.id, {}),
+                }
+                actual["subtree_works_count"] = sum(
+                    stats["count"] for stats in actual["price_stats"].values()
+                )
+                if any(
+                    getattr(guidebook, field) != value
+                    for field, value in actual.items()
+                ):
+                    for field, value in actual.items():
+                        setattr(guidebook, field, value)
+                    guidebook.version += 1
+                    guidebook.changed_at = now
+                    changed.append(guidebook)
+            GuideBook.objects.bulk_update(
+                changed,
+                [*cls.aggregate_fields, "version", "changed_at"],
+                batch_size=1000,
+            )
+        return len(changed)
+
 
 class WorkService(BaseService):
     """операции с работами"""
 
+    # поля, которые выводит WorkDataOutputSerializer
+    output_fields = (
+        "id",
+        "title",
+        "price_by_unit",
+        "unit_of_measurement",
+        "currency",
+        "guidebook__id",
+        "guidebook__title",
+    )
+    bulk_batch_size = 500  # размер пачки для bulk_create/bulk_update
+
     @classmethod
     def get_work(cls, pk: int) -> Union[Work, None]:
-        """функция для получения работы по pk_work"""
-        return cls.get_object_by_model(Work, pk)
+        """функция для получения работы по pk_work вместе со справочником"""
+        return (
+            Work.objects.select_related("guidebook")
+            .filter(id=pk, is_delete=False)
+            .first()
+        )
+
+    @classmethod
+    async def aget_work(cls, pk: int) -> Union[Work, None]:
+        """асинхронная версия get_work"""
+        return (
+            await Work.objects.select_related("guidebook")
+            .filter(id=pk, is_delete=False)
+            .afirst()
+        )
+
+    @classmethod
+    def get_works_queryset(cls, pk_guidebook: int) -> QuerySet[Work]:
+        """запрос работ справочника вместе со справочником, только выводимые поля"""
+        return (
+            Work.objects.filter(guidebook_id=pk_guidebook, is_delete=False)
+            .select_related("guidebook")
+            .only(*cls.output_fields)
+        )
 
     @classmethod
     def get_works_by_pk_guidebook(
         cls, pk_guidebook: int
     ) -> Union[QuerySet[Work], None]:
-        """функция получения списка работ внутри справочника."""
-        works = Work.objects.filter(guidebook_id=pk_guidebook)
+        """функция получения списка работ внутри справочника вместе со справочником."""
+        works = cls.get_works_queryset(pk_guidebook)
         if not works.exists():
             return None
         return works
 
+    @classmethod
+    def search_works(
+        cls,
+        pk_company: int,
+        root: GuideBook = None,
+        title: str = None,
+        search_mode: str = None,
+        price_min: int = None,
+        price_max: int = None,
+        unit_of_measurement: str = None,
+        currency: str = None,
+    ) -> QuerySet[Work]:
+        """
+        функция поиска работ по всем справочникам компании одним запросом,
+        root ограничивает поиск справочником и его потомками
+        """
+        works = (
+            Work.objects.filter(
+                guidebook__company_id=pk_company,
+                guidebook__is_delete=False,
+                is_delete=False,
+            )
+            .select_related("guidebook")
+            .only(*cls.output_fields, "guidebook__path")
+        )
+        if root is not None:
+            works = works.filter(guidebook__path__startswith=root.path)
+        if price_min is not None:
+            works = works.filter(price_by_unit__gte=price_min)
+        if price_max is not None:
+            works = works.filter(price_by_unit__lte=price_max)
+        if unit_of_measurement:
+            works = works.filter(unit_of_measurement=unit_of_measurement)
+        if currency:
+            works = works.filter(currency=currency)
+        if title:
+            return search_by_title(works, title, search_mode)
+        return works.order_by("id")
+
+    @classmethod
+    def get_works_by_pks(cls, pks: list[int]) -> dict[int, Work]:
+        """функция получения работ по списку pk вместе со справочниками одним запросом"""
+        return (
+            Work.objects.select_related("guidebook")
+            .filter(is_delete=False)
+            .in_bulk(pks)
+        )
+
+    @classmethod
+    def bulk_create_works(
+        cls, items: list[dict], guidebooks: dict[int, GuideBook] = None
+    ) -> list[Work]:
+        """
+        функция массового создания работ пачками в одной транзакции,
+        guidebooks - справочники работ, загруженные при валидации (для вывода без запросов)
+        """
+        works = []
+        rates = ExchangeRateCache.get_rates()
+        for item in items:
+            work = Work(
+                guidebook_id=item["guidebook"],
+                title=item.get("title"),
+                price_by_unit=item.get("price_by_unit"),
+                unit_of_measurement=item.get("unit_of_measurement"),
+                currency=item.get("currency"),
+                normalized_price=ExchangeRateCache.normalize(
+                    item.get("price_by_unit"), item.get("currency"), rates
+                ),
+            )
+            if guidebooks is not None:
+                work.guidebook = guidebooks[item["guidebook"]]
+            works.append(work)
+        with transaction.atomic():
+            Work.objects.bulk_create(works, batch_size=cls.bulk_batch_size)
+            GuideBookAggregateService.apply_work_changes(
+                [cls.get_aggregate_change(work, 1) for work in works]
+            )
+        return works
+
+    @classmethod
+    def lock_works(cls, pks: list[int]) -> dict[int, tuple[int, str, int]]:
+        """
+        блокирует не удаленные работы до конца транзакции, возвращает их
+        справочник, валюту и цену: старые значения для агрегатов
+        """
+        rows = (
+            Work.objects.select_for_update()
+            .filter(id__in=pks, is_delete=False)
+            .order_by("id")
+            .values_list("id", "guidebook_id", "currency", "price_by_unit")
+        )
+        return {
+            pk: (guidebook_id, currency, price)
+            for pk, guidebook_id, currency, price in rows
+        }
+
+    @classmethod
+    def bulk_update_works(
+        cls, works: list[Work], items: list[dict], guidebooks: dict[int, GuideBook]
+    ) -> list[Work]:
+        """
+        функция массового обновления работ пачками в одной транзакции,
+        works и items сопоставлены по порядку. Старые значения для агрегатов
+        берутся из заблокированных строк, удаленные тем временем работы пропускаются
+        """
+        with transaction.atomic():
+            locked = cls.lock_works([work.pk for work in works])
+            pairs = [
+                (work, item) for work, item in zip(works, items) if work.pk in locked
+            ]
+            works = [work for work, _ in pairs]
+            changes = [(*locked[work.pk], -1) for work in works]
+            fields = set()
+            for work, item in pairs:
+                for field, value in item.items():
+                    if field == "id":
+                        continue
+                    if field == "guidebook":
+                        work.guidebook = guidebooks[value]
+                    else:
+                        setattr(work, field, value)
+                    fields.add(field)
+            if fields & {"price_by_unit", "currency"}:
+                rates = ExchangeRateCache.get_rates()
+                for work in works:
+                    work.normalized_price = ExchangeRateCache.normalize(
+                        work.price_by_unit, work.currency, rates
+                    )
+                fields.add("normalized_price")
+            if fields:
+                Work.objects.bulk_update(
+                    works, sorted(fields), batch_size=cls.bulk_batch_size
+                )
+                GuideBookAggregateService.apply_work_changes(
+                    changes + [cls.get_aggregate_change(work, 1) for work in works]
+                )
+        return works
+
+    @classmethod
+    def bulk_soft_delete_works(cls, pks: list[int]) -> int:
+        """функция массового мягкого удаления работ"""
+        works = Work.objects.filter(id__in=pks, is_delete=False)
+        with transaction.atomic():
+            changes = [
+                (guidebook_id, currency, price, -1)
+                for guidebook_id, currency, price in works.values_list(
+                    "guidebook_id", "currency", "price_by_unit"
+                )
+            ]
+            deleted = works.update(is_delete=True)
+            GuideBookAggregateService.apply_work_changes(changes)
+        return deleted
+
+    @classmethod
+    def get_aggregate_change(cls, work: Work, sign: int) -> tuple[int, str, int, int]:
+        """изменение агрегатов справочников от добавления (+1) или удаления (-1)"""
+        return work.guidebook_id, work.currency, work.price_by_unit, sign
+
     @classmethod
     def create_work(cls, **kwargs) -> Work:
         """функция создания работы"""
-        work = Work.objects.create(
-            guidebook_id=kwargs.get("guidebook"),
-            title=kwargs.get("title"),
-            price_by_unit=kwargs.get("price_by_unit"),
-            unit_of_measurement=kwargs.get("unit_of_measurement"),
-            currency=kwargs.get("currency"),
-        )
+        with transaction.atomic():
+            work = Work.objects.create(
+                guidebook_id=kwargs.get("guidebook"),
+                title=kwargs.get("title"),
+                price_by_unit=kwargs.get("price_by_unit"),
+                unit_of_measurement=kwargs.get("unit_of_measurement"),
+                currency=kwargs.get("currency"),
+                normalized_price=ExchangeRateCache.normalize(
+                    kwargs.get("price_by_unit"), kwargs.get("currency")
+                ),
+            )
+            GuideBookAggregateService.apply_work_changes(
+                [cls.get_aggregate_change(work, 1)]
+            )
         return work
 
     @classmethod
-    def update_work(cls, work: Work, **kwargs) -> Work:
-        """функция обновления работы"""
-        work.guidebook_id = kwargs.get("guidebook", work.guidebook_id)
-        work.title = kwargs.get("title", work.title)
-        work.price_by_unit = kwargs.get("price_by_unit", work.price_by_unit)
-        work.unit_of_measurement = kwargs.get(
-            "unit_of_measurement", work.unit_of_measurement
-        )
-        work.currency = kwargs.get("currency", work.currency)
-        work.save()
+    def update_work(cls, work: Work, **kwargs) -> Union[Work, None]:
+        """
+        функция обновления работы, старые значения для агрегатов берутся
+        из заблокированной строки. Если работа уже удалена - None
+        """
+        with transaction.atomic():
+            locked = cls.lock_works([work.pk]).get(work.pk)
+            if locked is None:
+                return None
+            old_change = (*locked, -1)
+            work.guidebook_id = kwargs.get("guidebook", work.guidebook_id)
+            work.title = kwargs.get("title", work.title)
+            work.price_by_unit = kwargs.get("price_by_unit", work.price_by_unit)
+            work.unit_of_measurement = kwargs.get(
+                "unit_of_measurement", work.unit_of_measurement
+            )
+            work.currency = kwargs.get("currency", work.currency)
+            work.normalized_price = ExchangeRateCache.normalize(
+                work.price_by_unit, work.currency
+            )
+            work.save(
+                update_fields=[
+                    "guidebook",
+                    "title",
+                    "price_by_unit",
+                    "unit_of_measurement",
+                    "currency",
+                    "normalized_price",
+                ]
+            )
+            new_change = cls.get_aggregate_change(work, 1)
+            if new_change[:3] != old_change[:3]:
+                GuideBookAggregateService.apply_work_changes([old_change, new_change])
+            else:
+                GuideBookService.touch_guidebooks([work.guidebook_id])
         return work
+
+    @classmethod
+    def soft_delete_work(cls, work: Work) -> None:
+        """функция мягкого удаления работы"""
+        with transaction.atomic():
+            cls.soft_delete_get_object_by_model(work)
+            GuideBookAggregateService.apply_work_changes(
+                [cls.get_aggregate_change(work, -1)]
+            )
+
+
+class ExchangeRateService(BaseService):
+    """
+    Курсы валют и цены работ в базовой валюте (Work.normalized_price).
+    При изменении курса цены пересчитываются одним UPDATE на валюту
+    """
+
+    @classmethod
+    def update_rates(cls, rates: dict[str, Decimal]) -> list[str]:
+        """
+        функция сохранения курсов валют, цены работ пересчитываются
+        только для изменившихся курсов. Возвращает изменившиеся валюты
+        """
+        rates = {
+            currency: rate
+            for currency, rate in rates.items()
+            if currency != ExchangeRateCache.get_base_currency()
+        }
+        with transaction.atomic():
+            current = dict(
+                ExchangeRate.objects.select_for_update().values_list("currency", "rate")
+            )
+            changed = sorted(
+                currency
+                for currency, rate in rates.items()
+                if current.get(currency) != rate
+            )
+            now = timezone.now()
+            for currency in changed:
+                ExchangeRate.objects.update_or_create(
+                    currency=currency,
+                    defaults={"rate": rates[currency], "changed_at": now},
+                )
+            cls.recompute_normalized_prices(changed)
+            transaction.on_commit(ExchangeRateCache.invalidate)
+        return changed
+
+    @classmethod
+    def recompute_normalized_prices(
+        cls, currencies, works: QuerySet[Work] = None
+    ) -> int:
+        """
+        функция пересчета цен работ в базовой валюте, один UPDATE на валюту.
+        Справочники работ получают новую версию: меняются фильтр и сортировка по цене.
+        Курсы читаются из базы: кэш сбрасывается только после коммита
+        """
+        works = Work.objects.all() if works is None else works
+        rates = ExchangeRateCache.load_rates()
+        updated = 0
+        with transaction.atomic():
+            for currency in currencies:
+                rate = rates.get(currency)
+                price = None
+                if rate is not None:
+                    price = Round(
+                        F("price_by_unit") * Value(rate, output_field=DecimalField()),
+                        2,
+                        output_field=DecimalField(max_digits=18, decimal_places=2),
+                    )
+                updated += works.filter(currency=currency).update(
+                    normalized_price=price
+                )
+            GuideBook.objects.filter(
+                id__in=works.filter(currency__in=currencies).values("guidebook_id")
+            ).update(version=F("version") + 1, changed_at=timezone.now())
+        return updated
+
+
+class EstimateService(BaseService):
+    """
+    Расчет сметы по строкам (работа, объем): все работы загружаются одним запросом,
+    суммы строк, итоги по справочникам и валютам считаются за один проход
+    """
+
+    @classmethod
+    def get_works(cls, pks) -> dict[int, dict]:
+        """не удаленные работы по pk вместе со справочником и компанией"""
+        return {
+            row["id"]: row
+            for row in Work.objects.filter(
+                id__in=set(pks), is_delete=False, guidebook__is_delete=False
+            ).values(
+                "id",
+                "title",
+                "price_by_unit",
+                "unit_of_measurement",
+                "currency",
+                "guidebook_id",
+                "guidebook__title",
+                "guidebook__company_id",
+            )
+        }
+
+    @classmethod
+    def calculate(cls, items: list[dict], works: dict[int, dict]) -> dict:
+        """
+        функция расчета сметы, сумма строки - цена за единицу на объем
+        с округлением до копеек, итоги складываются из сумм строк
+        """
+        lines = []
+        guidebooks = {}
+        totals = defaultdict(Decimal)
+        for item in items:
+            work = works[item["work"]]
+            total = (work["price_by_unit"] * item["quantity"]).quantize(
+                CENT, rounding=ROUND_HALF_UP
+            )
+            lines.append(
+                {
+                    "work": work["id"],
+                    "title": work["title"],
+                    "guidebook": work["guidebook_id"],
+                    "unit_of_measurement": work["unit_of_measurement"],
+                    "price_by_unit": work["price_by_unit"],
+                    "currency": work["currency"],
+                    "quantity": item["quantity"],
+                    "total": total,
+                }
+            )
+            group = guidebooks.get(work["guidebook_id"])
+            if group is None:
+                group = guidebooks[work["guidebook_id"]] = {
+                    "id": work["guidebook_id"],
+                    "title": work["guidebook__title"],
+                    "totals": defaultdict(Decimal),
+                }
+            group["totals"][work["currency"]] += total
+            totals[work["currency"]] += total
+        return {
+            "lines": lines,
+            "guidebooks": list(guidebooks.values()),
+            "totals": totals,
+        }
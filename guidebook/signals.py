@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from company.models import CompanyRoleUser
+from guidebook.cache import CompanyRolesCache
+
+
+@receiver([post_save, post_delete], sender=CompanyRoleUser)
+def invalidate_company_roles(sender, instance, **kwargs):
+    """сбрасываем кэш ролей пользователя сразу и повторно после коммита транзакции"""
+    CompanyRolesCache.invalidate(instance.user_id, instance.company_id)
+    transaction.on_commit(
+        lambda: CompanyRolesCache.invalidate(instance.user_id, instance.company_id)
+    )
@@ -1,12 +1,19 @@
+from django.core.cache import cache
+from django.test import override_settings
 from rest_framework.test import APIClient, APITestCase
 
 from company.models import ClientCompany, Company, CompanyRoleUser
 from core.base.utils import GetUrlUtils
 from guidebook.apps import GuidebookConfig
-from guidebook.models import GuideBook, Work
+from guidebook.cache import ExchangeRateCache
+from guidebook.models import Work
+from guidebook.service import GuideBookAggregateService, GuideBookService
 from users.models import User
 
 
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
 class BaseConstructionObjectTestCase(APITestCase, GetUrlUtils):
     module_name = GuidebookConfig.name
 
@@ -14,6 +21,8 @@ class BaseConstructionObjectTestCase(APITestCase, GetUrlUtils):
         """
         создаем бд
         """
+        cache.clear()
+        ExchangeRateCache.invalidate()
         self.client_1 = APIClient()
         self.client_2 = APIClient()
         self.client_3 = APIClient()
@@ -108,17 +117,15 @@ class BaseConstructionObjectTestCase(APITestCase, GetUrlUtils):
             invite_token="test_token__invite_client_individual_entrepreneur_2",
         )
 
-        self.base_guidebook_1 = GuideBook.objects.create(
+        self.base_guidebook_1 = GuideBookService.create_guidebook(
+            self.company_1.pk,
             title="Внутренняя отделка",
-            company=self.company_1,
-            is_delete=False,
         )
 
-        self.base_guidebook_2 = GuideBook.objects.create(
+        self.base_guidebook_2 = GuideBookService.create_guidebook(
+            self.company_1.pk,
             title="Внешняя отделка",
-            company=self.company_1,
-            is_delete=False,
-            parent_guide_book=self.base_guidebook_1,
+            parent_guide_book=self.base_guidebook_1.pk,
         )
 
         self.base_work_1 = Work.objects.create(
@@ -139,6 +146,9 @@ class BaseConstructionObjectTestCase(APITestCase, GetUrlUtils):
             is_delete=False,
         )
 
+        # работы созданы напрямую, агрегаты справочников пересчитываем
+        GuideBookAggregateService.rebuild_company(self.company_1.pk)
+
         self.client_1.force_authenticate(user=self.user_1)  # авторизовываемся
         self.client_2.force_authenticate(user=self.user_2)  # авторизовываемся
         self.client_3.force_authenticate(user=self.user_3)  # авторизовываемся
@@ -1,6 +1,13 @@
+import json
+
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 
-from ..models import GuideBook
+from ..cache import GuideBookResponseCache
+from ..metrics import metrics
+from ..models import GuideBook, Work
+from ..renderers import FastJSONRenderer
+from ..service import GuideBookAggregateService, GuideBookService, WorkService
 from .base import BaseConstructionObjectTestCase
 
 
@@ -20,6 +27,84 @@ class GuideBookTestCase(BaseConstructionObjectTestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_base_guide_book_retrieve_num_queries(self):
+        """
+        Тест, количество запросов при получении справочника не зависит
+        от количества вложенных справочников и работ
+        """
+
+        for number in range(5):
+            GuideBookService.create_guidebook(
+                self.company_1.pk,
+                title=f"Подраздел {number}",
+                parent_guide_book=self.base_guidebook_1.pk,
+            )
+            Work.objects.create(
+                guidebook=self.base_guidebook_1,
+                title=f"Работа {number}",
+                price_by_unit=100,
+                unit_of_measurement=Work.UnitType.SQUARE_METER,
+                currency=Work.CurrencyType.RUB,
+            )
+
+        # справочник, роли пользователя и по одному на вложенные справочники и работы
+        with self.assertNumQueries(4):
+            response = self.client_1.get(
+                self.get_url("pk_guidebook", pk_guidebook=self.base_guidebook_1.pk)
+            )
+
+        data = response.json()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(data["guidebook"]["id"], self.base_guidebook_1.pk)
+        self.assertEqual(len(data["nested_guidebooks"]), 6)
+        self.assertEqual(len(data["nested_works"]), 7)
+
+    def test_base_guide_book_retrieve_cached_roles(self):
+        """
+        Тест, роли пользователя в компании и данные ответа берутся из кэша,
+        роли сбрасываются при удалении роли
+        """
+
+        url = self.get_url("pk_guidebook", pk_guidebook=self.base_guidebook_1.pk)
+        self.client_2.get(url)
+
+        # только справочник, роли и ответ из кэша
+        with self.assertNumQueries(1):
+            response = self.client_2.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            GuideBookResponseCache.get_stats(), {"hits": 1, "misses": 1}
+        )
+
+        self.company_role_user_3.delete()
+        response = self.client_2.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_base_guide_book_retrieve_not_modified(self):
+        """
+        Тест, повторный запрос с If-None-Match возвращает 304 без запросов вложенных данных,
+        после изменения вложенного справочника ETag меняется
+        """
+
+        url = self.get_url("pk_guidebook", pk_guidebook=self.base_guidebook_1.pk)
+        response = self.client_1.get(url)
+        etag = response["ETag"]
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # только справочник, роли пользователя из кэша
+        with self.assertNumQueries(1):
+            response = self.client_1.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        GuideBookService.create_guidebook(
+            self.company_1.pk,
+            title="Подраздел",
+            parent_guide_book=self.base_guidebook_1.pk,
+        )
+        response = self.client_1.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
     def test_base_guide_book_retrieve_left_user(self):
         """
         Тест, получение объекта по id пользователем не состоящем в компании
@@ -35,6 +120,75 @@ class GuideBookTestCase(BaseConstructionObjectTestCase):
 
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_async_guide_book_retrieve(self):
+        """
+        Тест, асинхронное вью возвращает те же данные, что и синхронное
+        """
+
+        response = self.client_1.get(
+            self.get_url("async/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk)
+        )
+        sync_response = self.client_1.get(
+            self.get_url("pk_guidebook", pk_guidebook=self.base_guidebook_1.pk)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), sync_response.json())
+
+    def test_async_guide_book_retrieve_left_user(self):
+        """
+        Тест, асинхронное вью проверяет роль пользователя в компании
+        """
+
+        response = self.client_3.get(
+            self.get_url("async/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_guide_book_metrics(self):
+        """
+        Тест, запрос к справочнику попадает в метрики без дублей SQL-запросов,
+        метрики доступны только администратору
+        """
+
+        metrics.reset()
+        self.client_1.get(
+            self.get_url("pk_guidebook", pk_guidebook=self.base_guidebook_1.pk)
+        )
+
+        labels = ("GuideBookDetailView", "GET", "200")
+        self.assertEqual(metrics.latency[labels].count, 1)
+        self.assertEqual(metrics.query_counts[labels].sum, 4)
+        self.assertEqual(metrics.duplicate_queries[labels], 0)
+
+        response = self.client_1.get(self.get_url("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user_1.is_staff = True
+        self.user_1.save()
+        response = self.client_1.get(self.get_url("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(
+            'guidebook_request_duration_seconds_count{view="GuideBookDetailView",'
+            'method="GET",status="200"} 1',
+            response.content.decode(),
+        )
+
+    def test_fast_json_renderer(self):
+        """
+        Тест, FastJSONRenderer отдает те же байты, что и JSONRenderer
+        """
+
+        data = {
+            "id": 1,
+            "title": "Отделка \u2028 «стен»",
+            "changed_at": self.base_guidebook_1.changed_at,
+            "children": [{"id": 2, "title": "Покраска", "works": [], "price": None}],
+        }
+
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
     def test_base_guide_book_list(self):
         """
         Тест, получение списка справочников
@@ -204,3 +358,338 @@ class GuideBookTestCase(BaseConstructionObjectTestCase):
             self.get_url("change/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk)
         )
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_base_guide_book_delete_cascade_and_restore(self):
+        """
+        Тест, удаление справочника удаляет вложенные справочники и работы,
+        восстановление возвращает только удаленное вместе с ним
+        """
+
+        work = WorkService.create_work(
+            guidebook=self.base_guidebook_2.pk,
+            title="Монтаж плитки",
+            price_by_unit=3000,
+            unit_of_measurement=Work.UnitType.SQUARE_METER,
+            currency=Work.CurrencyType.RUB,
+        )
+        WorkService.soft_delete_work(self.base_work_1)
+
+        response = self.client_1.delete(
+            self.get_url("change/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk)
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(GuideBook.objects.filter(is_delete=False).exists())
+        self.assertFalse(Work.objects.filter(is_delete=False).exists())
+
+        response = self.client_1.post(
+            self.get_url("restore/pk_guidebook", pk_guidebook=self.base_guidebook_2.pk)
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client_1.post(
+            self.get_url("restore/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk)
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(GuideBook.objects.filter(is_delete=False).count(), 2)
+        self.assertEqual(
+            set(Work.objects.filter(is_delete=False).values_list("id", flat=True)),
+            {self.base_work_2.pk, work.pk},
+        )
+
+    def test_restore_guide_book_not_deleted(self):
+        """
+        Тест, восстановление не удаленного справочника
+        должно выдать ошибку HTTP_404_NOT_FOUND
+        """
+
+        response = self.client_1.post(
+            self.get_url("restore/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_clone_guide_book(self):
+        """
+        Тест, копирование справочника с вложенными справочниками и работами
+        с множителем цен, агрегаты копий совпадают с полным пересчетом
+        """
+
+        WorkService.create_work(
+            guidebook=self.base_guidebook_2.pk,
+            title="Монтаж плитки",
+            price_by_unit=3000,
+            unit_of_measurement=Work.UnitType.SQUARE_METER,
+            currency=Work.CurrencyType.RUB,
+        )
+
+        response = self.client_1.post(
+            self.get_url("clone/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk),
+            {"company": self.company_1.pk, "price_multiplier": "1.5"},
+            format="json",
+        )
+
+        data = response.json()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(data["guidebooks_created"], 2)
+        self.assertEqual(data["works_created"], 3)
+        clone = GuideBook.objects.get(pk=data["guidebook"]["id"])
+        self.assertEqual(clone.path, f"{clone.pk}/")
+        self.assertEqual(
+            sorted(
+                Work.objects.filter(guidebook__path__startswith=clone.path).values_list(
+                    "price_by_unit", flat=True
+                )
+            ),
+            [1500, 3000, 4500],
+        )
+        self.assertEqual(clone.children_count, 1)
+        self.assertEqual(clone.subtree_works_count, 3)
+        self.assertEqual(GuideBookAggregateService.rebuild_company(self.company_1.pk), 0)
+
+    def test_clone_guide_book_price_overflow(self):
+        """
+        Тест, копирование с множителем, после которого цена не помещается
+        в price_by_unit, должно выдать ошибку HTTP_400_BAD_REQUEST
+        """
+
+        Work.objects.filter(pk=self.base_work_1.pk).update(price_by_unit=3000000)
+        guidebooks_count = GuideBook.objects.count()
+
+        response = self.client_1.post(
+            self.get_url("clone/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk),
+            {"company": self.company_1.pk, "price_multiplier": "1000"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("price_multiplier", response.json())
+        self.assertEqual(GuideBook.objects.count(), guidebooks_count)
+
+    def test_clone_guide_book_left_user(self):
+        """
+        Тест, копирование справочника в компанию без роли author
+        должно выдать ошибку HTTP_403_FORBIDDEN
+        """
+
+        response = self.client_1.post(
+            self.get_url("clone/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk),
+            {"company": self.company_2.pk},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_guide_book_hierarchy(self):
+        """
+        Тест, материализованный путь заполняется при создании,
+        предки и потомки получаются одним запросом
+        """
+
+        guidebook_3 = GuideBookService.create_guidebook(
+            self.company_1.pk,
+            title="Штукатурка",
+            parent_guide_book=self.base_guidebook_2.pk,
+        )
+
+        self.assertEqual(
+            guidebook_3.path,
+            f"{self.base_guidebook_1.pk}/{self.base_guidebook_2.pk}/{guidebook_3.pk}/",
+        )
+        self.assertEqual(guidebook_3.depth, 2)
+        with self.assertNumQueries(1):
+            ancestors = list(GuideBookService.get_ancestors(guidebook_3))
+        self.assertEqual(ancestors, [self.base_guidebook_1, self.base_guidebook_2])
+        with self.assertNumQueries(1):
+            descendants = list(GuideBookService.get_descendants(self.base_guidebook_1))
+        self.assertEqual(descendants, [self.base_guidebook_2, guidebook_3])
+
+    def test_base_guide_book_update_parent(self):
+        """
+        Тест, перенос справочника к другому родителю пересчитывает путь его потомков
+        """
+
+        new_root = GuideBookService.create_guidebook(
+            self.company_1.pk, title="Кровля"
+        )
+        data = {
+            "title": "Внешняя отделка",
+            "parent_guide_book": new_root.pk,
+        }
+
+        response = self.client_1.put(
+            self.get_url("change/pk_guidebook", pk_guidebook=self.base_guidebook_2.pk),
+            data,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.base_guidebook_2.refresh_from_db()
+        self.assertEqual(
+            self.base_guidebook_2.path, f"{new_root.pk}/{self.base_guidebook_2.pk}/"
+        )
+        self.assertEqual(self.base_guidebook_2.depth, 1)
+
+    def test_base_guide_book_update_parent_cycle(self):
+        """
+        Тест, перенос справочника внутрь собственного потомка
+        должен выдать ошибку HTTP_400_BAD_REQUEST
+        """
+
+        data = {
+            "title": "Внутренняя отделка",
+            "parent_guide_book": self.base_guidebook_2.pk,
+        }
+
+        response = self.client_1.put(
+            self.get_url("change/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk),
+            data,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_guide_book_tree(self):
+        """
+        Тест, получение дерева справочников компании вместе с работами
+        """
+
+        response = self.client_1.get(
+            self.get_url("guidebook_tree/pk_company", pk_company=self.company_1.pk),
+            {"with_works": "true"},
+        )
+
+        data = response.json()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]["id"], self.base_guidebook_1.pk)
+        self.assertEqual(len(data[0]["works"]), 2)
+        self.assertEqual(data[0]["children"][0]["id"], self.base_guidebook_2.pk)
+        self.assertEqual(data[0]["children"][0]["works"], [])
+
+    def test_guide_book_aggregates(self):
+        """
+        Тест, агрегаты справочника обновляются при изменении работ вложенных
+        справочников и совпадают с полным пересчетом
+        """
+
+        work = WorkService.create_work(
+            guidebook=self.base_guidebook_2.pk,
+            title="Монтаж плитки",
+            price_by_unit=3000,
+            unit_of_measurement=Work.UnitType.SQUARE_METER,
+            currency=Work.CurrencyType.RUB,
+        )
+        WorkService.create_work(
+            guidebook=self.base_guidebook_2.pk,
+            title="Монтаж ламината",
+            price_by_unit=50,
+            unit_of_measurement=Work.UnitType.SQUARE_METER,
+            currency=Work.CurrencyType.USD,
+        )
+        WorkService.soft_delete_work(self.base_work_1)
+
+        response = self.client_1.get(
+            self.get_url("pk_guidebook", pk_guidebook=self.base_guidebook_1.pk)
+        )
+        data = response.json()["guidebook"]
+        self.assertEqual(data["children_count"], 1)
+        self.assertEqual(data["works_count"], 1)
+        self.assertEqual(data["subtree_works_count"], 3)
+        self.assertEqual(
+            data["prices"],
+            {
+                "rub": {"count": 2, "min": 2000, "max": 3000, "avg": 2500},
+                "usd": {"count": 1, "min": 50, "max": 50, "avg": 50},
+            },
+        )
+
+        WorkService.update_work(work, price_by_unit=1000)
+        self.assertEqual(GuideBookAggregateService.rebuild_company(self.company_1.pk), 0)
+        self.base_guidebook_1.refresh_from_db()
+        self.assertEqual(self.base_guidebook_1.price_stats["rub"]["min"], 1000)
+
+    def test_guide_book_tree_max_depth(self):
+        """
+        Тест, получение дерева справочников с ограничением глубины
+        """
+
+        response = self.client_1.get(
+            self.get_url("guidebook_tree/pk_company", pk_company=self.company_1.pk),
+            {"max_depth": 1},
+        )
+
+        data = response.json()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(data[0]["children"], [])
+        self.assertNotIn("works", data[0])
+
+    def test_guide_book_tree_left_user(self):
+        """
+        Тест, получение дерева справочников пользователем не состоящем в компании
+        должен выдать ошибку HTTP_403_FORBIDDEN
+        """
+
+        response = self.client_3.get(
+            self.get_url("guidebook_tree/pk_company", pk_company=self.company_1.pk)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_guide_book_export_csv(self):
+        """
+        Тест, выгрузка работ справочника и вложенных справочников в csv
+        """
+
+        Work.objects.create(
+            guidebook=self.base_guidebook_2,
+            title="Покраска фасада",
+            price_by_unit=500,
+            unit_of_measurement=Work.UnitType.SQUARE_METER,
+            currency=Work.CurrencyType.RUB,
+        )
+
+        response = self.client_1.get(
+            self.get_url(
+                "guidebook_export/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk
+            )
+        )
+
+        lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            lines[0], "path,title,price_by_unit,unit_of_measurement,currency"
+        )
+        self.assertEqual(len(lines), 4)
+        self.assertIn(
+            "Внутренняя отделка/Внешняя отделка,Покраска фасада,500,square_meter,rub",
+            lines,
+        )
+
+    def test_guide_book_export_ndjson(self):
+        """
+        Тест, выгрузка работ вложенного справочника в JSON Lines
+        """
+
+        response = self.client_1.get(
+            self.get_url(
+                "guidebook_export/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk
+            ),
+            {"file_format": "ndjson"},
+        )
+
+        lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0])["title"], "Покраска стен")
+
+    def test_guide_book_export_left_user(self):
+        """
+        Тест, выгрузка справочника пользователем не состоящем в компании
+        должен выдать ошибку HTTP_403_FORBIDDEN
+        """
+
+        response = self.client_3.get(
+            self.get_url(
+                "guidebook_export/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk
+            )
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -1,6 +1,14 @@
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from rest_framework import status
 
-from ..models import Work
+from ..fast_serializers import FastOutputSerializer
+from ..models import GuideBook, Work
+from ..serializers import WorkDataOutputSerializer
+from ..service import ExchangeRateService, WorkService
 from .base import BaseConstructionObjectTestCase
 
 
@@ -47,6 +55,259 @@ class BaseWorkTestCase(BaseConstructionObjectTestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_base_work_list_normalized_price(self):
+        """
+        Тест, фильтр и сортировка списка работ по цене в базовой валюте,
+        цены пересчитываются при изменении курсов
+        """
+
+        work_usd = WorkService.create_work(
+            guidebook=self.base_guidebook_1.pk,
+            title="Монтаж плитки",
+            price_by_unit=20,
+            unit_of_measurement=Work.UnitType.SQUARE_METER,
+            currency=Work.CurrencyType.USD,
+        )
+        self.assertIsNone(work_usd.normalized_price)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            changed = ExchangeRateService.update_rates(
+                {"usd": Decimal("90"), "eur": Decimal("100")}
+            )
+        self.assertEqual(changed, ["eur", "usd"])
+        ExchangeRateService.recompute_normalized_prices([Work.CurrencyType.RUB])
+        work_usd.refresh_from_db()
+        self.assertEqual(work_usd.normalized_price, Decimal("1800.00"))
+        work_eur = WorkService.create_work(
+            guidebook=self.base_guidebook_1.pk,
+            title="Монтаж ламината",
+            price_by_unit=15,
+            unit_of_measurement=Work.UnitType.SQUARE_METER,
+            currency=Work.CurrencyType.EUR,
+        )
+
+        response = self.client_1.get(
+            self.get_url(
+                "work_list/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk
+            ),
+            {"normalized_price_min": "1500", "ordering": "-normalized_price"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [work["id"] for work in response.json()["results"]],
+            [self.base_work_2.pk, work_usd.pk, work_eur.pk],
+        )
+
+    def test_base_work_list_cursor_ordering(self):
+        """
+        Тест, сортировка по цене с пагинацией по курсору
+        должна выдать ошибку HTTP_400_BAD_REQUEST
+        """
+
+        response = self.client_1.get(
+            self.get_url(
+                "work_list/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk
+            ),
+            {"pagination": "cursor", "ordering": "normalized_price"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_base_work_list_num_queries(self):
+        """
+        Тест, количество запросов при получении списка работ
+        не зависит от количества работ на странице
+        """
+
+        for number in range(8):
+            Work.objects.create(
+                guidebook=self.base_guidebook_1,
+                title=f"Работа {number}",
+                price_by_unit=100,
+                unit_of_measurement=Work.UnitType.SQUARE_METER,
+                currency=Work.CurrencyType.RUB,
+            )
+
+        # справочник, роли пользователя, проверка наличия работ, count и страница
+        with self.assertNumQueries(5):
+            response = self.client_1.get(
+                self.get_url(
+                    "work_list/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk
+                )
+            )
+
+        data = response.json()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(data["results"]), 10)
+        self.assertEqual(
+            data["results"][0]["guidebook"]["title"], self.base_guidebook_1.title
+        )
+
+    def test_base_work_list_cursor_pagination(self):
+        """
+        Тест, получение списка работ с пагинацией по курсору без запроса count
+        """
+
+        for number in range(10):
+            Work.objects.create(
+                guidebook=self.base_guidebook_1,
+                title=f"Работа {number}",
+                price_by_unit=100,
+                unit_of_measurement=Work.UnitType.SQUARE_METER,
+                currency=Work.CurrencyType.RUB,
+            )
+        url = self.get_url(
+            "work_list/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk
+        )
+
+        # справочник, роли пользователя, проверка наличия работ и страница
+        with self.assertNumQueries(4):
+            response = self.client_1.get(url, {"pagination": "cursor"})
+
+        data = response.json()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", data)
+        self.assertEqual(len(data["results"]), 10)
+        self.assertEqual(data["results"][0]["id"], self.base_work_1.pk)
+
+        response = self.client_1.get(data["next"])
+
+        data = response.json()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(data["results"]), 2)
+        self.assertIsNone(data["next"])
+
+    def test_base_work_retrieve_num_queries(self):
+        """
+        Тест, справочник работы загружается вместе с работой
+        """
+
+        # работа вместе со справочником и роли пользователя
+        with self.assertNumQueries(2):
+            response = self.client_1.get(
+                self.get_url("pk_work", pk_work=self.base_work_1.pk)
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["guidebook"]["id"], self.base_guidebook_1.pk)
+
+    def test_base_work_list_not_modified(self):
+        """
+        Тест, список работ отдает 304 до запросов работ,
+        после изменения работы в справочнике возвращается новый список
+        """
+
+        url = self.get_url(
+            "work_list/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk
+        )
+        etag = self.client_1.get(url)["ETag"]
+
+        # только справочник, роли пользователя из кэша
+        with self.assertNumQueries(1):
+            response = self.client_1.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        WorkService.update_work(self.base_work_1, price_by_unit=1500)
+        response = self.client_1.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        response = self.client_1.get(
+            self.get_url("pk_work", pk_work=self.base_work_1.pk),
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        # ETag зависит от адреса запроса
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_update_work_deleted_meanwhile(self):
+        """
+        Тест, обновление работы, удаленной после ее загрузки,
+        не восстанавливает работу и не меняет агрегаты справочника
+        """
+
+        work = WorkService.get_work(self.base_work_1.pk)
+        Work.objects.filter(pk=work.pk).update(is_delete=True)
+
+        self.assertIsNone(WorkService.update_work(work, price_by_unit=1500))
+        work.refresh_from_db()
+        self.assertTrue(work.is_delete)
+        self.assertEqual(work.price_by_unit, 1000)
+
+    def test_base_work_list_cached(self):
+        """
+        Тест, страница работ берется из кэша и обновляется после изменения работы
+        """
+
+        url = self.get_url(
+            "work_list/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk
+        )
+        self.client_1.get(url)
+
+        # только справочник, роли пользователя и страница из кэша
+        with self.assertNumQueries(1):
+            response = self.client_1.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["results"]), 2)
+
+        WorkService.update_work(self.base_work_1, title="Шпаклевка стен")
+        response = self.client_1.get(url)
+        titles = [work["title"] for work in response.json()["results"]]
+        self.assertIn("Шпаклевка стен", titles)
+
+    def test_async_work_list(self):
+        """
+        Тест, асинхронный список работ совпадает с синхронным
+        """
+
+        response = self.client_1.get(
+            self.get_url(
+                "async/work_list/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk
+            ),
+            {"title": "стен"},
+        )
+        sync_response = self.client_1.get(
+            self.get_url(
+                "work_list/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk
+            ),
+            {"title": "стен"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), sync_response.json())
+        self.assertEqual(response.json()["count"], 1)
+
+    def test_fast_output_serializer(self):
+        """
+        Тест, быстрый вывод строк values() совпадает с выходным сериализатором
+        """
+
+        serializer = FastOutputSerializer(WorkDataOutputSerializer)
+        works = WorkService.get_works_queryset(self.base_guidebook_1.pk).order_by("id")
+
+        self.assertEqual(
+            serializer.many(works.values(*serializer.lookups)),
+            WorkDataOutputSerializer(works, many=True).data,
+        )
+
+    def test_base_work_list_fulltext_search(self):
+        """
+        Тест, полнотекстовый поиск работ по названию
+        """
+
+        response = self.client_1.get(
+            self.get_url(
+                "work_list/pk_guidebook", pk_guidebook=self.base_guidebook_1.pk
+            ),
+            {"title": "стен", "search_mode": "fulltext"},
+        )
+
+        data = response.json()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(data["count"], 1)
+        self.assertEqual(data["results"][0]["id"], self.base_work_1.pk)
+
     def test_base_work_list_left_user(self):
         """
         Тест, получение списка объектов пользователем из другой компании
@@ -61,6 +322,101 @@ class BaseWorkTestCase(BaseConstructionObjectTestCase):
 
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_work_search(self):
+        """
+        Тест, поиск работ по всей компании с фильтром по цене
+        и цепочкой справочников у каждой работы
+        """
+
+        work = Work.objects.create(
+            guidebook=self.base_guidebook_2,
+            title="Покраска фасада",
+            price_by_unit=2500,
+            unit_of_measurement=Work.UnitType.SQUARE_METER,
+            currency=Work.CurrencyType.RUB,
+        )
+
+        response = self.client_1.get(
+            self.get_url("work_search/pk_company", pk_company=self.company_1.pk),
+            {"title": "краска", "price_min": 1500},
+        )
+
+        data = response.json()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in data["results"]], [self.base_work_2.pk, work.pk]
+        )
+        self.assertEqual(
+            [item["id"] for item in data["results"][1]["breadcrumbs"]],
+            [self.base_guidebook_1.pk, self.base_guidebook_2.pk],
+        )
+
+    def test_work_search_fulltext_page_pagination(self):
+        """
+        Тест, полнотекстовый поиск выводится постранично по номеру страницы,
+        даже если запрошена пагинация по курсору
+        """
+
+        response = self.client_1.get(
+            self.get_url("work_search/pk_company", pk_company=self.company_1.pk),
+            {"title": "стен", "search_mode": "fulltext", "pagination": "cursor"},
+        )
+
+        data = response.json()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(data["count"], 1)
+        self.assertEqual(data["results"][0]["id"], self.base_work_1.pk)
+
+    @skipUnless(connection.vendor == "postgresql", "ранжирование только в PostgreSQL")
+    def test_work_search_fulltext_rank_order(self):
+        """
+        Тест, более релевантная работа выводится первой, независимо от id
+        """
+
+        work = Work.objects.create(
+            guidebook=self.base_guidebook_2,
+            title="Штукатурка стен, шпаклевка стен и покраска стен",
+            price_by_unit=900,
+            unit_of_measurement=Work.UnitType.SQUARE_METER,
+            currency=Work.CurrencyType.RUB,
+        )
+
+        response = self.client_1.get(
+            self.get_url("work_search/pk_company", pk_company=self.company_1.pk),
+            {"title": "стена", "search_mode": "fulltext"},
+        )
+
+        data = response.json()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in data["results"]], [work.pk, self.base_work_1.pk]
+        )
+
+    def test_work_search_subtree(self):
+        """
+        Тест, поиск работ внутри справочника и вложенных в него
+        """
+
+        response = self.client_1.get(
+            self.get_url("work_search/pk_company", pk_company=self.company_1.pk),
+            {"guidebook": self.base_guidebook_2.pk},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"], [])
+
+    def test_work_search_left_user(self):
+        """
+        Тест, поиск работ пользователем не состоящем в компании
+        должен выдать ошибку HTTP_403_FORBIDDEN
+        """
+
+        response = self.client_3.get(
+            self.get_url("work_search/pk_company", pk_company=self.company_1.pk)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_create_base_work(self):
         """
         Тест, создание объекта владельцем компании
@@ -232,3 +588,296 @@ class BaseWorkTestCase(BaseConstructionObjectTestCase):
         )
 
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_create_work(self):
+        """
+        Тест, массовое создание работ владельцем компании
+        """
+
+        data = [
+            {
+                "guidebook": self.base_guidebook_2.pk,
+                "title": f"Оклейка стен {number}",
+                "price_by_unit": 3000,
+                "unit_of_measurement": Work.UnitType.SQUARE_METER,
+                "currency": Work.CurrencyType.RUB,
+            }
+            for number in range(3)
+        ]
+
+        response = self.client_1.post(self.get_url("work_bulk"), data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.json()), 3)
+        self.assertEqual(Work.objects.count(), 5)
+
+    def test_bulk_create_work_item_errors(self):
+        """
+        Тест, массовое создание работ с ошибкой в одной из работ
+        должен выдать ошибку HTTP_400_BAD_REQUEST и ничего не создать
+        """
+
+        data = [
+            {
+                "guidebook": self.base_guidebook_1.pk,
+                "title": "Оклейка стен",
+                "price_by_unit": 3000,
+                "unit_of_measurement": Work.UnitType.SQUARE_METER,
+                "currency": Work.CurrencyType.RUB,
+            },
+            {
+                "guidebook": 0,
+                "title": "Оклейка потолков",
+                "price_by_unit": 3000,
+                "unit_of_measurement": Work.UnitType.SQUARE_METER,
+                "currency": Work.CurrencyType.RUB,
+            },
+        ]
+
+        response = self.client_1.post(self.get_url("work_bulk"), data, format="json")
+
+        errors = response.json()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(errors[0], {})
+        self.assertIn("guidebook", errors[1])
+        self.assertEqual(Work.objects.count(), 2)
+
+    def test_bulk_create_work_deleted_guidebook(self):
+        """
+        Тест, массовое создание работ в удаленном справочнике
+        должен выдать ошибку HTTP_400_BAD_REQUEST
+        """
+
+        GuideBook.objects.filter(pk=self.base_guidebook_2.pk).update(is_delete=True)
+        data = [
+            {
+                "guidebook": self.base_guidebook_2.pk,
+                "title": "Оклейка стен",
+                "price_by_unit": 3000,
+                "unit_of_measurement": Work.UnitType.SQUARE_METER,
+                "currency": Work.CurrencyType.RUB,
+            }
+        ]
+
+        response = self.client_1.post(self.get_url("work_bulk"), data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("guidebook", response.json()[0])
+        self.assertEqual(Work.objects.count(), 2)
+
+    def test_bulk_create_work_error(self):
+        """
+        Тест, массовое создание работ мастером
+        должен выдать ошибку HTTP_403_FORBIDDEN
+        """
+
+        data = [
+            {
+                "guidebook": self.base_guidebook_1.pk,
+                "title": "Оклейка стен",
+                "price_by_unit": 3000,
+                "unit_of_measurement": Work.UnitType.SQUARE_METER,
+                "currency": Work.CurrencyType.RUB,
+            }
+        ]
+
+        response = self.client_2.post(self.get_url("work_bulk"), data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Work.objects.count(), 2)
+
+    def test_bulk_update_work(self):
+        """
+        Тест, массовое обновление работ владельцем компании
+        """
+
+        data = [
+            {"id": self.base_work_1.pk, "price_by_unit": 1500},
+            {"id": self.base_work_2.pk, "guidebook": self.base_guidebook_2.pk},
+        ]
+
+        response = self.client_1.put(self.get_url("work_bulk"), data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.base_work_1.refresh_from_db()
+        self.base_work_2.refresh_from_db()
+        self.assertEqual(self.base_work_1.price_by_unit, 1500)
+        self.assertEqual(self.base_work_2.guidebook_id, self.base_guidebook_2.pk)
+
+    def test_bulk_update_work_duplicate_id(self):
+        """
+        Тест, массовое обновление с повторяющейся работой
+        должен выдать ошибку HTTP_400_BAD_REQUEST и ничего не изменить
+        """
+
+        data = [
+            {"id": self.base_work_1.pk, "price_by_unit": 1500},
+            {"id": self.base_work_1.pk, "price_by_unit": 1700},
+        ]
+
+        response = self.client_1.put(self.get_url("work_bulk"), data, format="json")
+
+        errors = response.json()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(errors[0], {})
+        self.assertIn("id", errors[1])
+        self.base_work_1.refresh_from_db()
+        self.assertEqual(self.base_work_1.price_by_unit, 1000)
+
+    def test_bulk_delete_work(self):
+        """
+        Тест, массовое мягкое удаление работ владельцем компании
+        """
+
+        response = self.client_1.delete(
+            self.get_url("work_bulk"),
+            {"ids": [self.base_work_1.pk, self.base_work_2.pk]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(Work.objects.filter(is_delete=False).count(), 0)
+
+    def test_estimate(self):
+        """
+        Тест, расчет сметы: суммы строк, итоги по справочникам и валютам,
+        работы загружаются одним запросом
+        """
+
+        work = WorkService.create_work(
+            guidebook=self.base_guidebook_2.pk,
+            title="Монтаж плитки",
+            price_by_unit=15,
+            unit_of_measurement=Work.UnitType.SQUARE_METER,
+            currency=Work.CurrencyType.USD,
+        )
+        data = {
+            "items": [
+                {"work": self.base_work_1.pk, "quantity": "2.5"},
+                {"work": self.base_work_2.pk, "quantity": "1"},
+                {"work": work.pk, "quantity": "0.333"},
+            ]
+        }
+
+        # работы и роли пользователя
+        with self.assertNumQueries(2):
+            response = self.client_1.post(self.get_url("estimate"), data, format="json")
+
+        result = response.json()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [line["total"] for line in result["lines"]], ["2500.00", "2000.00", "5.00"]
+        )
+        self.assertEqual(result["totals"], {"rub": "4500.00", "usd": "5.00"})
+        self.assertEqual(
+            {group["id"]: group["totals"] for group in result["guidebooks"]},
+            {
+                self.base_guidebook_1.pk: {"rub": "4500.00"},
+                self.base_guidebook_2.pk: {"usd": "5.00"},
+            },
+        )
+
+    def test_estimate_errors(self):
+        """
+        Тест, смета с несуществующей работой и пользователем не состоящем в компании
+        должна выдать ошибки HTTP_400_BAD_REQUEST и HTTP_403_FORBIDDEN
+        """
+
+        response = self.client_1.post(
+            self.get_url("estimate"),
+            {"items": [{"work": 0, "quantity": "1"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client_3.post(
+            self.get_url("estimate"),
+            {"items": [{"work": self.base_work_1.pk, "quantity": "1"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_import_price_catalog(self):
+        """
+        Тест, импорт прайс-листа создает недостающие справочники по пути,
+        обновляет существующие работы и возвращает ошибки строк
+        """
+
+        content = (
+            "path;title;price_by_unit;unit_of_measurement;currency\n"
+            "Внутренняя отделка;Покраска стен;1200;square_meter;rub\n"
+            "Внутренняя отделка/Стены/Штукатурка;Штукатурка по маякам;700;square_meter;rub\n"
+            "Внутренняя отделка/Стены;Грунтовка;-1;square_meter;rub\n"
+            f"Внутренняя отделка/{'Б' * 151};Грунтовка;300;square_meter;rub\n"
+        )
+        file = SimpleUploadedFile("catalog.csv", content.encode("utf-8"))
+
+        response = self.client_1.post(
+            self.get_url("work_import/pk_company", pk_company=self.company_1.pk),
+            {"file": file},
+            format="multipart",
+        )
+
+        report = response.json()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(report["rows"], 4)
+        self.assertEqual(report["created"], 1)
+        self.assertEqual(report["updated"], 1)
+        self.assertEqual(report["guidebooks_created"], 2)
+        self.assertEqual(report["errors"][0]["row"], 4)
+        self.assertEqual(report["errors"][1]["row"], 5)
+        self.assertIn("path", report["errors"][1]["errors"])
+        self.base_work_1.refresh_from_db()
+        self.assertEqual(self.base_work_1.price_by_unit, 1200)
+        plaster = GuideBook.objects.get(title="Штукатурка")
+        self.assertEqual(plaster.depth, 2)
+        self.assertTrue(Work.objects.filter(guidebook=plaster).exists())
+
+    def test_import_price_catalog_encoding(self):
+        """
+        Тест, импорт csv не в utf-8 без указания кодировки
+        должен выдать ошибку HTTP_400_BAD_REQUEST и ничего не сохранить,
+        с кодировкой cp1251 файл импортируется
+        """
+
+        content = (
+            "path;title;price_by_unit;unit_of_measurement;currency\n"
+            "Кровля;Монтаж водостока;800;linear_meter;rub\n"
+        ).encode("cp1251")
+        url = self.get_url("work_import/pk_company", pk_company=self.company_1.pk)
+
+        response = self.client_1.post(
+            url,
+            {"file": SimpleUploadedFile("catalog.csv", content)},
+            format="multipart",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("file", response.json())
+        self.assertFalse(GuideBook.objects.filter(title="Кровля").exists())
+
+        response = self.client_1.post(
+            url,
+            {"file": SimpleUploadedFile("catalog.csv", content), "encoding": "cp1251"},
+            format="multipart",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["created"], 1)
+        self.assertTrue(Work.objects.filter(title="Монтаж водостока").exists())
+
+    def test_import_price_catalog_error(self):
+        """
+        Тест, импорт прайс-листа мастером
+        должен выдать ошибку HTTP_403_FORBIDDEN
+        """
+
+        file = SimpleUploadedFile("catalog.csv", b"path,title,price_by_unit\n")
+
+        response = self.client_2.post(
+            self.get_url("work_import/pk_company", pk_company=self.company_1.pk),
+            {"file": file},
+            format="multipart",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -1,15 +1,30 @@
 from django.urls import path
 
 from guidebook.apps import GuidebookConfig
+from guidebook.async_views import (
+    AsyncGuideBookDetailView,
+    AsyncGuideBooksListView,
+    AsyncWorkDetailView,
+    AsyncWorkListView,
+)
 
 from .views import (
+    EstimateView,
+    GuideBookCloneView,
     GuideBookCreateView,
     GuideBookDetailView,
+    GuideBookExportView,
+    GuideBookMetricsView,
+    GuideBookRestoreView,
     GuideBooksListView,
+    GuideBookTreeView,
     GuideBookUpdateDeliteView,
+    PriceCatalogImportView,
+    WorkBulkView,
     WorkCreateView,
     WorkDetailView,
     WorkListView,
+    WorkSearchView,
     WorkUpdateAndDeliteView,
 )
 
@@ -22,6 +37,11 @@ urlpatterns = [
         GuideBooksListView.as_view(),
         name="guidebook_list/pk_company",
     ),
+    path(
+        "guidebook_tree/<int:pk_company>/",
+        GuideBookTreeView.as_view(),
+        name="guidebook_tree/pk_company",
+    ),
     path(
         "<int:pk_guidebook>/",
         GuideBookDetailView.as_view(),
@@ -37,17 +57,66 @@ urlpatterns = [
         GuideBookUpdateDeliteView.as_view(),
         name="change/pk_guidebook",
     ),
+    path(
+        "clone/<int:pk_guidebook>/",
+        GuideBookCloneView.as_view(),
+        name="clone/pk_guidebook",
+    ),
+    path(
+        "restore/<int:pk_guidebook>/",
+        GuideBookRestoreView.as_view(),
+        name="restore/pk_guidebook",
+    ),
+    path(
+        "guidebook_export/<int:pk_guidebook>/",
+        GuideBookExportView.as_view(),
+        name="guidebook_export/pk_guidebook",
+    ),
     # работы
     path(
         "work_list/<int:pk_guidebook>/",
         WorkListView.as_view(),
         name="work_list/pk_guidebook",
     ),
+    path(
+        "work_search/<int:pk_company>/",
+        WorkSearchView.as_view(),
+        name="work_search/pk_company",
+    ),
     path("work/<int:pk_work>/", WorkDetailView.as_view(), name="pk_work"),
     path("work_create/", WorkCreateView.as_view(), name="work_create"),
+    path("work_bulk/", WorkBulkView.as_view(), name="work_bulk"),
+    path(
+        "work_import/<int:pk_company>/",
+        PriceCatalogImportView.as_view(),
+        name="work_import/pk_company",
+    ),
+    path("estimate/", EstimateView.as_view(), name="estimate"),
     path(
         "change_work/<int:pk_work>/",
         WorkUpdateAndDeliteView.as_view(),
         name="change_work/pk_work",
     ),
+    path("metrics/", GuideBookMetricsView.as_view(), name="metrics"),
+    # асинхронные версии вью чтения для ASGI
+    path(
+        "async/guidebook_list/<int:pk_company>/",
+        AsyncGuideBooksListView.as_view(),
+        name="async/guidebook_list/pk_company",
+    ),
+    path(
+        "async/<int:pk_guidebook>/",
+        AsyncGuideBookDetailView.as_view(),
+        name="async/pk_guidebook",
+    ),
+    path(
+        "async/work_list/<int:pk_guidebook>/",
+        AsyncWorkListView.as_view(),
+        name="async/work_list/pk_guidebook",
+    ),
+    path(
+        "async/work/<int:pk_work>/",
+        AsyncWorkDetailView.as_view(),
+        name="async/pk_work",
+    ),
 ]
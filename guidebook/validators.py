@@ -4,9 +4,21 @@ from guidebook.models import GuideBook
 
 
 class GuideBookValidator:
-    """Проверяет существование справочника по ID"""
+    """
+    Проверяет существование справочника по ID.
+    Если в контексте сериализатора есть предзагруженные справочники "guidebooks"
+    (массовые операции), проверка выполняется без запроса в базу.
+    """
 
-    def __call__(self, value):
+    requires_context = True
+
+    def __call__(self, value, serializer_field):
+        guidebooks = serializer_field.context.get("guidebooks", None)
+        if guidebooks is not None:
+            guidebook = guidebooks.get(value)
+            if guidebook is None:
+                raise serializers.ValidationError("Справочник с таким ID не найдена.")
+            return guidebook
         try:
             # Проверяем, существует ли справочник с данным ID
             guidebook = GuideBook.objects.get(id=value)
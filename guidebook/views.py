@@ -1,33 +1,66 @@
+from typing import Union
+
 from django.db.models import QuerySet
-from rest_framework.permissions import IsAuthenticated
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework import serializers
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
 
 from company.models import CompanyRoleUser
 from company.permissions import AnyCompanyRolePermissions, CompanyPermissions
 from core.base.responses import ResponseException
 from core.base.views import BaseAPIView
+from guidebook.cache import GuideBookResponseCache
+from guidebook.exporters import EXPORT_FORMATS
+from guidebook.fast_serializers import FastOutputSerializer
 from guidebook.filters import GuideBookFilter, WorkFilter
+from guidebook.importers import (
+    PriceCatalogImporter,
+    PriceCatalogImportError,
+    get_file_format,
+)
+from guidebook.metrics import metrics
+from guidebook.mixins import ConditionalGetMixin, InstrumentationMixin
 from guidebook.models import GuideBook, Work
-from guidebook.paginators import Pagination
+from guidebook.paginators import KeysetPagination, Pagination, get_paginator
 from guidebook.permissions import (
     CheckingUserIsAuthorInCompany,
     CheckingUserWorkInCompany,
+    get_guidebook_access,
+    has_role_in_companies,
+    is_author_in_companies,
 )
 from guidebook.responses_schema_config import GuideBookResponse, WorkResponse
 from guidebook.serializers import (
     DirectoryWithEmbeddedDataOutputSerializer,
     EnteringDirectoryDataInputSerializer,
-    ViewingDirectoryOnlyNameOutputSerializer,
+    EstimateGuideBookOutputSerializer,
+    EstimateInputSerializer,
+    EstimateLineOutputSerializer,
+    EstimateOutputSerializer,
+    GuideBookAggregatesOutputSerializer,
+    GuideBookCloneInputSerializer,
+    GuideBookCloneOutputSerializer,
+    GuideBookExportInputSerializer,
+    GuideBookTreeInputSerializer,
+    PriceCatalogImportInputSerializer,
+    PriceCatalogImportOutputSerializer,
     ViewingGuideBookOutputSerializer,
+    WorkBulkDeleteInputSerializer,
+    WorkBulkUpdateInputSerializer,
     WorkDataInputSerializer,
     WorkDataOutputSerializer,
+    WorkSearchInputSerializer,
+    WorkSearchOutputSerializer,
 )
-from guidebook.service import GuideBookService, WorkService
+from guidebook.service import EstimateService, GuideBookService, WorkService
 
 
-class GuideBooksListView(BaseAPIView):
+class GuideBooksListView(InstrumentationMixin, BaseAPIView):
     """вью просмотра списка справочников"""
 
-    output_serializer_class = ViewingDirectoryOnlyNameOutputSerializer
+    output_serializer_class = GuideBookAggregatesOutputSerializer
+    fast_output_serializer = FastOutputSerializer(GuideBookAggregatesOutputSerializer)
     permission_classes = [IsAuthenticated, AnyCompanyRolePermissions]
     pagination_class = Pagination
     filter_backends = [GuideBookFilter]
@@ -37,7 +70,7 @@ class GuideBooksListView(BaseAPIView):
         self.guidebook_list = GuideBookService.get_guidebook_parents(
             kwargs["pk_company"]
         )
-        if not self.guidebook_list:
+        if self.guidebook_list is None:
             raise ResponseException(
                 self.response_404(message="Справочники не найдены.")
             )
@@ -48,13 +81,32 @@ class GuideBooksListView(BaseAPIView):
         queryset = self.guidebook_list
         for backend in self.filter_backends:
             queryset = backend().filter_queryset(request, queryset, self)
-        paginator = self.pagination_class()
-        paginated_queryset = paginator.paginate_queryset(queryset, request)
-        serializer = self.output_serializer_class(paginated_queryset, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        paginator = get_paginator(request, self.pagination_class)
+        rows = paginator.paginate_queryset(
+            queryset.values(*self.fast_output_serializer.lookups), request
+        )
+        return paginator.get_paginated_response(self.fast_output_serializer.many(rows))
+
 
+class GuideBookTreeView(InstrumentationMixin, BaseAPIView):
+    """вью просмотра полного дерева справочников компании"""
 
-class GuideBookCreateView(BaseAPIView):
+    input_serializer_class = GuideBookTreeInputSerializer
+    permission_classes = [IsAuthenticated, AnyCompanyRolePermissions]
+
+    @GuideBookResponse.tree_guidebook
+    def get(self, request, *args, **kwargs):
+        input_serializer = self.input_serializer_class(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+        tree = GuideBookService.get_guidebook_tree(
+            kwargs["pk_company"], **input_serializer.validated_data
+        )
+        if not tree:
+            return self.response_404(message="Справочники не найдены.")
+        return self.response_200(data=tree)
+
+
+class GuideBookCreateView(InstrumentationMixin, BaseAPIView):
     """вью создания справочника, функция доступна только пользователю с ролью author"""
 
     input_serializer_class = EnteringDirectoryDataInputSerializer
@@ -71,48 +123,54 @@ class GuideBookCreateView(BaseAPIView):
         guidebook = GuideBookService.create_guidebook(
             kwargs["pk_company"], **input_serializer.validated_data
         )
-        output_serializer = self.output_serializer_class(guidebook)
+        output_serializer = self.output_serializer_class(
+            GuideBookService.get_guidebook(guidebook.pk)
+        )
 
         return self.response_201(output_serializer.data)
 
 
-class GuideBookDetailView(BaseAPIView):
-    """вью просмотра детально одного справочника"""
+class GuideBookDetailView(InstrumentationMixin, ConditionalGetMixin, BaseAPIView):
+    """
+    вью просмотра детально одного справочника, поддерживает ETag/If-None-Match,
+    данные ответа кэшируются до изменения версии справочника
+    """
 
     output_serializer_class = DirectoryWithEmbeddedDataOutputSerializer
     permission_classes = [IsAuthenticated, CheckingUserWorkInCompany]
+    guidebook: GuideBook = None
+
+    def initial(self, request, *args, **kwargs):
+        self.guidebook = get_guidebook_access(request, self).guidebook
+        if self.guidebook is None:
+            raise ResponseException(self.response_404(message="Справочник не найден."))
+        return super().initial(request, *args, **kwargs)
 
     @GuideBookResponse.one_guidebook
     def get(self, request, *args, **kwargs):
-        construction_guidebook = GuideBookService.get_guidebook(kwargs["pk_guidebook"])
-        if construction_guidebook is None:
-            return self.response_404()
-        construction_guidebook_data = ViewingDirectoryOnlyNameOutputSerializer(
-            construction_guidebook
-        ).data
+        not_modified = self.get_not_modified_response(request, self.guidebook)
+        if not_modified is not None:
+            return not_modified
 
-        nested_guidebooks = GuideBookService.list_guidebook(kwargs["pk_guidebook"])
-        nested_guidebooks_data = ViewingDirectoryOnlyNameOutputSerializer(
-            nested_guidebooks, many=True
-        ).data
+        data = GuideBookResponseCache.get_or_set(
+            "detail", self.guidebook, request, self.get_data
+        )
+        return self.response_200(data=data)
 
-        nested_works = WorkService.get_works_by_pk_guidebook(kwargs["pk_guidebook"])
-        nested_works_data = WorkDataOutputSerializer(nested_works or [], many=True).data
+    def get_data(self) -> dict:
+        construction_guidebook = GuideBookService.prefetch_nested(self.guidebook)
 
         serializer = self.output_serializer_class(
-            data={
-                "guidebook": construction_guidebook_data,
-                "nested_guidebooks": nested_guidebooks_data,
-                "nested_works": nested_works_data,
+            {
+                "guidebook": construction_guidebook,
+                "nested_guidebooks": construction_guidebook.nested_guidebooks,
+                "nested_works": construction_guidebook.nested_works,
             }
         )
+        return serializer.data
 
-        serializer.is_valid(raise_exception=True)
-
-        return self.response_200(data=serializer.validated_data)
 
-
-class GuideBookUpdateDeliteView(BaseAPIView):
+class GuideBookUpdateDeliteView(InstrumentationMixin, BaseAPIView):
     """вью обновления и мягкого удаления справочника, доступно author"""
 
     input_serializer_class = EnteringDirectoryDataInputSerializer
@@ -121,14 +179,14 @@ class GuideBookUpdateDeliteView(BaseAPIView):
     guidebook: GuideBook = None
 
     def initial(self, request, *args, **kwargs):
-        self.guidebook = GuideBookService.get_guidebook(kwargs["pk_guidebook"])
+        self.guidebook = get_guidebook_access(request, self).guidebook
         if self.guidebook is None:
             raise ResponseException(self.response_404(message="Справочник не найден."))
         return super().initial(request, *args, **kwargs)
 
     @GuideBookResponse.soft_delete_guidebook
     def delete(self, request, *args, **kwargs):
-        GuideBookService.soft_delete_get_object_by_model(self.guidebook)
+        GuideBookService.soft_delete_guidebook(self.guidebook)
         return self.response_204()
 
     @GuideBookResponse.update_guidebook
@@ -143,38 +201,186 @@ class GuideBookUpdateDeliteView(BaseAPIView):
         return self.response_200(ViewingGuideBookOutputSerializer(guidebook).data)
 
 
+class GuideBookCloneView(InstrumentationMixin, BaseAPIView):
+    """
+    вью копирования справочника со всеми вложенными справочниками и работами
+    в компанию, доступно author в компании справочника и в компании назначения
+    """
+
+    input_serializer_class = GuideBookCloneInputSerializer
+    output_serializer_class = GuideBookCloneOutputSerializer
+    permission_classes = [IsAuthenticated, CheckingUserIsAuthorInCompany]
+    guidebook: GuideBook = None
+
+    def initial(self, request, *args, **kwargs):
+        self.guidebook = get_guidebook_access(request, self).guidebook
+        if self.guidebook is None:
+            raise ResponseException(self.response_404(message="Справочник не найден."))
+        return super().initial(request, *args, **kwargs)
+
+    @GuideBookResponse.clone_guidebook
+    def post(self, request, *args, **kwargs):
+        input_serializer = self.input_serializer_class(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+        pk_company = input_serializer.validated_data["company"]
+        if not is_author_in_companies(request.user, [pk_company]):
+            self.permission_denied(
+                request, message="Нет роли author в компании назначения."
+            )
+        parent = None
+        if "parent_guide_book" in input_serializer.validated_data:
+            parent = GuideBookService.get_guidebook(
+                input_serializer.validated_data["parent_guide_book"]
+            )
+            if parent is None or parent.company_id != pk_company:
+                return self.response_404(message="Справочник не найден.")
+
+        report = GuideBookService.clone_guidebook(
+            self.guidebook,
+            pk_company,
+            parent=parent,
+            price_multiplier=input_serializer.validated_data.get("price_multiplier"),
+        )
+        return self.response_201(self.output_serializer_class(report).data)
+
+
+class GuideBookRestoreView(InstrumentationMixin, BaseAPIView):
+    """вью восстановления удаленного справочника вместе с поддеревом, доступно author"""
+
+    output_serializer_class = ViewingGuideBookOutputSerializer
+    permission_classes = [IsAuthenticated, CheckingUserIsAuthorInCompany]
+    deleted_guidebook = True
+    guidebook: GuideBook = None
+
+    def initial(self, request, *args, **kwargs):
+        self.guidebook = get_guidebook_access(request, self).guidebook
+        if self.guidebook is None:
+            raise ResponseException(
+                self.response_404(message="Удаленный справочник не найден.")
+            )
+        return super().initial(request, *args, **kwargs)
+
+    @GuideBookResponse.restore_guidebook
+    def post(self, request, *args, **kwargs):
+        guidebook = GuideBookService.restore_guidebook(self.guidebook)
+        return self.response_200(self.output_serializer_class(guidebook).data)
+
+
+class GuideBookExportView(InstrumentationMixin, BaseAPIView):
+    """вью потоковой выгрузки работ справочника и всех вложенных справочников"""
+
+    input_serializer_class = GuideBookExportInputSerializer
+    permission_classes = [IsAuthenticated, CheckingUserWorkInCompany]
+    guidebook: GuideBook = None
+
+    def initial(self, request, *args, **kwargs):
+        self.guidebook = get_guidebook_access(request, self).guidebook
+        if self.guidebook is None:
+            raise ResponseException(self.response_404(message="Справочник не найден."))
+        return super().initial(request, *args, **kwargs)
+
+    @GuideBookResponse.export_guidebook
+    def get(self, request, *args, **kwargs):
+        input_serializer = self.input_serializer_class(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+        file_format = input_serializer.validated_data["file_format"]
+        export, content_type = EXPORT_FORMATS[file_format]
+
+        response = StreamingHttpResponse(
+            export(self.guidebook), content_type=content_type
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="guidebook_{self.guidebook.pk}.{file_format}"'
+        )
+        return response
+
+
 # Работы
 
 
-class WorkListView(BaseAPIView):
-    """вью просмотра списка работ"""
+class WorkListView(InstrumentationMixin, ConditionalGetMixin, BaseAPIView):
+    """
+    вью просмотра списка работ, поддерживает ETag/If-None-Match,
+    страницы кэшируются до изменения версии справочника
+    """
 
     output_serializer_class = WorkDataOutputSerializer
+    fast_output_serializer = FastOutputSerializer(WorkDataOutputSerializer)
     permission_classes = [IsAuthenticated, CheckingUserWorkInCompany]
     pagination_class = Pagination
     filter_backends = [WorkFilter]
+    guidebook: GuideBook = None
     work_list: [QuerySet[Work]] = None
 
     def initial(self, request, *args, **kwargs):
-        self.work_list = WorkService.get_works_by_pk_guidebook(kwargs["pk_guidebook"])
-        if self.work_list is None:
-            raise ResponseException(
-                self.response_404(message="Работы в справочнике не найдены.")
-            )
+        self.guidebook = get_guidebook_access(request, self).guidebook
+        if self.guidebook is None:
+            raise ResponseException(self.response_404(message="Справочник не найден."))
         return super().initial(request, *args, **kwargs)
 
     @WorkResponse.list_works
     def get(self, request, *args, **kwargs):
+        # 304 отдается до запросов работ
+        not_modified = self.get_not_modified_response(request, self.guidebook)
+        if not_modified is not None:
+            return not_modified
+
+        data = GuideBookResponseCache.get_or_set(
+            "work_list", self.guidebook, request, lambda: self.get_data(request)
+        )
+        if data is None:
+            return self.response_404(message="Работы в справочнике не найдены.")
+        return Response(data)
+
+    def get_data(self, request) -> Union[dict, None]:
+        """данные страницы работ, None если в справочнике нет работ"""
+        self.work_list = WorkService.get_works_by_pk_guidebook(self.guidebook.pk)
+        if self.work_list is None:
+            return None
         queryset = self.work_list
         for backend in self.filter_backends:
             queryset = backend().filter_queryset(request, queryset, self)
-        paginator = self.pagination_class()
-        paginated_queryset = paginator.paginate_queryset(queryset, request)
-        serializer = self.output_serializer_class(paginated_queryset, many=True)
+        paginator = get_paginator(request, self.pagination_class)
+        rows = paginator.paginate_queryset(
+            queryset.values(*self.fast_output_serializer.lookups), request
+        )
+        data = self.fast_output_serializer.many(rows)
+        return paginator.get_paginated_response(data).data
+
+
+class WorkSearchView(InstrumentationMixin, BaseAPIView):
+    """вью поиска работ по всем справочникам компании или поддереву справочника"""
+
+    input_serializer_class = WorkSearchInputSerializer
+    output_serializer_class = WorkSearchOutputSerializer
+    permission_classes = [IsAuthenticated, AnyCompanyRolePermissions]
+    pagination_class = KeysetPagination
+
+    @WorkResponse.search_works
+    def get(self, request, *args, **kwargs):
+        input_serializer = self.input_serializer_class(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+        params = dict(input_serializer.validated_data)
+
+        root = None
+        if "guidebook" in params:
+            root = GuideBookService.get_guidebook(params.pop("guidebook"))
+            if root is None or root.company_id != kwargs["pk_company"]:
+                return self.response_404(message="Справочник не найден.")
+
+        works = WorkService.search_works(kwargs["pk_company"], root=root, **params)
+        paginator = get_paginator(request, self.pagination_class)
+        paginated_works = paginator.paginate_queryset(works, request, view=self)
+        breadcrumbs = GuideBookService.get_breadcrumbs(
+            [work.guidebook for work in paginated_works]
+        )
+        for work in paginated_works:
+            work.breadcrumbs = breadcrumbs[work.guidebook_id]
+        serializer = self.output_serializer_class(paginated_works, many=True)
         return paginator.get_paginated_response(serializer.data)
 
 
-class WorkCreateView(BaseAPIView):
+class WorkCreateView(InstrumentationMixin, BaseAPIView):
     """вью создания работы, функция доступна только пользователю с ролью author"""
 
     input_serializer_class = WorkDataInputSerializer
@@ -191,21 +397,195 @@ class WorkCreateView(BaseAPIView):
         return self.response_201(output_serializer.data)
 
 
-class WorkDetailView(BaseAPIView):
-    """вью просмотра детально одной работы"""
+class WorkBulkView(InstrumentationMixin, BaseAPIView):
+    """
+    вью массового создания, обновления и мягкого удаления работ, доступно author.
+    Справочники проверяются одним запросом, роль author - один раз на компанию,
+    при ошибке в любой работе ничего не сохраняется и возвращаются ошибки по каждой работе
+    """
+
+    input_serializer_class = WorkDataInputSerializer
+    output_serializer_class = WorkDataOutputSerializer
+    permission_classes = [IsAuthenticated]
+
+    def check_author(self, request, company_ids):
+        if not is_author_in_companies(request.user, company_ids):
+            self.permission_denied(
+                request, message="Нет роли author в компании справочника."
+            )
+
+    @WorkResponse.bulk_create_works
+    def post(self, request, *args, **kwargs):
+        input_serializer = self.input_serializer_class(data=request.data, many=True)
+        input_serializer.is_valid(raise_exception=True)
+        guidebooks = input_serializer.context["guidebooks"]
+        self.check_author(request, [gb.company_id for gb in guidebooks.values()])
+
+        works = WorkService.bulk_create_works(
+            input_serializer.validated_data, guidebooks
+        )
+        output_serializer = self.output_serializer_class(works, many=True)
+
+        return self.response_201(output_serializer.data)
+
+    @WorkResponse.bulk_update_works
+    def put(self, request, *args, **kwargs):
+        input_serializer = WorkBulkUpdateInputSerializer(
+            data=request.data, many=True, partial=True
+        )
+        input_serializer.is_valid(raise_exception=True)
+        items = input_serializer.validated_data
+        guidebooks = input_serializer.context["guidebooks"]
+
+        works_by_pk = WorkService.get_works_by_pks([item["id"] for item in items])
+        errors, seen = [], set()
+        for item in items:
+            if item["id"] not in works_by_pk:
+                errors.append({"id": ["Работа не найдена."]})
+            elif item["id"] in seen:
+                # повтор обновил бы работу дважды и исказил агрегаты справочников
+                errors.append({"id": ["Работа повторяется в запросе."]})
+            else:
+                errors.append({})
+            seen.add(item["id"])
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        works = [works_by_pk[item["id"]] for item in items]
+        self.check_author(
+            request,
+            [work.guidebook.company_id for work in works]
+            + [gb.company_id for gb in guidebooks.values()],
+        )
+
+        works = WorkService.bulk_update_works(works, items, guidebooks)
+        return self.response_200(WorkDataOutputSerializer(works, many=True).data)
+
+    @WorkResponse.bulk_delete_works
+    def delete(self, request, *args, **kwargs):
+        input_serializer = WorkBulkDeleteInputSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+        pks = input_serializer.validated_data["ids"]
+
+        works_by_pk = WorkService.get_works_by_pks(pks)
+        errors = {
+            str(index): ["Работа не найдена."]
+            for index, pk in enumerate(pks)
+            if pk not in works_by_pk
+        }
+        if errors:
+            raise serializers.ValidationError({"ids": errors})
+        self.check_author(
+            request, [work.guidebook.company_id for work in works_by_pk.values()]
+        )
+
+        WorkService.bulk_soft_delete_works(pks)
+        return self.response_204()
+
+
+class PriceCatalogImportView(InstrumentationMixin, BaseAPIView):
+    """
+    вью потокового импорта прайс-листа (csv/xlsx) в справочники компании,
+    функция доступна только пользователю с ролью author
+    """
+
+    input_serializer_class = PriceCatalogImportInputSerializer
+    output_serializer_class = PriceCatalogImportOutputSerializer
+    permission_classes = [IsAuthenticated, CompanyPermissions]
+    required_roles = [
+        CompanyRoleUser.RoleType.AUTHOR,
+    ]
+
+    @WorkResponse.import_price_catalog
+    def post(self, request, *args, **kwargs):
+        input_serializer = self.input_serializer_class(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+        parent = None
+        if "parent_guide_book" in input_serializer.validated_data:
+            parent = GuideBookService.get_guidebook(
+                input_serializer.validated_data["parent_guide_book"]
+            )
+            if parent is None or parent.company_id != kwargs["pk_company"]:
+                return self.response_404(message="Справочник не найден.")
+
+        file = input_serializer.validated_data["file"]
+        importer = PriceCatalogImporter(kwargs["pk_company"], parent=parent)
+        try:
+            report = importer.import_file(
+                file.file,
+                get_file_format(file.name),
+                input_serializer.validated_data["encoding"],
+            )
+        except PriceCatalogImportError as error:
+            raise serializers.ValidationError({"file": [str(error)]})
+
+        return self.response_200(self.output_serializer_class(report).data)
+
+
+class EstimateView(InstrumentationMixin, BaseAPIView):
+    """
+    вью расчета сметы по строкам (работа, объем): работы загружаются одним запросом,
+    роль пользователя проверяется один раз на компанию, при ошибке
+    в любой строке возвращаются ошибки по каждой строке
+    """
+
+    input_serializer_class = EstimateInputSerializer
+    output_serializer_class = EstimateOutputSerializer
+    fast_line_serializer = FastOutputSerializer(EstimateLineOutputSerializer)
+    permission_classes = [IsAuthenticated]
+
+    @WorkResponse.estimate
+    def post(self, request, *args, **kwargs):
+        input_serializer = self.input_serializer_class(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+        items = input_serializer.validated_data["items"]
+
+        works = EstimateService.get_works([item["work"] for item in items])
+        errors = [
+            {} if item["work"] in works else {"work": ["Работа не найдена."]}
+            for item in items
+        ]
+        if any(errors):
+            raise serializers.ValidationError({"items": errors})
+        if not has_role_in_companies(
+            request.user, [work["guidebook__company_id"] for work in works.values()]
+        ):
+            self.permission_denied(request, message="Нет ролей в компании работы.")
+
+        estimate = EstimateService.calculate(items, works)
+        totals_field = self.output_serializer_class().fields["totals"]
+        return self.response_200(
+            {
+                "lines": self.fast_line_serializer.many(estimate["lines"]),
+                "guidebooks": EstimateGuideBookOutputSerializer(
+                    estimate["guidebooks"], many=True
+                ).data,
+                "totals": totals_field.to_representation(estimate["totals"]),
+            }
+        )
+
+
+class WorkDetailView(InstrumentationMixin, ConditionalGetMixin, BaseAPIView):
+    """вью просмотра детально одной работы, поддерживает ETag/If-None-Match"""
 
     output_serializer_class = WorkDataOutputSerializer
     permission_classes = [IsAuthenticated, CheckingUserWorkInCompany]
+    work: Work = None
+
+    def initial(self, request, *args, **kwargs):
+        self.work = get_guidebook_access(request, self).work
+        if self.work is None:
+            raise ResponseException(self.response_404(message="Работа не найдена."))
+        return super().initial(request, *args, **kwargs)
 
     @WorkResponse.one_work
     def get(self, request, *args, **kwargs):
-        work = WorkService.get_work(kwargs["pk_work"])
-        if work is None:
-            return self.response_404()
-        return self.response_200(self.output_serializer_class(work).data)
+        not_modified = self.get_not_modified_response(request, self.work.guidebook)
+        if not_modified is not None:
+            return not_modified
+        return self.response_200(self.output_serializer_class(self.work).data)
 
 
-class WorkUpdateAndDeliteView(BaseAPIView):
+class WorkUpdateAndDeliteView(InstrumentationMixin, BaseAPIView):
     """вью обновления работы, доступно author"""
 
     input_serializer_class = WorkDataInputSerializer
@@ -217,7 +597,7 @@ class WorkUpdateAndDeliteView(BaseAPIView):
     work: Work = None
 
     def initial(self, request, *args, **kwargs):
-        self.work = WorkService.get_work(kwargs["pk_work"])
+        self.work = get_guidebook_access(request, self).work
         if self.work is None:
             raise ResponseException(self.response_404(message="Работа не найдена."))
         return super().initial(request, *args, **kwargs)
@@ -229,9 +609,23 @@ class WorkUpdateAndDeliteView(BaseAPIView):
         )
         input_serializer.is_valid(raise_exception=True)
         work = WorkService.update_work(self.work, **input_serializer.validated_data)
+        if work is None:
+            return self.response_404(message="Работа не найдена.")
         return self.response_200(WorkDataOutputSerializer(work).data)
 
     @WorkResponse.soft_delete_work
     def delete(self, request, *args, **kwargs):
-        WorkService.soft_delete_get_object_by_model(self.work)
+        WorkService.soft_delete_work(self.work)
         return self.response_204()
+
+
+class GuideBookMetricsView(BaseAPIView):
+    """вью метрик API справочников в формате Prometheus, доступно администраторам"""
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @GuideBookResponse.metrics
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(
+            metrics.render_prometheus(), content_type="text/plain; version=0.0.4"
+        )